@@ -1,11 +1,18 @@
+import hmac
 import os
 from datetime import timedelta
-from flask import Flask, request
-from flask_socketio import SocketIO, emit, join_room
+from flask import Flask, request, jsonify, send_from_directory
+from flask_socketio import SocketIO, join_room
 import firebase_admin
 from firebase_admin import credentials
 from extensions import bcrypt, socketio
-from utils.db import get_db_connection
+from utils.db import get_pool_stats
+from utils.chat_writer import get_chat_writer
+from utils.socket_queue import socketio_queue_options
+from utils.response_cache import response_cache_stats
+from utils.dashboard import dashboard_stats
+from utils.cleanup import get_cleanup_scheduler
+from utils.media import get_media_service, MEDIA_BACKEND, MEDIA_LOCAL_DIR, MEDIA_LOCAL_URL, MEDIA_CACHE_MAX_AGE
 
 # Blueprints
 from routes.auth import auth_bp
@@ -24,7 +31,8 @@ app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=30)
 
 # 확장 라이브러리 초기화
 bcrypt.init_app(app)
-socketio.init_app(app, cors_allowed_origins="*", async_mode='eventlet')
+# 메시지 큐(SOCKETIO_MESSAGE_QUEUE)가 설정되면 여러 워커 간 room/emit 공유
+socketio.init_app(app, cors_allowed_origins="*", async_mode='eventlet', **socketio_queue_options())
 
 # Firebase 초기화
 if not firebase_admin._apps:
@@ -37,10 +45,48 @@ app.register_blueprint(clubs_bp)
 app.register_blueprint(board_bp)
 app.register_blueprint(match_bp)
 
+@app.before_request
+def start_background_jobs():
+    # 매칭 대기 만료 / 오래된 경기·채팅 보관 (CLEANUP_INTERVAL 주기, 0 이면 비활성)
+    # 워커(pid)마다 첫 요청에서 한 번 시작, 이후에는 pid 비교만 수행
+    get_cleanup_scheduler().start()
+
 @app.route("/")
 def hello():
     return "<h1>Round API Server is Running!</h1>"
 
+# 상세 지표는 X-Health-Token 헤더가 HEALTH_TOKEN 과 일치하는 내부 요청에만 반환 (미설정 시 생존 여부만)
+# 같은 호스트의 리버스 프록시를 거치면 모든 요청이 loopback 으로 보이므로 주소로는 판단하지 않음
+HEALTH_TOKEN = os.environ.get('HEALTH_TOKEN')
+
+def _is_internal_request():
+    return bool(HEALTH_TOKEN) and hmac.compare_digest(request.headers.get('X-Health-Token', ''), HEALTH_TOKEN)
+
+@app.route("/health")
+def health():
+    """
+    생존 확인. 내부 요청에는 워커별 DB 커넥션 풀 등 지표를 함께 반환 (풀 크기 산정용)
+    """
+    if not _is_internal_request():
+        return jsonify({"success": True}), 200
+    return jsonify({
+        "success": True,
+        "pid": os.getpid(),
+        "db_pool": get_pool_stats(),
+        "chat_writer": get_chat_writer().get_stats(),
+        "media": get_media_service().stats,
+        "response_cache": response_cache_stats(),
+        "dashboard": dashboard_stats(),
+        "cleanup": get_cleanup_scheduler().stats
+    }), 200
+
+
+if MEDIA_BACKEND == 'local':
+    # 로컬 저장소 사용 시 업로드 파일 제공 (개발/테스트용, 운영은 GCS)
+    @app.route(f"{MEDIA_LOCAL_URL.rstrip('/')}/<path:key>")
+    def serve_media(key):
+        return send_from_directory(MEDIA_LOCAL_DIR, key, max_age=MEDIA_CACHE_MAX_AGE)
+
 
 # ==========================================
 # 2. 소켓 핸들러 (Socket.IO Handlers)
@@ -80,7 +126,7 @@ def handle_join_chat(data):
 @socketio.on('send_message')
 def handle_send_message(data):
     """
-    메시지 수신, DB 저장 및 브로드캐스트
+    메시지 수신 -> 저장 큐에 등록 (저장 후 DB id 와 함께 브로드캐스트)
     """
     room = data.get('room')
     user_id_str = data.get('user_id')
@@ -88,42 +134,9 @@ def handle_send_message(data):
     
     app.logger.info(f"📨 [Socket Msg] Room: {room}, User: {user_id_str}")
 
-    conn = None
-    try:
-        conn = get_db_connection()
-        if conn:
-            cursor = conn.cursor(dictionary=True) 
-            
-            # 1. 유저 PK 조회
-            cursor.execute("SELECT id FROM Users WHERE user_id = %s", (user_id_str,))
-            user_row = cursor.fetchone()
-            
-            if user_row:
-                user_db_id = user_row['id'] 
-                
-                # 2. 채팅 로그 DB 저장
-                sql = "INSERT INTO ChatMessages (match_id, user_id, message) VALUES (%s, %s, %s)"
-                cursor.execute(sql, (room, user_db_id, message))
-                conn.commit()
-            else:
-                app.logger.warning(f"User not found for chat: {user_id_str}")
-            
-            cursor.close()
-        else:
-            app.logger.error("DB Connection failed during chat save")
-
-    except Exception as e:
-        app.logger.error(f"❌ Chat Save Error: {e}")
-        if conn: conn.rollback()
-    finally:
-        if conn: conn.close()
-
-    # 3. 메시지 전송 (DB 저장 성공 여부와 관계없이 전송하여 반응성 확보)
-    emit('new_message', {
-        'sender': user_id_str,
-        'message': message,
-        'match_id': room
-    }, room=room)
+    # 유저 PK 조회, DB 저장, 'new_message' 전송은 백그라운드에서 일괄 처리 (write-behind)
+    # 전송되는 메시지에는 DB id 가 있으므로 클라이언트는 재접속 시 after_id 로 놓친 메시지만 조회
+    get_chat_writer().submit(room, user_id_str, message)
 
 
 if __name__ == "__main__":
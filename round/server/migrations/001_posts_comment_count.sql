@@ -0,0 +1,13 @@
+-- 게시글 피드 키셋 페이지네이션 (GET /api/posts)
+-- 1) 댓글 수 비정규화: create_comment 에서 함께 증가시켜 목록 조회 시 COUNT 서브쿼리 제거
+-- 2) (club_id, created_at, id) 복합 인덱스: WHERE club_id = ? ORDER BY created_at DESC, id DESC 커서 조회용
+
+ALTER TABLE Posts ADD COLUMN comment_count INT NOT NULL DEFAULT 0;
+
+UPDATE Posts P
+LEFT JOIN (
+    SELECT post_id, COUNT(*) AS cnt FROM Comments GROUP BY post_id
+) C ON P.id = C.post_id
+SET P.comment_count = COALESCE(C.cnt, 0);
+
+CREATE INDEX idx_posts_club_created ON Posts (club_id, created_at, id);
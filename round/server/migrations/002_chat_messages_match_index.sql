@@ -0,0 +1,4 @@
+-- 채팅 내역 페이지네이션 (GET /api/chat/history)
+-- WHERE match_id = ? AND id < ? / id > ? ORDER BY id 형태의 조회를 인덱스 범위 스캔으로 처리
+
+CREATE INDEX idx_chat_match_id ON ChatMessages (match_id, id);
@@ -0,0 +1,51 @@
+-- 단일 행 경기 모델 (Matches)
+-- 기존: 매칭 1건 = room_id 를 공유하는 MatchQueue 2행 (score_a/score_b 를 서로 뒤집어 저장)
+--       -> 일정/결과 제안/확정마다 2행 갱신, 목록 조회 시 room_id 중복 제거 필요
+-- 변경: 매칭 1건 = Matches 1행 (home: 먼저 대기한 팀, away: 매칭 요청 팀), MatchQueue 는 WAITING 대기열만 유지
+
+CREATE TABLE IF NOT EXISTS Matches (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    room_id VARCHAR(64) NOT NULL,
+    home_club_id INT NOT NULL,
+    away_club_id INT NOT NULL,
+    sport VARCHAR(50),
+    sido VARCHAR(50),
+    sigungu VARCHAR(50),
+    status ENUM('MATCHED', 'PENDING', 'FINISHED') NOT NULL DEFAULT 'MATCHED',
+    home_score INT NULL,
+    away_score INT NULL,
+    proposer_id INT NULL,
+    schedule_date DATETIME NULL,
+    location VARCHAR(255) NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    finished_at DATETIME NULL,
+    UNIQUE KEY uq_matches_room (room_id),
+    KEY idx_matches_home (home_club_id, status, created_at),
+    KEY idx_matches_away (away_club_id, status, created_at)
+);
+
+-- 기존 쌍 접기: room_id 별로 먼저 생성된 행(대기하던 팀)을 home 으로 사용
+-- 그 행의 score_a 는 home 점수, score_b 는 away 점수
+INSERT INTO Matches
+    (room_id, home_club_id, away_club_id, sport, sido, sigungu, status,
+     home_score, away_score, proposer_id, schedule_date, location, created_at, finished_at)
+SELECT
+    H.room_id, H.club_id, H.matched_club_id, H.sport, H.sido, H.sigungu, H.status,
+    H.score_a, H.score_b, H.proposer_id, H.schedule_date, H.location, H.created_at,
+    IF(H.status = 'FINISHED', COALESCE(H.schedule_date, H.created_at), NULL)
+FROM MatchQueue H
+JOIN (
+    SELECT room_id, MIN(id) AS id
+    FROM MatchQueue
+    WHERE room_id IS NOT NULL AND status IN ('MATCHED', 'PENDING', 'FINISHED')
+    GROUP BY room_id
+) F ON H.id = F.id
+WHERE H.matched_club_id IS NOT NULL;
+
+-- MatchQueue 에는 대기 중인 행만 남김
+DELETE FROM MatchQueue WHERE status IN ('MATCHED', 'PENDING', 'FINISHED');
+
+-- 검증 후 더 이상 쓰지 않는 MatchQueue 컬럼 정리 (선택)
+-- ALTER TABLE MatchQueue
+--     DROP COLUMN matched_club_id, DROP COLUMN room_id, DROP COLUMN score_a, DROP COLUMN score_b,
+--     DROP COLUMN proposer_id, DROP COLUMN schedule_date, DROP COLUMN location;
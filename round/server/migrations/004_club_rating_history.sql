@@ -0,0 +1,18 @@
+-- 경기 결과 확정 이력 (ClubRatingHistory)
+-- 1) 확정된 경기마다 클럽별 1행 (포인트 변경 전/후, 상대, 결과) - 추가만 하고 수정하지 않음
+-- 2) (match_id, club_id) UNIQUE: 결과 확정의 멱등 키 (같은 경기의 포인트가 두 번 반영되지 않도록)
+-- 3) (club_id, created_at) 인덱스: 클럽별 기간 조회용
+
+CREATE TABLE IF NOT EXISTS ClubRatingHistory (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    club_id INT NOT NULL,
+    match_id INT NOT NULL,
+    opponent_club_id INT NOT NULL,
+    sport VARCHAR(50),
+    point_before INT NOT NULL,
+    point_after INT NOT NULL,
+    result ENUM('W', 'L', 'D') NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_rating_match_club (match_id, club_id),
+    KEY idx_rating_club_created (club_id, created_at)
+);
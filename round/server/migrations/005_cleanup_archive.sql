@@ -0,0 +1,12 @@
+-- 대기열 만료 / 경기·채팅 보관 (utils/cleanup.py)
+-- 1) 보관(cold) 테이블: 원본과 같은 구조, 종료 후 오래된 경기와 그 채팅을 옮겨 원본 테이블 크기를 유지
+-- 2) 만료/보관 대상 조회용 인덱스
+
+CREATE TABLE IF NOT EXISTS MatchesArchive LIKE Matches;
+CREATE TABLE IF NOT EXISTS ChatMessagesArchive LIKE ChatMessages;
+
+-- WHERE status = 'WAITING' AND created_at < ? (대기열 만료)
+CREATE INDEX idx_queue_status_created ON MatchQueue (status, created_at);
+
+-- WHERE status = 'FINISHED' AND finished_at < ? (경기 보관)
+CREATE INDEX idx_matches_status_finished ON Matches (status, finished_at);
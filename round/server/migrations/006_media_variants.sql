@@ -0,0 +1,9 @@
+-- 이미지 변형 기록 (utils/images.py)
+-- 목록 API 는 여기에 기록된 원본 URL 만 변형(.thumb.jpg / .medium.jpg) URL 로 바꿔 내려줍니다.
+-- 기존 이미지는 'python -m utils.images --backfill' 실행 시 기록됩니다.
+
+CREATE TABLE IF NOT EXISTS MediaVariants (
+    url VARCHAR(500) NOT NULL PRIMARY KEY,
+    variants VARCHAR(100) NOT NULL,          -- 생성된 변형 이름 (쉼표 구분, 예: 'medium,thumb')
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
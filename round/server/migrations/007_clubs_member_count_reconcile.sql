@@ -0,0 +1,11 @@
+-- 클럽 멤버 수 보정 (Clubs.member_count)
+-- 목록/추천/랭킹 조회가 ClubMembers COUNT(*) 대신 저장된 member_count 를 읽으므로,
+-- 배포 시 기존 행의 값을 ClubMembers 기준으로 맞춥니다. (이후에는 utils/club_counters.py 가 함께 갱신)
+-- <=> 비교로 NULL 인 행도 보정합니다.
+
+UPDATE Clubs C
+LEFT JOIN (
+    SELECT club_id, COUNT(*) AS cnt FROM ClubMembers GROUP BY club_id
+) M ON C.id = M.club_id
+SET C.member_count = COALESCE(M.cnt, 0)
+WHERE NOT (C.member_count <=> COALESCE(M.cnt, 0));
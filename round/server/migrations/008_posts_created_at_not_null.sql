@@ -0,0 +1,9 @@
+-- 게시글 작성 시각 NOT NULL (GET /api/posts 키셋 페이지네이션)
+-- 키셋 조건 (created_at, id) < (?, ?) 은 created_at 이 NULL 인 행과 절대 일치하지 않으므로,
+-- NULL 행이 페이지 경계에 걸리면 다음 커서를 만들 수 없습니다.
+-- COALESCE 로 정렬하면 idx_posts_club_created 인덱스를 못 쓰므로, 기존 NULL 을 채우고 컬럼을 NOT NULL 로 바꿉니다.
+-- 작성 시각을 알 수 없는 글은 가장 오래된 글로 취급합니다.
+
+UPDATE Posts SET created_at = '1970-01-01 00:00:00' WHERE created_at IS NULL;
+
+ALTER TABLE Posts MODIFY created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP;
@@ -0,0 +1,11 @@
+-- 채팅 저장 시각은 DB 가 기록 (utils/chat_writer.py)
+-- 워커마다 datetime.now() 로 찍으면 서버 간 시계 차이로 순서가 뒤섞일 수 있으므로,
+-- INSERT 에서 created_at 을 빼고 CURRENT_TIMESTAMP 기본값을 사용합니다.
+-- 보관 테이블은 INSERT ... SELECT * 로 옮기므로 같은 정의를 유지합니다.
+-- (채팅 순서는 id 기준이므로 기존 NULL 행은 표시용 시각만 채움)
+
+UPDATE ChatMessages SET created_at = '1970-01-01 00:00:00' WHERE created_at IS NULL;
+UPDATE ChatMessagesArchive SET created_at = '1970-01-01 00:00:00' WHERE created_at IS NULL;
+
+ALTER TABLE ChatMessages MODIFY created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE ChatMessagesArchive MODIFY created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP;
@@ -4,10 +4,10 @@ import os
 import random
 import time
 from sms_service import send_sms
-from google.cloud import storage
-from werkzeug.utils import secure_filename
 from extensions import bcrypt
 from utils.db import get_db_connection
+from utils.identity import remember_identity, invalidate_identity
+from utils.media import get_media_service, update_image_url
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadTimeSignature
 
 auth_bp = Blueprint('auth', __name__)
@@ -20,6 +20,7 @@ auth_bp = Blueprint('auth', __name__)
 def register_user():
     conn = None
     cursor = None
+    staged = None
     try:
         # 1. Form 데이터 수신
         name = request.form.get('name')
@@ -41,16 +42,13 @@ def register_user():
         # 2. 비밀번호 해싱 (bcrypt)
         hashed_password = bcrypt.generate_password_hash(plain_password).decode('utf-8')
 
-        # 3. 프로필 이미지 GCS 업로드
+        # 3. 프로필 이미지 업로드 (스트리밍 / 백그라운드 모드면 커밋 후 업로드)
+        media = get_media_service()
         if profile_image:
-            filename = secure_filename(profile_image.filename)
-            storage_client = storage.Client()
-            bucket = storage_client.bucket(os.environ.get('GCS_BUCKET'))
-            blob = bucket.blob(filename)
-            
-            image_bytes = profile_image.read()
-            blob.upload_from_string(image_bytes, content_type=profile_image.content_type)
-            image_url = blob.public_url
+            if media.background:
+                staged = media.stage(profile_image)
+            else:
+                image_url = media.upload(profile_image)
 
         # 4. DB 저장
         conn = get_db_connection()
@@ -66,6 +64,9 @@ def register_user():
         
         cursor.execute(sql, val)
         conn.commit()
+
+        if staged:
+            media.upload_async(staged, on_done=update_image_url('Users', 'profile_image_url', cursor.lastrowid))
         
         return jsonify({"success": True, "message": "회원가입이 성공적으로 완료되었습니다!"}), 201
 
@@ -81,6 +82,7 @@ def register_user():
         current_app.logger.error(f"Server Error (register): {e}")
         return jsonify({"success": False, "error": "서버 오류"}), 500
     finally:
+        if staged: staged.discard()
         if cursor: cursor.close()
         if conn and conn.is_connected(): conn.close()
 
@@ -396,9 +398,11 @@ def login_user():
             current_app.logger.info(f"User '{user_id}' logged in.")
 
             session['user_id'] = user['user_id']
+            session['user_db_id'] = user['id']  # 이후 요청에서 Users PK 재조회 생략
             session['user_role'] = user['role']
             session['logged_in'] = True
             session.permanent = True
+            remember_identity(user['user_id'], user['id'], user['role'])
             
             user_data = {
                 "id": user['id'],
@@ -435,8 +439,12 @@ def check_login_status():
 
             if user:
                 session.permanent = True # 세션 연장
+                session['user_db_id'] = user['id']
+                session['user_role'] = user['role']
+                remember_identity(user['user_id'], user['id'], user['role'])
                 return jsonify({"success": True, "user": user}), 200
             else:
+                invalidate_identity(user_id)
                 session.clear() # DB에 없으면 세션도 삭제
                 return jsonify({"success": False, "error": "사용자 정보 없음"}), 404
         
@@ -457,6 +465,7 @@ def logout_user():
         # 세션에 로그인 정보가 있다면 DB 작업 수행 (FCM 토큰 삭제)
         if 'user_id' in session:
             user_id = session['user_id']
+            invalidate_identity(user_id)
             
             conn = get_db_connection()
             # DB 연결이 성공했을 때만 FCM 초기화 수행
@@ -1,12 +1,18 @@
 from flask import Blueprint, request, jsonify, session, current_app
 import mysql.connector
-import os
-from google.cloud import storage
-from werkzeug.utils import secure_filename
 from utils.db import get_db_connection
+from utils.identity import get_session_user_db_id
+from utils.cursor import encode_cursor, decode_cursor
+from utils.fcm import notify_club
+from utils.media import get_media_service, update_image_url
+from utils.images import thumb_rows
+from utils.response_cache import invalidate_club
 
 board_bp = Blueprint('board', __name__)
 
+POSTS_PAGE_SIZE = 20      # 피드 기본 페이지 크기
+POSTS_PAGE_SIZE_MAX = 50  # 요청 가능한 최대 페이지 크기
+
 # ==========================================
 # 1. 게시글 생성 및 조회 (Posts)
 # ==========================================
@@ -15,6 +21,7 @@ board_bp = Blueprint('board', __name__)
 def create_post():
     conn = None
     cursor = None
+    staged = None
     try:
         # 1. 로그인 확인
         if 'user_id' not in session:
@@ -30,16 +37,13 @@ def create_post():
         if not club_id or not title or not content:
              return jsonify({"success": False, "error": "필수 정보가 누락되었습니다."}), 400
 
-        # 3. 이미지 업로드 (GCS)
+        # 3. 이미지 업로드 (스트리밍 / 백그라운드 모드면 커밋 후 업로드)
+        media = get_media_service()
         if post_image:
-            filename = secure_filename(post_image.filename)
-            storage_client = storage.Client()
-            bucket = storage_client.bucket(os.environ.get('GCS_BUCKET'))
-            blob = bucket.blob(f"posts/{filename}")
-            
-            image_bytes = post_image.read()
-            blob.upload_from_string(image_bytes, content_type=post_image.content_type)
-            image_url = blob.public_url
+            if media.background:
+                staged = media.stage(post_image, prefix='posts/')
+            else:
+                image_url = media.upload(post_image, prefix='posts/')
 
         # 4. DB 연결
         conn = get_db_connection()
@@ -47,12 +51,9 @@ def create_post():
         cursor = conn.cursor()
         
         # 5. 작성자 PK 조회
-        cursor.execute("SELECT id FROM Users WHERE user_id = %s", (session['user_id'],))
-        user_record = cursor.fetchone()
-        if not user_record:
+        author_id = get_session_user_db_id(cursor)
+        if not author_id:
             return jsonify({"success": False, "error": "사용자 정보를 찾을 수 없습니다."}), 404
-        
-        author_id = user_record[0]
 
         # 6. 게시글 저장
         sql = """INSERT INTO Posts (club_id, user_id, title, content, image_url)
@@ -60,7 +61,19 @@ def create_post():
         val = (club_id, author_id, title, content, image_url)
         
         cursor.execute(sql, val)
+        post_id = cursor.lastrowid
         conn.commit()
+        invalidate_club(club_id, 'posts')
+
+        if staged:
+            media.upload_async(staged, on_done=update_image_url('Posts', 'image_url', post_id))
+
+        # 클럽 멤버 전체에 새 글 알림 (작성자 제외)
+        try:
+            notify_club(club_id, 'POST', "새 게시글이 등록되었습니다", title,
+                        data={"club_id": club_id, "post_id": post_id}, exclude_user_id=author_id)
+        except Exception as e:
+            current_app.logger.error(f"FCM Error (post): {e}")
         
         return jsonify({"success": True, "message": "게시글이 등록되었습니다."}), 201
 
@@ -69,6 +82,7 @@ def create_post():
         current_app.logger.error(f"Error creating post: {e}")
         return jsonify({"success": False, "error": "서버 오류"}), 500
     finally:
+        if staged: staged.discard()
         if cursor: cursor.close()
         if conn and conn.is_connected(): conn.close()
 
@@ -82,25 +96,49 @@ def get_posts():
         if not club_id:
             return jsonify({"success": False, "error": "club_id required"}), 400
 
+        limit = min(max(request.args.get('limit', POSTS_PAGE_SIZE, type=int), 1), POSTS_PAGE_SIZE_MAX)
+        page_cursor = request.args.get('cursor')
+        try:
+            after = decode_cursor(page_cursor) if page_cursor else None
+        except ValueError:
+            return jsonify({"success": False, "error": "invalid cursor"}), 400
+
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True, buffered=True)
 
         # 게시글 목록 조회 (작성자 정보 & 댓글 수 포함)
+        # (created_at, id) 키셋 페이지네이션: 이전 페이지 마지막 글보다 오래된 글만 조회
         sql = """
             SELECT 
-                P.id, P.title, P.content, P.image_url, P.likes,
-                DATE_FORMAT(P.created_at, '%%Y-%%m-%%d %%H:%%i') as time,
-                U.name as author_name, U.profile_image_url as author_image,
-                (SELECT COUNT(*) FROM Comments C WHERE C.post_id = P.id) as comment_count
+                P.id, P.title, P.content, P.image_url, P.likes, P.created_at, P.comment_count,
+                U.name as author_name, U.profile_image_url as author_image
             FROM Posts P
             JOIN Users U ON P.user_id = U.id
             WHERE P.club_id = %s
-            ORDER BY P.created_at DESC
         """
-        cursor.execute(sql, (club_id,))
+        params = [club_id]
+        if after:
+            sql += " AND (P.created_at < %s OR (P.created_at = %s AND P.id < %s))"
+            params.extend([after[0], after[0], after[1]])
+        sql += " ORDER BY P.created_at DESC, P.id DESC LIMIT %s"
+        params.append(limit + 1)  # 다음 페이지 존재 여부 확인용 1개 추가
+
+        cursor.execute(sql, tuple(params))
         posts = cursor.fetchall()
 
-        return jsonify({"success": True, "posts": posts}), 200
+        has_more = len(posts) > limit
+        posts = posts[:limit]
+        # created_at 은 NOT NULL (migrations/008) 이므로 마지막 행으로 항상 커서를 만들 수 있음
+        next_cursor = encode_cursor(posts[-1]['created_at'], posts[-1]['id']) if has_more else None
+
+        for p in posts:
+            p['time'] = p.pop('created_at').strftime('%Y-%m-%d %H:%M')
+
+        # 피드 이미지는 중간 크기, 작성자 프로필은 썸네일
+        thumb_rows(posts, 'image_url', variant='medium')
+        thumb_rows(posts, 'author_image')
+
+        return jsonify({"success": True, "posts": posts, "next_cursor": next_cursor, "has_more": has_more}), 200
 
     except Exception as e:
         current_app.logger.error(f"Error fetching posts: {e}")
@@ -123,11 +161,7 @@ def get_post_detail():
         cursor = conn.cursor(dictionary=True, buffered=True)
 
         # 현재 로그인 유저 ID (좋아요 여부 확인용)
-        current_user_db_id = None
-        if 'user_id' in session:
-            cursor.execute("SELECT id FROM Users WHERE user_id = %s", (session['user_id'],))
-            user_record = cursor.fetchone()
-            if user_record: current_user_db_id = user_record['id']
+        current_user_db_id = get_session_user_db_id(cursor)
 
         # 게시글 상세 조회 (+ is_liked)
         sql = """
@@ -135,7 +169,7 @@ def get_post_detail():
                 P.id, P.title, P.content, P.image_url, P.likes,
                 DATE_FORMAT(P.created_at, '%%Y-%%m-%%d %%H:%%i') as time,
                 U.name as author_name, U.profile_image_url as author_image,
-                (SELECT COUNT(*) FROM Comments C WHERE C.post_id = P.id) as comment_count,
+                P.comment_count,
                 (SELECT COUNT(*) FROM PostLikes PL WHERE PL.post_id = P.id AND PL.user_id = %s) as is_liked
             FROM Posts P
             JOIN Users U ON P.user_id = U.id
@@ -175,8 +209,9 @@ def toggle_like():
         cursor = conn.cursor()
 
         # 1. 사용자 PK 조회
-        cursor.execute("SELECT id FROM Users WHERE user_id = %s", (session['user_id'],))
-        user_id = cursor.fetchone()[0]
+        user_id = get_session_user_db_id(cursor)
+        if not user_id:
+            return jsonify({"success": False, "error": "로그인 필요"}), 401
 
         # 2. 좋아요 여부 확인 및 토글
         cursor.execute("SELECT 1 FROM PostLikes WHERE post_id = %s AND user_id = %s", (post_id, user_id))
@@ -194,8 +229,9 @@ def toggle_like():
         conn.commit()
         
         # 최신 좋아요 수 반환
-        cursor.execute("SELECT likes FROM Posts WHERE id = %s", (post_id,))
-        new_like_count = cursor.fetchone()[0]
+        cursor.execute("SELECT likes, club_id FROM Posts WHERE id = %s", (post_id,))
+        new_like_count, club_id = cursor.fetchone()
+        invalidate_club(club_id, 'posts')
         
         return jsonify({"success": True, "message": message, "likes": new_like_count}), 200
 
@@ -230,12 +266,20 @@ def create_comment():
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        cursor.execute("SELECT id FROM Users WHERE user_id = %s", (session['user_id'],))
-        author_id = cursor.fetchone()[0]
+        author_id = get_session_user_db_id(cursor)
+        if not author_id:
+            return jsonify({"success": False, "error": "로그인 필요"}), 401
 
         sql = "INSERT INTO Comments (post_id, user_id, content) VALUES (%s, %s, %s)"
         cursor.execute(sql, (post_id, author_id, content))
+        # 목록 조회용 댓글 수 (같은 트랜잭션에서 증가)
+        cursor.execute("UPDATE Posts SET comment_count = comment_count + 1 WHERE id = %s", (post_id,))
         conn.commit()
+
+        # 클럽 게시글 목록의 댓글 수 갱신
+        cursor.execute("SELECT club_id FROM Posts WHERE id = %s", (post_id,))
+        row = cursor.fetchone()
+        if row: invalidate_club(row[0], 'posts')
         
         return jsonify({"success": True, "message": "댓글 등록 완료"}), 201
 
@@ -269,7 +313,7 @@ def get_comments():
             ORDER BY C.created_at ASC
         """
         cursor.execute(sql, (post_id,))
-        comments = cursor.fetchall()
+        comments = thumb_rows(cursor.fetchall(), 'author_image')
 
         return jsonify({"success": True, "comments": comments}), 200
 
@@ -1,9 +1,22 @@
 from flask import Blueprint, request, jsonify, session, current_app
 import mysql.connector
-import os
-from google.cloud import storage
-from werkzeug.utils import secure_filename
 from utils.db import get_db_connection
+from utils.identity import get_session_user_db_id, resolve_user_db_id
+from utils.leaderboard import get_leaderboards
+from utils.club_counters import add_member
+from utils.recommender import get_recommender
+from utils.media import get_media_service, update_image_url
+from utils.images import thumb_rows
+from utils.response_cache import cached_response, invalidate, invalidate_club
+from utils.dashboard import fetch_my_clubs, invalidate_user_dashboard
+from utils.fcm import notify_club
+from utils import events
+from utils import matches as match_model
+from utils.cursor import decode_cursor
+from utils.rating_history import (
+    parse_range, fetch_history, fetch_series,
+    RATING_HISTORY_PAGE_SIZE, RATING_HISTORY_PAGE_SIZE_MAX, RATING_SERIES_POINTS,
+)
 
 clubs_bp = Blueprint('clubs', __name__)
 
@@ -15,6 +28,7 @@ clubs_bp = Blueprint('clubs', __name__)
 def create_club():
     conn = None
     cursor = None
+    staged = None
     try:
         # 1. Form 데이터 수신
         creator_user_id_str = request.form.get('creator_user_id')
@@ -27,48 +41,51 @@ def create_club():
         club_image = request.files.get('club_image')
         image_url = None
 
-        # 2. GCS 이미지 업로드
+        # 2. 이미지 업로드 (스트리밍 / 백그라운드 모드면 커밋 후 업로드)
+        media = get_media_service()
         if club_image:
-            filename = secure_filename(club_image.filename)
-            storage_client = storage.Client()
-            bucket = storage_client.bucket(os.environ.get('GCS_BUCKET'))
-            blob = bucket.blob(filename)
-            
-            image_bytes = club_image.read()
-            blob.upload_from_string(
-                image_bytes,
-                content_type=club_image.content_type
-            )
-            image_url = blob.public_url
+            if media.background:
+                staged = media.stage(club_image)
+            else:
+                image_url = media.upload(club_image)
 
         # 3. DB 연결
         conn = get_db_connection()
         cursor = conn.cursor()
 
         # 4. 생성자 ID 조회
-        cursor.execute("SELECT id FROM Users WHERE user_id = %s", (creator_user_id_str,))
-        user_record = cursor.fetchone()
-        if not user_record:
+        creator_id_int = resolve_user_db_id(cursor, creator_user_id_str)
+        if not creator_id_int:
             return jsonify({"success": False, "error": "생성자 정보를 찾을 수 없습니다."}), 404
-        
-        creator_id_int = user_record[0]
 
         # 5. Clubs 테이블 Insert
-        sql_club = """INSERT INTO Clubs (name, sport, sido, sigungu, description, max_capacity, club_image_url, creator_id)
-                      VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"""
+        sql_club = """INSERT INTO Clubs (name, sport, sido, sigungu, description, max_capacity, club_image_url, creator_id, member_count)
+                      VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 0)"""
         val_club = (name, sport, sido, sigungu, description, max_capacity, image_url, creator_id_int)
         cursor.execute(sql_club, val_club)
         
         new_club_id = cursor.lastrowid
 
-        # 6. 생성자를 관리자(admin)로 멤버 추가
-        sql_member = """INSERT INTO ClubMembers (user_id, club_id, role)
-                        VALUES (%s, %s, 'admin')"""
-        val_member = (creator_id_int, new_club_id)
-        cursor.execute(sql_member, val_member)
+        # 6. 생성자를 관리자(admin)로 멤버 추가 (member_count 0 -> 1)
+        add_member(cursor, new_club_id, creator_id_int, 'admin')
         
         conn.commit()
 
+        if staged:
+            media.upload_async(staged, on_done=update_image_url('Clubs', 'club_image_url', new_club_id))
+
+        invalidate('clubs_list', f"ranking:{sport}")
+        invalidate_user_dashboard(creator_id_int)
+
+        get_leaderboards().upsert_club({
+            'id': new_club_id, 'name': name, 'club_image_url': image_url, 'point': 1000,
+            'sport': sport, 'sido': sido, 'sigungu': sigungu
+        })
+        get_recommender().add_club({
+            'id': new_club_id, 'sport': sport, 'sido': sido, 'sigungu': sigungu,
+            'point': 1000, 'member_count': 1
+        })
+
         current_app.logger.info(f"Club created: {name} (ID: {new_club_id})")
         return jsonify({"success": True, "message": "동호회가 성공적으로 생성되었습니다!"}), 201
 
@@ -84,6 +101,7 @@ def create_club():
         current_app.logger.error(f"Server Error (create-club): {e}")
         return jsonify({"success": False, "error": "서버 오류"}), 500
     finally:
+        if staged: staged.discard()
         if cursor: cursor.close()
         if conn and conn.is_connected(): conn.close()
 
@@ -96,20 +114,12 @@ def get_my_clubs():
         if 'user_id' not in session:
             return jsonify({"success": False, "error": "로그인이 필요합니다."}), 401
 
-        current_user_id_str = session['user_id']
-
         conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
+        cursor = conn.cursor(dictionary=True, buffered=True)
+        user_db_id = get_session_user_db_id(cursor)
 
-        # 내가 가입한 클럽 목록 및 내 역할(role) 조회
-        sql = """
-            SELECT C.id, C.name, C.sport, C.sido, C.sigungu, CM.role 
-            FROM Clubs C
-            JOIN ClubMembers CM ON C.id = CM.club_id
-            WHERE CM.user_id = (SELECT id FROM Users WHERE user_id = %s)
-        """
-        cursor.execute(sql, (current_user_id_str,))
-        clubs = cursor.fetchall()
+        # 내가 가입한 클럽 목록 및 내 역할(role) - 가입 직후 바로 보이도록 캐시하지 않음
+        clubs = fetch_my_clubs(cursor, user_db_id)
 
         return jsonify({"success": True, "clubs": clubs}), 200
 
@@ -126,6 +136,7 @@ def get_my_clubs():
 # ==========================================
 
 @clubs_bp.route("/api/clubs/list", methods=["GET"])
+@cached_response(lambda kw: ['clubs_list'])
 def get_clubs_list():
     conn = None
     cursor = None
@@ -140,8 +151,7 @@ def get_clubs_list():
         sql = """
             SELECT 
                 C.id, C.name, C.description, C.sport, C.sido, C.sigungu, C.club_image_url,
-                C.max_capacity,
-                (SELECT COUNT(*) FROM ClubMembers CM WHERE CM.club_id = C.id) AS member_count
+                C.max_capacity, C.member_count
             FROM Clubs C
             WHERE C.sido = %s AND C.sport = %s
         """
@@ -154,7 +164,7 @@ def get_clubs_list():
         sql += " ORDER BY C.created_at DESC"
 
         cursor.execute(sql, tuple(params))
-        clubs = cursor.fetchall()
+        clubs = thumb_rows(cursor.fetchall(), 'club_image_url')
 
         return jsonify({"success": True, "clubs": clubs}), 200
 
@@ -174,39 +184,29 @@ def get_recommended_clubs():
         category = request.args.get('category')
         sido = request.args.get('sido')
         sigungu = request.args.get('sigungu')
+        weight = request.args.get('weight') # None(균등) / 'rating' / 'activity'
+
+        # 1. 메모리 후보 풀에서 10개 추출 (ORDER BY RAND() 전체 정렬 대체)
+        club_ids = get_recommender().sample(category, sido, sigungu, k=10, weight=weight)
+        if not club_ids:
+            return jsonify({"success": True, "clubs": []}), 200
 
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
 
-        sql_select = """
+        # 2. 뽑힌 클럽만 PK 로 조회
+        format_strings = ','.join(['%s'] * len(club_ids))
+        sql = f"""
             SELECT 
-                id, name, description, sport, sido, sigungu, club_image_url,
-                (SELECT COUNT(*) FROM ClubMembers CM WHERE CM.club_id = C.id) AS member_count
+                id, name, description, sport, sido, sigungu, club_image_url, member_count
             FROM Clubs C
+            WHERE id IN ({format_strings})
         """
-        sql_where_clauses = []
-        params = []
-
-        if category:
-            sql_where_clauses.append("C.sport = %s")
-            params.append(category)
-
-        if sido:
-            sql_where_clauses.append("C.sido = %s")
-            params.append(sido)
-            if sigungu:
-                sql_where_clauses.append("C.sigungu = %s")
-                params.append(sigungu)
-            
-        if sql_where_clauses:
-            sql_where = " WHERE " + " AND ".join(sql_where_clauses)
-        else:
-            sql_where = ""
-            
-        sql_order = " ORDER BY RAND() LIMIT 10"
-        
-        cursor.execute(sql_select + sql_where + sql_order, tuple(params))
-        clubs = cursor.fetchall()
+        cursor.execute(sql, tuple(club_ids))
+        rows = {row['id']: row for row in cursor.fetchall()}
+
+        # 추출 순서 유지 (삭제된 클럽은 제외)
+        clubs = thumb_rows([rows[club_id] for club_id in club_ids if club_id in rows], 'club_image_url')
 
         return jsonify({"success": True, "clubs": clubs}), 200
 
@@ -218,7 +218,153 @@ def get_recommended_clubs():
         if conn and conn.is_connected(): conn.close()
 
 
+# ==========================================
+# 클럽 화면 섹션 조회 (Club Sections)
+# ==========================================
+# 개별 API 와 클럽 홈 통합 API(/api/club/<id>/home)가 같은 쿼리를 사용합니다.
+# cursor 는 dictionary=True, buffered=True 커서여야 합니다.
+
+def _fetch_club_info(cursor, club_id, user_db_id=None):
+    """
+    클럽 기본 정보 + 순위 + 내 권한. 클럽이 없으면 None.
+    """
+    # 1. 클럽 기본 정보 조회
+    sql = """
+        SELECT 
+            id, name, sport, sido, sigungu, description, max_capacity, club_image_url,
+            point, wins, draws, losses, member_count
+        FROM Clubs C
+        WHERE id = %s
+    """
+    cursor.execute(sql, (club_id,))
+    club = cursor.fetchone()
+    if not club:
+        return None
+
+    # 2. 내 권한 조회 (MEMBER / ADMIN / PENDING / NONE)
+    my_role = "NONE"
+    if user_db_id:
+        # (1) 이미 멤버인지 확인
+        cursor.execute("""
+            SELECT role FROM ClubMembers 
+            WHERE club_id = %s AND user_id = %s
+        """, (club_id, user_db_id))
+        member_row = cursor.fetchone()
+        
+        if member_row:
+            my_role = member_row['role']
+        else:
+            # (2) 가입 신청 대기 중인지 확인 (테이블 없을 경우 대비 try-except)
+            try:
+                cursor.execute("""
+                    SELECT id FROM ClubJoinRequests 
+                    WHERE club_id = %s AND user_id = %s
+                """, (club_id, user_db_id))
+                if cursor.fetchone():
+                    my_role = "PENDING"
+            except Exception:
+                pass # 테이블이 없으면 무시
+
+    # 3. 랭킹 계산 (동일 지역, 동일 종목 내 순위) - 사전 계산된 랭킹에서 이분 탐색
+    ranking = get_leaderboards().rank_of_point(club['point'], club['sport'], club['sido'], club['sigungu'])
+    
+    club['rank_text'] = f"Rank #{ranking}"
+    club['total_matches'] = club['wins'] + club['draws'] + club['losses']
+    club['my_role'] = my_role
+    return club
+
+
+def _fetch_club_schedules(cursor, club_id):
+    # 다가오는 일정 5개 조회
+    sql = """
+        SELECT id, title, description, location, schedule_date,
+               is_match, opponent_name, max_participants, current_participants
+        FROM Schedules 
+        WHERE club_id = %s AND schedule_date >= NOW()
+        ORDER BY schedule_date ASC 
+        LIMIT 5
+    """
+    cursor.execute(sql, (club_id,))
+    schedules = cursor.fetchall()
+    
+    # JSON 직렬화를 위해 datetime 변환
+    for s in schedules:
+        s['schedule_date'] = s['schedule_date'].strftime('%Y-%m-%d %H:%M:%S')
+    return schedules
+
+
+def _fetch_finished_matches(cursor, club_id):
+    # 최근 경기 결과 조회 (home/away 어느 쪽이든 이 클럽 기준 점수로 변환)
+    # schedule_date가 없으면 created_at을 대신 사용 (COALESCE)
+    rows = match_model.fetch_club_matches(
+        cursor, [club_id], (match_model.FINISHED,),
+        order_by="COALESCE(M.schedule_date, M.created_at) DESC", limit=5
+    )
+    matches = []
+    for row in rows:
+        view = match_model.side_view(row, match_model.side_of(row, [club_id]))
+        played_at = view['schedule_date'] or view['created_at']
+        matches.append({
+            "id": row['id'],
+            "my_score": view['my_score'],
+            "op_score": view['op_score'],
+            "match_date": played_at.strftime('%m월 %d일'),
+            "match_time": played_at.strftime('%H:%M'),
+            "opponent_name": view['opponent_name'],
+            "opponent_image": view['opponent_image'],
+        })
+    return thumb_rows(matches, 'opponent_image')
+
+
+def _fetch_club_posts(cursor, club_id):
+    sql = """
+        SELECT P.id, P.title, P.content, P.likes, P.image_url, P.created_at,
+               U.name as author_name,
+               P.comment_count
+        FROM Posts P
+        JOIN Users U ON P.user_id = U.id
+        WHERE P.club_id = %s
+        ORDER BY P.created_at DESC 
+        LIMIT 5
+    """
+    cursor.execute(sql, (club_id,))
+    posts = thumb_rows(cursor.fetchall(), 'image_url', variant='medium')
+    
+    for p in posts:
+        p['created_at'] = p['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+    return posts
+
+
+# 섹션 이름 -> (응답 키, 조회 함수)
+CLUB_HOME_SECTIONS = {
+    'info': ('club', None),   # 내 권한 조회가 필요하여 별도 처리
+    'schedules': ('schedules', _fetch_club_schedules),
+    'matches': ('matches', _fetch_finished_matches),
+    'posts': ('posts', _fetch_club_posts),
+}
+
+
+def _home_sections():
+    raw = request.args.get('sections')
+    if not raw:
+        return list(CLUB_HOME_SECTIONS)
+    return [name.strip() for name in raw.split(',') if name.strip()]
+
+
+def _select_fields(data, fields):
+    """
+    ?<section>_fields=a,b 로 요청한 필드만 남깁니다. (dict 또는 dict 리스트)
+    """
+    if not fields:
+        return data
+    keep = set(f.strip() for f in fields.split(','))
+    if isinstance(data, list):
+        return [{k: v for k, v in row.items() if k in keep} for row in data]
+    return {k: v for k, v in data.items() if k in keep}
+
+
 @clubs_bp.route("/api/club-info", methods=["GET"])
+@cached_response(lambda kw: [f"club:{request.args.get('club_id')}:info"], per_user=True)
 def get_club_info():
     conn = None
     cursor = None
@@ -231,65 +377,14 @@ def get_club_info():
         cursor = conn.cursor(dictionary=True, buffered=True)
 
         club_id = request.args.get('club_id')
-        user_id_str = session.get('user_id')
 
         if not club_id:
              return jsonify({"success": False, "error": "Club ID is required"}), 400
 
-        # 1. 클럽 기본 정보 조회
-        sql = """
-            SELECT 
-                id, name, sport, sido, sigungu, description, max_capacity, club_image_url,
-                point, wins, draws, losses,
-                (SELECT COUNT(*) FROM ClubMembers CM WHERE CM.club_id = C.id) AS member_count
-            FROM Clubs C
-            WHERE id = %s
-        """
-        cursor.execute(sql, (club_id,))
-        club = cursor.fetchone()
-
+        club = _fetch_club_info(cursor, club_id, get_session_user_db_id(cursor))
         if not club:
             return jsonify({"success": False, "error": "존재하지 않는 동호회"}), 404
 
-        # 2. 내 권한 조회 (MEMBER / ADMIN / PENDING / NONE)
-        my_role = "NONE"
-        if user_id_str:
-            # (1) 이미 멤버인지 확인
-            cursor.execute("""
-                SELECT role FROM ClubMembers 
-                WHERE club_id = %s 
-                  AND user_id = (SELECT id FROM Users WHERE user_id = %s)
-            """, (club_id, user_id_str))
-            member_row = cursor.fetchone()
-            
-            if member_row:
-                my_role = member_row['role']
-            else:
-                # (2) 가입 신청 대기 중인지 확인 (테이블 없을 경우 대비 try-except)
-                try:
-                    cursor.execute("""
-                        SELECT id FROM ClubJoinRequests 
-                        WHERE club_id = %s 
-                          AND user_id = (SELECT id FROM Users WHERE user_id = %s)
-                    """, (club_id, user_id_str))
-                    if cursor.fetchone():
-                        my_role = "PENDING"
-                except Exception:
-                    pass # 테이블이 없으면 무시
-
-        # 3. 랭킹 계산 (동일 지역, 동일 종목 내 순위)
-        sql_rank = """
-            SELECT COUNT(*) + 1 AS ranking
-            FROM Clubs
-            WHERE sido = %s AND sigungu = %s AND sport = %s AND point > %s
-        """
-        cursor.execute(sql_rank, (club['sido'], club['sigungu'], club['sport'], club['point']))
-        rank_result = cursor.fetchone()
-        
-        club['rank_text'] = f"Rank #{rank_result['ranking']}"
-        club['total_matches'] = club['wins'] + club['draws'] + club['losses']
-        club['my_role'] = my_role
-
         return jsonify({"success": True, "club": club}), 200
 
     except Exception as e:
@@ -301,40 +396,47 @@ def get_club_info():
 
 
 @clubs_bp.route("/api/ranking", methods=["GET"])
+@cached_response(lambda kw: [f"ranking:{request.args.get('sport')}"])
 def get_club_ranking():
     conn = None
     try:
         sido = request.args.get('sido')
         sigungu = request.args.get('sigungu')
         sport = request.args.get('sport')
+        page = max(request.args.get('page', 1, type=int), 1)
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 100)
+        offset = (page - 1) * limit
 
         if not sport:
              return jsonify({"success": False, "error": "종목을 선택해주세요."}), 400
 
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-
-        sql = """
-            SELECT id, name, club_image_url, point,
-                   RANK() OVER (ORDER BY point DESC) as ranking
-            FROM Clubs
-            WHERE sport = %s
-        """
-        params = [sport]
-
-        if sido:
-            sql += " AND sido = %s"
-            params.append(sido)
-        if sigungu:
-            sql += " AND sigungu = %s"
-            params.append(sigungu)
-
-        sql += " ORDER BY point DESC LIMIT 50"
-
-        cursor.execute(sql, tuple(params))
-        ranking_list = cursor.fetchall()
-
-        return jsonify({"success": True, "ranking": ranking_list}), 200
+        if sigungu and not sido:
+            # 시도 없이 시군구만 지정한 경우는 사전 계산 랭킹이 없으므로 DB 에서 직접 계산
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+
+            sql = """
+                SELECT id, name, club_image_url, point,
+                       RANK() OVER (ORDER BY point DESC) as ranking
+                FROM Clubs
+                WHERE sport = %s AND sigungu = %s
+                ORDER BY point DESC LIMIT %s OFFSET %s
+            """
+            cursor.execute(sql, (sport, sigungu, limit, offset))
+            ranking_list = thumb_rows(cursor.fetchall(), 'club_image_url')
+            return jsonify({"success": True, "ranking": ranking_list, "page": page}), 200
+
+        # 사전 계산된 지역 랭킹에서 구간 조회
+        total, ranking_list = get_leaderboards().page(sport, sido, sigungu, offset=offset, limit=limit)
+        thumb_rows(ranking_list, 'club_image_url')
+
+        return jsonify({
+            "success": True,
+            "ranking": ranking_list,
+            "page": page,
+            "total": total,
+            "has_more": offset + limit < total
+        }), 200
 
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -400,12 +502,9 @@ def create_schedule():
         cursor = conn.cursor()
         
         # 작성자 DB ID 조회
-        cursor.execute("SELECT id FROM Users WHERE user_id = %s", (session['user_id'],))
-        user_record = cursor.fetchone()
-        if not user_record:
+        author_id = get_session_user_db_id(cursor)
+        if not author_id:
             return jsonify({"success": False, "error": "사용자 불일치"}), 404
-        
-        author_id = user_record[0]
 
         sql = """
             INSERT INTO Schedules 
@@ -420,6 +519,14 @@ def create_schedule():
         
         cursor.execute(sql, val)
         conn.commit()
+        invalidate_club(data['club_id'], 'schedules')
+
+        # 클럽 멤버 전체에 일정 알림 (작성자 제외)
+        try:
+            notify_club(data['club_id'], 'SCHEDULE', "새 일정이 등록되었습니다", data['title'],
+                        data={"club_id": data['club_id']}, exclude_user_id=author_id)
+        except Exception as e:
+            current_app.logger.error(f"FCM Error (schedule): {e}")
         
         return jsonify({"success": True, "message": "일정이 등록되었습니다."}), 201
 
@@ -431,28 +538,14 @@ def create_schedule():
 
 
 @clubs_bp.route("/api/club/<int:club_id>/schedules", methods=["GET"])
+@cached_response(lambda kw: [f"club:{kw['club_id']}:schedules"])
 def get_club_schedules(club_id):
     conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
         
-        # 다가오는 일정 5개 조회
-        sql = """
-            SELECT id, title, description, location, schedule_date,
-                   is_match, opponent_name, max_participants, current_participants
-            FROM Schedules 
-            WHERE club_id = %s AND schedule_date >= NOW()
-            ORDER BY schedule_date ASC 
-            LIMIT 5
-        """
-        cursor.execute(sql, (club_id,))
-        schedules = cursor.fetchall()
-        
-        # JSON 직렬화를 위해 datetime 변환
-        for s in schedules:
-            s['schedule_date'] = s['schedule_date'].strftime('%Y-%m-%d %H:%M:%S')
-
+        schedules = _fetch_club_schedules(cursor, club_id)
         return jsonify({"success": True, "schedules": schedules}), 200
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -461,6 +554,7 @@ def get_club_schedules(club_id):
 
 
 @clubs_bp.route("/api/club/<int:club_id>/matches/finished", methods=["GET"])
+@cached_response(lambda kw: [f"club:{kw['club_id']}:matches"])
 def get_finished_matches(club_id):
     conn = None
     try:
@@ -468,25 +562,7 @@ def get_finished_matches(club_id):
         # 이전 쿼리 충돌 방지를 위해 buffered=True 필수
         cursor = conn.cursor(dictionary=True, buffered=True)
         
-        # 최근 경기 결과 조회
-        # schedule_date가 없으면 created_at을 대신 사용 (COALESCE)
-        sql = """
-            SELECT 
-                MQ.id, MQ.score_a as my_score, MQ.score_b as op_score, 
-                DATE_FORMAT(COALESCE(MQ.schedule_date, MQ.created_at), '%%m월 %%d일') as match_date,
-                DATE_FORMAT(COALESCE(MQ.schedule_date, MQ.created_at), '%%H:%%i') as match_time,
-                C.name as opponent_name,
-                C.club_image_url as opponent_image
-            FROM MatchQueue MQ
-            JOIN Clubs C ON MQ.matched_club_id = C.id
-            WHERE MQ.club_id = %s 
-              AND MQ.status = 'FINISHED'
-            ORDER BY COALESCE(MQ.schedule_date, MQ.created_at) DESC
-            LIMIT 5
-        """
-        cursor.execute(sql, (club_id,))
-        matches = cursor.fetchall()
-        
+        matches = _fetch_finished_matches(cursor, club_id)
         return jsonify({"success": True, "matches": matches}), 200
         
     except Exception as e:
@@ -496,29 +572,83 @@ def get_finished_matches(club_id):
         if conn and conn.is_connected(): conn.close()
 
 
+@clubs_bp.route("/api/club/<int:club_id>/rating-history", methods=["GET"])
+@cached_response(lambda kw: [f"club:{kw['club_id']}:rating"])
+def get_rating_history(club_id):
+    """
+    클럽 포인트 변경 이력 (최신순)
+    - from / to: 조회 기간 (YYYY-MM-DD 또는 ISO8601, 생략 시 전체)
+    - cursor: 이전 응답의 next_cursor
+    """
+    conn = None
+    try:
+        limit = min(max(request.args.get('limit', RATING_HISTORY_PAGE_SIZE, type=int), 1), RATING_HISTORY_PAGE_SIZE_MAX)
+        start, end = request.args.get('from'), request.args.get('to')
+        page_cursor = request.args.get('cursor')
+        try:
+            start_at, end_at = parse_range(start, end) if (start or end) else (None, None)
+            after = decode_cursor(page_cursor) if page_cursor else None
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+
+        history, next_cursor = fetch_history(cursor, club_id, start_at, end_at, after, limit)
+        return jsonify({"success": True, "history": history, "next_cursor": next_cursor,
+                        "has_more": next_cursor is not None}), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error fetching rating history: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        if conn and conn.is_connected(): conn.close()
+
+
+@clubs_bp.route("/api/club/<int:club_id>/rating-series", methods=["GET"])
+@cached_response(lambda kw: [f"club:{kw['club_id']}:rating"])
+def get_rating_series(club_id):
+    """
+    랭킹 화면 추이 그래프용 포인트 시계열 (구간별로 축약)
+    - from / to: 조회 기간 (생략 시 최근 RATING_SERIES_DAYS 일)
+    - points: 최대 구간 수
+    """
+    conn = None
+    try:
+        points = request.args.get('points', RATING_SERIES_POINTS, type=int)
+        try:
+            start_at, end_at = parse_range(request.args.get('from'), request.args.get('to'))
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+
+        cursor.execute("SELECT point FROM Clubs WHERE id = %s", (club_id,))
+        club = cursor.fetchone()
+        if not club:
+            return jsonify({"success": False, "error": "Club not found"}), 404
+
+        series = fetch_series(cursor, club_id, start_at, end_at, points)
+
+        return jsonify({"success": True, "current_point": club['point'], **series}), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error fetching rating series: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        if conn and conn.is_connected(): conn.close()
+
+
 @clubs_bp.route("/api/club/<int:club_id>/posts", methods=["GET"])
+@cached_response(lambda kw: [f"club:{kw['club_id']}:posts"])
 def get_club_posts(club_id):
     conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
         
-        sql = """
-            SELECT P.id, P.title, P.content, P.likes, P.image_url, P.created_at,
-                   U.name as author_name,
-                   0 as comment_count
-            FROM Posts P
-            JOIN Users U ON P.user_id = U.id
-            WHERE P.club_id = %s
-            ORDER BY P.created_at DESC 
-            LIMIT 5
-        """
-        cursor.execute(sql, (club_id,))
-        posts = cursor.fetchall()
-        
-        for p in posts:
-            p['created_at'] = p['created_at'].strftime('%Y-%m-%d %H:%M:%S')
-
+        posts = _fetch_club_posts(cursor, club_id)
         return jsonify({"success": True, "posts": posts}), 200
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -526,6 +656,47 @@ def get_club_posts(club_id):
         if conn and conn.is_connected(): conn.close()
 
 
+@clubs_bp.route("/api/club/<int:club_id>/home", methods=["GET"])
+@cached_response(lambda kw: [f"club:{kw['club_id']}:{name}" for name in _home_sections()], per_user=True)
+def get_club_home(club_id):
+    """
+    클럽 홈 화면 통합 조회 (정보 / 다가오는 일정 / 최근 경기 / 최근 게시글)
+    - ?sections=info,posts : 필요한 섹션만 조회 (기본 전체)
+    - ?info_fields=name,point : 섹션별 응답 필드 선택
+    하나의 커넥션에서 섹션 쿼리를 순서대로 실행합니다.
+    """
+    conn = None
+    cursor = None
+    try:
+        sections = _home_sections()
+        unknown = [name for name in sections if name not in CLUB_HOME_SECTIONS]
+        if unknown:
+            return jsonify({"success": False, "error": f"unknown sections: {','.join(unknown)}"}), 400
+
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+
+        result = {"success": True}
+        for name in sections:
+            key, fetch = CLUB_HOME_SECTIONS[name]
+            if name == 'info':
+                data = _fetch_club_info(cursor, club_id, get_session_user_db_id(cursor))
+                if not data:
+                    return jsonify({"success": False, "error": "존재하지 않는 동호회"}), 404
+            else:
+                data = fetch(cursor, club_id)
+            result[key] = _select_fields(data, request.args.get(f"{name}_fields"))
+
+        return jsonify(result), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error (get_club_home): {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        if cursor: cursor.close()
+        if conn and conn.is_connected(): conn.close()
+
+
 # ==========================================
 # 4. 가입 신청 및 관리 (Join Request)
 # ==========================================
@@ -539,15 +710,14 @@ def request_join_club():
 
         data = request.get_json()
         club_id = data.get('club_id')
-        user_str_id = session['user_id']
 
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
 
         # 1. 유저 PK 조회
-        cursor.execute("SELECT id FROM Users WHERE user_id = %s", (user_str_id,))
-        user_row = cursor.fetchone()
-        user_db_id = user_row['id']
+        user_db_id = get_session_user_db_id(cursor)
+        if not user_db_id:
+            return jsonify({"success": False, "error": "사용자 정보 없음"}), 404
 
         # 2. 중복 가입/신청 확인
         cursor.execute("SELECT * FROM ClubMembers WHERE club_id=%s AND user_id=%s", (club_id, user_db_id))
@@ -563,7 +733,14 @@ def request_join_club():
 
         # 3. 신청 등록
         cursor.execute("INSERT INTO ClubJoinRequests (club_id, user_id) VALUES (%s, %s)", (club_id, user_db_id))
+        request_id = cursor.lastrowid
         conn.commit()
+        invalidate_club(club_id, 'info')   # 신청자의 my_role -> PENDING
+
+        # 운영진에게 실시간 알림 (가입 신청 목록 갱신용)
+        events.publish_to_clubs(cursor, events.JOIN_REQUESTED, {
+            int(club_id): {"club_id": int(club_id), "request_id": request_id}
+        })
 
         return jsonify({"success": True, "message": "가입 신청이 완료되었습니다."}), 200
     except Exception as e:
@@ -590,7 +767,7 @@ def get_join_requests():
             ORDER BY R.created_at DESC
         """
         cursor.execute(sql, (club_id,))
-        requests = cursor.fetchall()
+        requests = thumb_rows(cursor.fetchall(), 'profile_image_url')
         
         return jsonify({"success": True, "requests": requests}), 200
     except Exception as e:
@@ -617,15 +794,23 @@ def process_join_request():
             return jsonify({"success": False, "error": "요청을 찾을 수 없습니다."}), 404
 
         if action == 'APPROVE':
-            # 멤버 추가
-            cursor.execute("INSERT INTO ClubMembers (club_id, user_id, role) VALUES (%s, %s, 'MEMBER')", 
-                           (req['club_id'], req['user_id']))
-            cursor.execute("UPDATE Clubs SET member_count = member_count + 1 WHERE id=%s", (req['club_id'],))
+            # 멤버 추가 (member_count 함께 갱신)
+            add_member(cursor, req['club_id'], req['user_id'], 'MEMBER')
             
         # 승인/거절 후 요청 내역 삭제
         cursor.execute("DELETE FROM ClubJoinRequests WHERE id=%s", (request_id,))
         
         conn.commit()
+        invalidate_club(req['club_id'], 'info')
+        if action == 'APPROVE':
+            invalidate('clubs_list')   # member_count
+            invalidate_user_dashboard(req['user_id'])
+
+        # 신청자에게 처리 결과 알림
+        event_type = events.JOIN_APPROVED if action == 'APPROVE' else events.JOIN_REJECTED
+        events.publish_to_users(cursor, event_type, [req['user_id']], {
+            "club_id": req['club_id'], "request_id": request_id
+        })
         return jsonify({"success": True, "message": "처리되었습니다."}), 200
     except Exception as e:
         if conn: conn.rollback()
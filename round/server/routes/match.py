@@ -1,13 +1,25 @@
 from flask import Blueprint, request, jsonify, session, current_app
 from utils.db import get_db_connection
+from utils.identity import get_session_user_db_id
+from utils.matchmaking import get_matchmaking_engine, db_queue_lock, fetch_waiting, QueueBusyError, MATCH_MODE
+from utils.leaderboard import get_leaderboards
 from extensions import socketio
 from utils.fcm import send_match_notification
-from utils.elo import calculate_new_ratings
+from utils import events
+from utils.images import thumb_rows
+from utils.response_cache import invalidate, invalidate_club
+from utils.dashboard import get_dashboard, invalidate_club_dashboards
+from utils import matches as match_model
+from utils.results import commit_result, APPLIED, ALREADY_APPLIED
 import mysql.connector
 import uuid
+from datetime import datetime
 
 match_bp = Blueprint('match', __name__)
 
+CHAT_PAGE_SIZE = 50       # 채팅 내역 기본 조회 개수
+CHAT_PAGE_SIZE_MAX = 200  # 요청 가능한 최대 개수
+
 # ==========================================
 # 1. FCM 토큰 관리 (FCM Token Update)
 # ==========================================
@@ -65,69 +77,126 @@ def request_match():
         pref_day = raw_day if raw_day in valid_days else 'ANY'
         pref_time = raw_time if raw_time in valid_times else 'ANY'
 
-        user_id_str = session['user_id']
         conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
+        cursor = conn.cursor(dictionary=True, buffered=True)
+        user_db_id = get_session_user_db_id(cursor)
         
-        # 1. 요청자 권한 확인 (운영진만 가능)
+        # 1. 요청자 권한 확인 (운영진만 가능) + 클럽 현재 점수
         cursor.execute("""
-            SELECT role FROM ClubMembers 
-            WHERE club_id = %s AND user_id = (SELECT id FROM Users WHERE user_id = %s)
-        """, (my_club_id, user_id_str))
+            SELECT CM.role, C.point FROM ClubMembers CM
+            JOIN Clubs C ON CM.club_id = C.id
+            WHERE CM.club_id = %s AND CM.user_id = %s
+        """, (my_club_id, user_db_id))
         member_row = cursor.fetchone()
         
         if not member_row:
             return jsonify({"success": False, "error": "Not a member"}), 403
         if member_row['role'] not in ['ADMIN', 'admin']:
             return jsonify({"success": False, "error": "Only admins can request match"}), 403
+        my_point = member_row['point'] if member_row['point'] is not None else 1000
 
-        # 2. 대기 중인 상대 찾기 (FIFO: 먼저 등록한 팀 우선)
+        # 2. 대기 중인 상대 찾기
         # 조건: 종목, 지역 일치 / 상태 WAITING / 내 클럽 제외
-        sql_find = """
-            SELECT id, club_id FROM MatchQueue 
-            WHERE sport = %s 
-              AND sido = %s 
-              AND status = 'WAITING' 
-              AND club_id != %s
-            ORDER BY created_at ASC 
-            LIMIT 1
-        """
-        cursor.execute(sql_find, (sport, sido, my_club_id))
-        opponent = cursor.fetchone()
+        # - scored: 점수 근접 + 같은 시군구 + 희망 요일/시간대 우선 (대기가 길수록 허용 점수 차 확대)
+        # - fifo: 먼저 등록한 팀 우선
+        # 메모리 대기열에서 후보를 꺼내고, 같은 (종목, 지역) 요청은 하나씩 처리하여 중복 매칭을 막습니다.
+        engine = get_matchmaking_engine()
+        engine.ensure_loaded(cursor)
+        my_entry = {
+            'club_id': int(my_club_id), 'sport': sport, 'sido': sido, 'sigungu': sigungu,
+            'point': my_point, 'preferred_day': pref_day, 'preferred_time': pref_time
+        }
 
-        if opponent:
-            # === 매칭 성사 ===
-            opponent_mq_id = opponent['id']
-            opponent_club_id = opponent['club_id']
-            
-            # 고유 Room ID 생성 (채팅방 구분용 UUID)
-            new_room_id = f"room_{uuid.uuid4()}"
-            
-            # (1) 상대방 상태 업데이트 (MATCHED & room_id 할당)
-            update_op = """
-                UPDATE MatchQueue 
-                SET status = 'MATCHED', matched_club_id = %s, room_id = %s
-                WHERE id = %s
-            """
-            cursor.execute(update_op, (my_club_id, new_room_id, opponent_mq_id))
-            
-            # (2) 나도 MATCHED 상태로 등록 (상세 정보 포함)
-            insert_me = """
-                INSERT INTO MatchQueue 
-                (club_id, sport, sido, sigungu, point, status, matched_club_id, room_id, preferred_day, preferred_time, socket_id)
-                VALUES (%s, %s, %s, %s, 1000, 'MATCHED', %s, %s, %s, %s, %s)
-            """
-            cursor.execute(insert_me, (
-                my_club_id, sport, sido, sigungu, opponent_club_id, new_room_id, pref_day, pref_time, socket_id
-            ))
-            
+        # 고유 Room ID 생성 (채팅방 구분용 UUID)
+        new_room_id = f"room_{uuid.uuid4()}"
+        opponent = None
+        candidate = None
+
+        # 같은 (종목, 지역) 요청은 워커 간에도 하나씩 처리 (대기 확인 ~ 등록 사이의 경쟁 방지)
+        with db_queue_lock(cursor, sport, sido), engine.lock(sport, sido):
+            # 락 대기 전 SELECT 로 열린 REPEATABLE READ 스냅샷을 닫아, 이후 조회가
+            # 락을 기다리는 동안 다른 워커가 커밋한 대기 행도 보도록 함 (아직 쓴 내용 없음)
             conn.commit()
-            
+            try:
+                while True:
+                    if MATCH_MODE == 'scored':
+                        candidate = engine.pop_best(sport, sido, my_entry)
+                    else:
+                        candidate = engine.pop_candidate(sport, sido, exclude_club_id=my_club_id)
+                    if candidate is None:
+                        break
+
+                    # (1) 상대방 대기 행을 대기열에서 제거
+                    # 다른 워커가 이미 가져간 행이면 rowcount 가 0 -> 다음 후보 확인
+                    cursor.execute("DELETE FROM MatchQueue WHERE id = %s AND status = 'WAITING'", (candidate['id'],))
+                    if cursor.rowcount == 1:
+                        opponent = candidate
+                        break
+                    candidate = None
+
+                if not opponent:
+                    # 메모리 대기열에 없으면 DB 대기 행 확인 (다른 워커가 등록, 아직 재동기화 전)
+                    for row in fetch_waiting(cursor, my_entry):
+                        cursor.execute("DELETE FROM MatchQueue WHERE id = %s AND status = 'WAITING'", (row['id'],))
+                        if cursor.rowcount == 1:
+                            opponent = row
+                            break
+
+                if opponent:
+                    # === 매칭 성사 ===
+                    # (2) 경기 1행 생성 (home: 대기하던 상대, away: 요청한 우리 클럽)
+                    match_model.create_match(
+                        cursor, new_room_id, opponent['club_id'], int(my_club_id), sport, sido, sigungu
+                    )
+                    conn.commit()
+                    # DB 에서 직접 찾은 상대는 이 워커의 메모리 대기열에도 남아 있을 수 있음
+                    engine.remove_club(opponent['club_id'])
+            except Exception:
+                # DB 반영 실패 시 꺼낸 상대를 대기열에 되돌림
+                if candidate: engine.restore(candidate)
+                raise
+
+            if not opponent:
+                # === 대기열 등록 (Waiting) ===
+                # 중복 등록 방지
+                if engine.is_waiting(int(my_club_id)):
+                    return jsonify({"success": False, "message": "이미 매칭 대기 중입니다."}), 400
+                cursor.execute("SELECT id FROM MatchQueue WHERE club_id=%s AND status='WAITING'", (my_club_id,))
+                if cursor.fetchone():
+                    return jsonify({"success": False, "message": "이미 매칭 대기 중입니다."}), 400
+
+                sql_wait = """
+                    INSERT INTO MatchQueue (club_id, sport, sido, sigungu, point, status, preferred_day, preferred_time, socket_id)
+                    VALUES (%s, %s, %s, %s, %s, 'WAITING', %s, %s, %s)
+                """
+                cursor.execute(sql_wait, (my_club_id, sport, sido, sigungu, my_point, pref_day, pref_time, socket_id))
+                conn.commit()
+
+                my_entry.update({'id': cursor.lastrowid, 'created_at': datetime.now()})
+                engine.enqueue(my_entry)
+
+        if opponent:
+            invalidate_club_dashboards(int(my_club_id), opponent['club_id'])
+
             # (3) 상대방 알림 발송
             try:
-                send_match_notification(opponent_club_id, new_room_id, "매칭 성사!")
+                send_match_notification(opponent['club_id'], new_room_id, "매칭 성사!")
             except Exception as e:
                 current_app.logger.error(f"FCM Error: {e}")
+
+            # (4) 양쪽 운영진에게 실시간 이벤트 (요청자는 응답으로 확인)
+            # 매칭은 이미 커밋되었으므로 실패해도 성공 응답 (재요청으로 중복 대기 등록되지 않도록)
+            try:
+                cursor.execute("SELECT id, name FROM Clubs WHERE id IN (%s, %s)", (my_club_id, opponent['club_id']))
+                names = {row['id']: row['name'] for row in cursor.fetchall()}
+                events.publish_to_clubs(cursor, events.MATCH_FOUND, {
+                    opponent['club_id']: {"match_id": new_room_id, "club_id": opponent['club_id'],
+                                          "opponent_name": names.get(int(my_club_id))},
+                    int(my_club_id): {"match_id": new_room_id, "club_id": int(my_club_id),
+                                      "opponent_name": names.get(opponent['club_id'])},
+                }, exclude_user_id=user_db_id)
+            except Exception as e:
+                current_app.logger.error(f"Match event error: {e}")
             
             return jsonify({
                 "success": True, 
@@ -136,22 +205,11 @@ def request_match():
                 "message": "매칭이 성사되었습니다!"
             }), 200
 
-        else:
-            # === 대기열 등록 (Waiting) ===
-            # 중복 등록 방지
-            cursor.execute("SELECT id FROM MatchQueue WHERE club_id=%s AND status='WAITING'", (my_club_id,))
-            if cursor.fetchone():
-                return jsonify({"success": False, "message": "이미 매칭 대기 중입니다."}), 400
-
-            sql_wait = """
-                INSERT INTO MatchQueue (club_id, sport, sido, sigungu, point, status, preferred_day, preferred_time, socket_id)
-                VALUES (%s, %s, %s, %s, 1000, 'WAITING', %s, %s, %s)
-            """
-            cursor.execute(sql_wait, (my_club_id, sport, sido, sigungu, pref_day, pref_time, socket_id))
-            conn.commit()
-            
-            return jsonify({"success": True, "status": "WAITING", "message": "매칭 대기열에 등록되었습니다."}), 200
+        return jsonify({"success": True, "status": "WAITING", "message": "매칭 대기열에 등록되었습니다."}), 200
 
+    except QueueBusyError as e:
+        current_app.logger.warning(f"Match Request Busy: {e}")
+        return jsonify({"success": False, "error": "매칭 요청이 많습니다. 잠시 후 다시 시도해 주세요."}), 503
     except Exception as e:
         if conn: conn.rollback()
         current_app.logger.error(f"Match Request Error: {e}")
@@ -166,18 +224,14 @@ def get_my_matches():
     try:
         if 'user_id' not in session:
              return jsonify({"success": False, "error": "로그인 필요"}), 401
-             
-        user_id_str = session['user_id']
         
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True, buffered=True)
 
         # 1. 유저 ID 및 가입된 클럽 조회
-        cursor.execute("SELECT id FROM Users WHERE user_id = %s", (user_id_str,))
-        user_row = cursor.fetchone()
-        if not user_row:
+        user_db_id = get_session_user_db_id(cursor)
+        if not user_db_id:
             return jsonify({"success": False, "error": "사용자 정보 없음"}), 404
-        user_db_id = user_row['id']
 
         cursor.execute("SELECT club_id FROM ClubMembers WHERE user_id = %s", (user_db_id,))
         my_club_rows = cursor.fetchall()
@@ -186,36 +240,25 @@ def get_my_matches():
              return jsonify({"success": True, "matches": []}), 200
 
         my_club_ids = [row['club_id'] for row in my_club_rows]
-        format_strings = ','.join(['%s'] * len(my_club_ids)) 
-
-        # 2. 매칭 목록 조회
-        # 내 클럽이 포함된 매칭(club_id IN ...)을 조회하면, 상대방 정보는 matched_club_id에 존재
-        sql = f"""
-            SELECT 
-                MQ.room_id as match_id,  -- UUID 방 번호
-                MQ.status, 
-                MQ.sport, 
-                MQ.sido, 
-                MQ.sigungu,
-                C.name as opponent_name,
-                C.club_image_url as opponent_image
-            FROM MatchQueue MQ
-            JOIN Clubs C ON MQ.matched_club_id = C.id
-            WHERE MQ.club_id IN ({format_strings}) 
-              AND MQ.status IN ('MATCHED', 'PENDING', 'FINISHED')
-            ORDER BY MQ.created_at DESC
-        """
-        cursor.execute(sql, tuple(my_club_ids))
-        rows = cursor.fetchall()
 
-        # 중복 제거 (혹시 모를 중복 room_id 방지)
-        unique_matches = {}
+        # 2. 매칭 목록 조회 (경기당 1행, 내 클럽 기준으로 상대 정보 변환)
+        rows = match_model.fetch_club_matches(
+            cursor, my_club_ids, (match_model.MATCHED, match_model.PENDING, match_model.FINISHED)
+        )
+        matches = []
         for row in rows:
-            m_id = row['match_id']
-            if m_id not in unique_matches:
-                unique_matches[m_id] = row
+            view = match_model.side_view(row, match_model.side_of(row, my_club_ids))
+            matches.append({
+                "match_id": view['match_id'],  # UUID 방 번호
+                "status": view['status'],
+                "sport": view['sport'],
+                "sido": view['sido'],
+                "sigungu": view['sigungu'],
+                "opponent_name": view['opponent_name'],
+                "opponent_image": view['opponent_image'],
+            })
         
-        return jsonify({"success": True, "matches": list(unique_matches.values())}), 200
+        return jsonify({"success": True, "matches": thumb_rows(matches, 'opponent_image')}), 200
     
     except Exception as e:
         current_app.logger.error(f"Server Error (get_my_matches): {e}")
@@ -228,6 +271,34 @@ def get_my_matches():
 # 3. 매칭 상세 및 결과 처리 (Detail & Result)
 # ==========================================
 
+@match_bp.route("/api/dashboard", methods=["GET"])
+def get_user_dashboard():
+    """
+    앱 시작 화면용 통합 조회: 내 클럽, 진행 중 매칭(상대 정보 + 마지막 메시지), 확인 대기 결과
+    뷰가 유효하면 마지막 메시지 조회 1회만 실행합니다.
+    """
+    conn = None
+    try:
+        if 'user_id' not in session:
+            return jsonify({"success": False, "error": "로그인 필요"}), 401
+
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+
+        user_db_id = get_session_user_db_id(cursor)
+        if not user_db_id:
+            return jsonify({"success": False, "error": "사용자 정보 없음"}), 404
+
+        dashboard = get_dashboard(cursor, user_db_id)
+        return jsonify({"success": True, **dashboard}), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error dashboard: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        if conn: conn.close()
+
+
 @match_bp.route("/api/match/detail", methods=["GET"])
 def get_match_detail():
     conn = None
@@ -235,7 +306,6 @@ def get_match_detail():
         if 'user_id' not in session:
              return jsonify({"success": False, "error": "로그인 필요"}), 401
         
-        user_id_str = session['user_id']
         room_id = request.args.get('match_id') # room_id (UUID)
         
         if not room_id:
@@ -245,36 +315,32 @@ def get_match_detail():
         cursor = conn.cursor(dictionary=True, buffered=True)
 
         # 1. 내 DB ID 조회
-        cursor.execute("SELECT id FROM Users WHERE user_id = %s", (user_id_str,))
-        user_row = cursor.fetchone()
-        if not user_row:
+        my_db_id = get_session_user_db_id(cursor)
+        if not my_db_id:
             return jsonify({"success": False, "error": "User not found"}), 404
-        my_db_id = user_row['id']
 
         # 2. 매칭 정보 조회 (내 클럽 기준)
-        # room_id가 같은 데이터 중, '내가 속한 클럽'이 club_id인 행을 찾습니다.
-        # 이렇게 하면 score_a는 항상 '내 점수', score_b는 '상대 점수'가 됩니다.
-        sql = """
-            SELECT MQ.status, MQ.score_a, MQ.score_b, MQ.proposer_id,
-                   C_OP.name as opponent_name
-            FROM MatchQueue MQ
-            JOIN ClubMembers CM ON MQ.club_id = CM.club_id
-            JOIN Clubs C_OP ON MQ.matched_club_id = C_OP.id
-            WHERE MQ.room_id = %s AND CM.user_id = %s
-            LIMIT 1
+        # 경기 행과 내가 속한 쪽(home/away)을 함께 찾아, 내 점수/상대 점수로 변환합니다.
+        sql = f"""
+            SELECT {match_model.MATCH_COLUMNS},
+                   (SELECT COUNT(*) FROM ClubMembers CM WHERE CM.club_id = M.home_club_id AND CM.user_id = %s) as in_home,
+                   (SELECT COUNT(*) FROM ClubMembers CM WHERE CM.club_id = M.away_club_id AND CM.user_id = %s) as in_away
+            {match_model.MATCH_FROM}
+            WHERE M.room_id = %s
         """
-        cursor.execute(sql, (room_id, my_db_id))
+        cursor.execute(sql, (my_db_id, my_db_id, room_id))
         match_info = cursor.fetchone()
         
-        if not match_info:
+        if not match_info or not (match_info['in_home'] or match_info['in_away']):
             return jsonify({"success": False, "error": "Match info not found or unauthorized"}), 404
 
+        view = match_model.side_view(match_info, 'home' if match_info['in_home'] else 'away')
         response_data = {
-            "status": match_info['status'],
-            "is_proposer": (match_info['proposer_id'] == my_db_id),
-            "my_score": match_info['score_a'],
-            "op_score": match_info['score_b'],
-            "opponent_name": match_info['opponent_name']
+            "status": view['status'],
+            "is_proposer": (view['proposer_id'] == my_db_id),
+            "my_score": view['my_score'],
+            "op_score": view['op_score'],
+            "opponent_name": view['opponent_name']
         }
 
         return jsonify({"success": True, "info": response_data}), 200
@@ -296,11 +362,15 @@ def update_schedule():
         location = data.get('location')
 
         conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = conn.cursor(dictionary=True)
 
-        # room_id를 공유하는 모든 행(나와 상대방)을 동시에 업데이트
-        cursor.execute("UPDATE MatchQueue SET schedule_date=%s, location=%s WHERE room_id=%s", (schedule_date, location, room_id))
+        # 경기 1행만 갱신
+        cursor.execute("UPDATE Matches SET schedule_date=%s, location=%s WHERE room_id=%s", (schedule_date, location, room_id))
         conn.commit()
+
+        match = match_model.get_match(cursor, room_id)
+        if match:
+            invalidate_club_dashboards(match['home_club_id'], match['away_club_id'])
         
         return jsonify({"success": True}), 200
     except Exception as e:
@@ -316,45 +386,49 @@ def propose_match_result():
     try:
         data = request.get_json()
         room_id = data.get('match_id')
-        user_id_str = session.get('user_id')
         score_my = int(data.get('score_my'))
         score_op = int(data.get('score_op'))
 
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True, buffered=True)
 
-        cursor.execute("SELECT id FROM Users WHERE user_id = %s", (user_id_str,))
-        proposer_db_id = cursor.fetchone()['id']
+        proposer_db_id = get_session_user_db_id(cursor)
+        if not proposer_db_id:
+            return jsonify({"success": False, "error": "로그인 필요"}), 401
+
+        # 1. 내 클럽 찾기 (이 경기에 참여 중인 내 클럽이 home 인지 away 인지)
+        match = match_model.get_match(cursor, room_id)
+        if not match:
+            return jsonify({"success": False, "error": "Match not found"}), 404
 
-        # 1. 내 클럽 ID 찾기 (이 room에 참여 중인 내 클럽)
         cursor.execute("""
-            SELECT MQ.club_id, MQ.matched_club_id 
-            FROM MatchQueue MQ
-            JOIN ClubMembers CM ON MQ.club_id = CM.club_id
-            WHERE MQ.room_id = %s AND CM.user_id = %s
-        """, (room_id, proposer_db_id))
-        row = cursor.fetchone()
+            SELECT club_id FROM ClubMembers WHERE user_id = %s AND club_id IN (%s, %s)
+        """, (proposer_db_id, match['home_club_id'], match['away_club_id']))
+        side = match_model.side_of(match, [row['club_id'] for row in cursor.fetchall()])
         
-        if not row:
+        if not side:
             return jsonify({"success": False, "error": "Unauthorized"}), 403
             
-        my_club_id = row['club_id']
-        op_club_id = row['matched_club_id']
+        view = match_model.side_view(match, side)
+        my_club_id = view['club_id']
+        op_club_id = view['opponent_club_id']
 
-        # 2. 점수 업데이트 (양쪽 행을 각각 업데이트)
-        # 내 행: score_a = 내 점수
-        cursor.execute("""
-            UPDATE MatchQueue SET status='PENDING', score_a=%s, score_b=%s, proposer_id=%s
-            WHERE room_id=%s AND club_id=%s
-        """, (score_my, score_op, proposer_db_id, room_id, my_club_id))
-
-        # 상대 행: score_a = 상대 점수 (반대)
-        cursor.execute("""
-            UPDATE MatchQueue SET status='PENDING', score_a=%s, score_b=%s, proposer_id=%s
-            WHERE room_id=%s AND club_id=%s
-        """, (score_op, score_my, proposer_db_id, room_id, op_club_id))
+        # 2. 점수 업데이트 (경기 1행, MATCHED 상태에서만)
+        home_score, away_score = match_model.scores_for(side, score_my, score_op)
+        if not match_model.transition(cursor, room_id, match_model.PENDING,
+                                      home_score=home_score, away_score=away_score, proposer_id=proposer_db_id):
+            conn.rollback()
+            return jsonify({"success": False, "error": "Result already proposed or finished"}), 409
 
         conn.commit()
+        invalidate_club_dashboards(my_club_id, op_club_id)
+
+        # 양쪽 운영진에게 결과 제안 알림 (점수는 수신 클럽 기준)
+        events.publish_to_clubs(cursor, events.RESULT_PROPOSED, {
+            op_club_id: {"match_id": room_id, "club_id": op_club_id, "score_my": score_op, "score_op": score_my},
+            my_club_id: {"match_id": room_id, "club_id": my_club_id, "score_my": score_my, "score_op": score_op},
+        }, exclude_user_id=proposer_db_id)
+
         return jsonify({"success": True, "message": "Proposed"}), 200
 
     except Exception as e:
@@ -376,69 +450,57 @@ def confirm_match_result():
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True, buffered=True)
 
+        match = match_model.get_match(cursor, room_id)
+        if not match:
+            return jsonify({"success": False, "error": "Match not found"}), 404
+
         # 거절 시: 상태와 점수 초기화
         if not is_accepted:
-            cursor.execute("""
-                UPDATE MatchQueue SET status='MATCHED', score_a=NULL, score_b=NULL, proposer_id=NULL
-                WHERE room_id=%s
-            """, (room_id,))
+            if not match_model.transition(cursor, room_id, match_model.MATCHED,
+                                          home_score=None, away_score=None, proposer_id=None):
+                conn.rollback()
+                return jsonify({"success": False, "error": "No pending result"}), 409
             conn.commit()
-            return jsonify({"success": True, "message": "Rejected"}), 200
-
-        # 승인 시: ELO 계산 및 FINISHED 처리
-        # 1. 내 클럽 기준 데이터 가져오기 (점수 계산용)
-        cursor.execute("SELECT club_id, matched_club_id, score_a, score_b, status FROM MatchQueue WHERE room_id=%s LIMIT 1", (room_id,))
-        record = cursor.fetchone()
-        
-        if not record or record['status'] == 'FINISHED':
-             return jsonify({"success": True, "message": "Already finished"}), 200
 
-        club_1 = record['club_id']
-        club_2 = record['matched_club_id']
-        score_1 = record['score_a']
-        score_2 = record['score_b']
-
-        # 2. 현재 포인트 조회
-        cursor.execute("SELECT id, point FROM Clubs WHERE id IN (%s, %s)", (club_1, club_2))
-        clubs = {row['id']: row for row in cursor.fetchall()}
-        
-        rating_1 = clubs[club_1]['point']
-        rating_2 = clubs[club_2]['point']
-
-        # 3. 승패 판정 (Club 1 기준)
-        actual_1 = 0.5
-        if score_1 > score_2: actual_1 = 1.0
-        elif score_1 < score_2: actual_1 = 0.0
-        
-        new_1, new_2 = calculate_new_ratings(rating_1, rating_2, actual_1)
-        
-        # 4. DB 업데이트 (승무패 기록 및 점수)
-        actual_2 = 1.0 - actual_1
-        
-
-        sql_update = """
-            UPDATE Clubs SET point=%s, 
-                wins=wins+%s, losses=losses+%s, draws=draws+%s 
-            WHERE id=%s
-        """
-        # Club 1
-        cursor.execute(sql_update, (
-            new_1, 
-            1 if actual_1 == 1.0 else 0, 1 if actual_1 == 0.0 else 0, 1 if actual_1 == 0.5 else 0, 
-            club_1
-        ))
-        # Club 2
-        cursor.execute(sql_update, (
-            new_2, 
-            1 if actual_2 == 1.0 else 0, 1 if actual_2 == 0.0 else 0, 1 if actual_2 == 0.5 else 0, 
-            club_2
-        ))
-        
-
-        cursor.execute("UPDATE MatchQueue SET status='FINISHED' WHERE room_id=%s", (room_id,))
+            club_ids = [match['home_club_id'], match['away_club_id']]
+            invalidate_club_dashboards(*club_ids)
+            events.publish_to_clubs(cursor, events.RESULT_REJECTED, {
+                club_id: {"match_id": room_id, "club_id": club_id} for club_id in club_ids
+            })
+            return jsonify({"success": True, "message": "Rejected"}), 200
 
-        conn.commit()
-        current_app.logger.info(f"Match Finished! Club {club_1}: {rating_1}->{new_1}, Club {club_2}: {rating_2}->{new_2}")
+        # 승인 시: 경기/클럽 행을 잠그고 ELO 반영 + 이력 기록 + FINISHED 처리 (한 트랜잭션)
+        status, result = commit_result(conn, room_id)
+        if status == ALREADY_APPLIED:
+            return jsonify({"success": True, "message": "Already finished"}), 200
+        if status != APPLIED:
+            return jsonify({"success": False, "error": "No pending result"}), 409
+
+        home, away = result['sides']
+        club_1, club_2 = home['club_id'], away['club_id']
+        current_app.logger.info(
+            f"Match Finished! Club {club_1}: {home['point_before']}->{home['point_after']}, "
+            f"Club {club_2}: {away['point_before']}->{away['point_after']}"
+        )
+
+        # 지역 랭킹 증분 갱신
+        leaderboards = get_leaderboards()
+        for side in result['sides']:
+            leaderboards.update_point(side['club_id'], side['point_after'])
+
+        # 클럽 정보(점수/전적), 최근 경기, 포인트 이력, 랭킹 캐시 무효화
+        for club_id in (club_1, club_2):
+            invalidate_club(club_id, 'info', 'matches', 'rating')
+        invalidate_club_dashboards(club_1, club_2)
+        invalidate(f"ranking:{result['sport']}")
+
+        # 양쪽 운영진에게 결과 확정 알림 (상태/점수 재조회 불필요)
+        events.publish_to_clubs(cursor, events.RESULT_CONFIRMED, {
+            side['club_id']: {"match_id": room_id, "club_id": side['club_id'],
+                              "score_my": side['score_my'], "score_op": side['score_op'],
+                              "point": side['point_after'], "point_delta": side['point_after'] - side['point_before']}
+            for side in result['sides']
+        })
 
         return jsonify({"success": True, "message": "Confirmed"}), 200
 
@@ -456,21 +518,52 @@ def confirm_match_result():
 
 @match_bp.route("/api/chat/history", methods=["GET"])
 def get_chat_history():
+    """
+    채팅 내역 조회 (항상 오래된 순으로 반환)
+    - 기본: 최신 limit 개
+    - before_id: 해당 메시지 이전 limit 개 (위로 스크롤)
+    - after_id / since_id: 해당 메시지 이후 limit 개 (재접속 시 놓친 메시지만)
+    """
     conn = None
     try:
         room_id = request.args.get('match_id')
+        limit = min(max(request.args.get('limit', CHAT_PAGE_SIZE, type=int), 1), CHAT_PAGE_SIZE_MAX)
+        before_id = request.args.get('before_id', type=int)
+        after_id = request.args.get('after_id', type=int)
+        if after_id is None:
+            after_id = request.args.get('since_id', type=int)
+
+        if not room_id:
+            return jsonify({"success": False, "error": "match_id required"}), 400
+
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
         
         sql = """
-            SELECT CM.message, U.user_id as sender_id, CM.created_at
+            SELECT CM.id, CM.message, U.user_id as sender_id, CM.created_at
             FROM ChatMessages CM
             JOIN Users U ON CM.user_id = U.id
             WHERE CM.match_id = %s
-            ORDER BY CM.created_at ASC
         """
-        cursor.execute(sql, (room_id,))
+        params = [room_id]
+
+        if after_id is not None:
+            sql += " AND CM.id > %s ORDER BY CM.id ASC LIMIT %s"
+            params.extend([after_id, limit + 1])
+        elif before_id is not None:
+            sql += " AND CM.id < %s ORDER BY CM.id DESC LIMIT %s"
+            params.extend([before_id, limit + 1])
+        else:
+            sql += " ORDER BY CM.id DESC LIMIT %s"
+            params.append(limit + 1)
+
+        cursor.execute(sql, tuple(params))
         messages = cursor.fetchall()
+
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if after_id is None:
+            messages.reverse()  # 최신순으로 가져온 경우 오래된 순으로 정렬
         
         # Python에서 시간 포맷팅 변환 (%% 이슈 방지)
         for msg in messages:
@@ -479,8 +572,8 @@ def get_chat_history():
             else:
                 msg['time'] = ''
         
-        return jsonify({"success": True, "messages": messages}), 200
+        return jsonify({"success": True, "messages": messages, "has_more": has_more}), 200
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
     finally:
-        if conn: conn.close()
\ No newline at end of file
+        if conn: conn.close()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 서버 코드는 round/server 를 작업 디렉터리로 두고 `utils.xxx` 로 import 합니다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
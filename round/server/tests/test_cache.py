@@ -0,0 +1,27 @@
+from utils.cache import TTLCache
+
+
+def test_get_set_delete():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    cache.delete('a')
+    assert cache.get('a', 'missing') == 'missing'
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_expired_entry_is_a_miss():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set('a', 1, ttl=-1)
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')          # b 가 가장 오래 사용하지 않은 항목
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
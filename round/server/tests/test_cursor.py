@@ -0,0 +1,35 @@
+import base64
+from datetime import datetime
+
+import pytest
+
+from utils.cursor import encode_cursor, decode_cursor
+
+
+def _token(raw):
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+@pytest.mark.parametrize('created_at, row_id', [
+    (datetime(2026, 3, 1, 12, 30, 5), 42),
+    (datetime(2026, 3, 1, 12, 30, 5, 123456), 1),
+    (datetime(1970, 1, 1), 999999999),
+])
+def test_round_trip(created_at, row_id):
+    token = encode_cursor(created_at, row_id)
+    assert '=' not in token
+    assert decode_cursor(token) == (created_at, row_id)
+
+
+@pytest.mark.parametrize('token', [
+    '',
+    'not base64!',
+    _token('v1|2026-03-01T12:30:05'),          # id 누락
+    _token('v1|2026-03-01T12:30:05|abc'),      # id 가 정수가 아님
+    _token('v1|yesterday|3'),                  # 시각 형식 오류
+    _token('v2|2026-03-01T12:30:05|3'),        # 지원하지 않는 버전
+    _token('v1|2026-03-01T12:30:05|3|extra'),
+])
+def test_rejects_bad_input(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
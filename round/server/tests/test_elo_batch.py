@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+pytest.importorskip('numpy')
+pytest.importorskip('mysql.connector')   # utils.elo_batch -> utils.db
+from utils.elo import calculate_new_ratings  # noqa: E402
+from utils.elo_batch import replay_ratings, parse_k_schedule, DEFAULT_RATING  # noqa: E402
+
+
+def _sequential(club_ids, matches, k_schedule):
+    # 라이브 결과 확정과 같은 방식: 경기마다 calculate_new_ratings 를 순서대로 적용
+    ratings = {c: DEFAULT_RATING for c in club_ids}
+    games = {c: 0 for c in club_ids}
+    record = {c: {'wins': 0, 'losses': 0, 'draws': 0} for c in club_ids}
+
+    def k_for(club_id):
+        return [k for g, k in k_schedule if g <= games[club_id]][-1]
+
+    for a, b, score_a, score_b in matches:
+        actual = 1.0 if score_a > score_b else 0.0 if score_a < score_b else 0.5
+        new_a, _ = calculate_new_ratings(ratings[a], ratings[b], actual, k_for(a))
+        _, new_b = calculate_new_ratings(ratings[a], ratings[b], actual, k_for(b))
+        ratings[a], ratings[b] = new_a, new_b
+        games[a] += 1
+        games[b] += 1
+        for club_id, result in ((a, actual), (b, 1 - actual)):
+            key = 'wins' if result == 1 else 'losses' if result == 0 else 'draws'
+            record[club_id][key] += 1
+    return {c: dict(record[c], point=ratings[c]) for c in club_ids}
+
+
+def _random_matches(club_ids, n, seed):
+    rng = random.Random(seed)
+    matches = []
+    for _ in range(n):
+        a, b = rng.sample(club_ids, 2)
+        matches.append((a, b, rng.randint(0, 4), rng.randint(0, 4)))
+    return matches
+
+
+@pytest.mark.parametrize('schedule', ['0:32', '0:40,3:32,10:24'])
+def test_replay_matches_sequential_elo(schedule):
+    club_ids = list(range(1, 13))
+    matches = _random_matches(club_ids, 300, seed=7)
+    k_schedule = parse_k_schedule(schedule)
+    assert replay_ratings(club_ids, matches, k_schedule) == _sequential(club_ids, matches, k_schedule)
+
+
+def test_unknown_clubs_are_skipped_and_idle_clubs_reset():
+    result = replay_ratings([1, 2, 3], [(1, 2, 2, 0), (1, 99, 5, 0)])
+    assert result[3] == {'point': DEFAULT_RATING, 'wins': 0, 'losses': 0, 'draws': 0}
+    assert result[1]['wins'] == 1 and result[2]['losses'] == 1
+
+
+def test_parse_k_schedule():
+    assert parse_k_schedule('30:32,0:40') == [(0, 40.0), (30, 32.0)]
+    with pytest.raises(ValueError):
+        parse_k_schedule('10:32')
@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip('firebase_admin')
+pytest.importorskip('flask')
+pytest.importorskip('mysql.connector')   # utils.fcm -> utils.db
+from utils.fcm import NotificationDispatcher, FakeTransport, _Job  # noqa: E402
+
+
+def _job(token, title, collapse_key=None):
+    return _Job(token, title, 'body', None, collapse_key)
+
+
+def test_coalesce_keeps_latest_per_token_and_key():
+    dispatcher = NotificationDispatcher(transport=FakeTransport(), workers=1)
+    batch = [
+        _job('t1', 'chat 1', 'chat:room-a'),
+        _job('t1', 'chat 2', 'chat:room-a'),
+        _job('t1', 'other room', 'chat:room-b'),
+        _job('t2', 'chat 3', 'chat:room-a'),
+        _job('t1', 'chat 4', 'chat:room-a'),
+    ]
+    titles = sorted(job.title for job in dispatcher._coalesce(batch))
+    assert titles == ['chat 3', 'chat 4', 'other room']
+    assert dispatcher.stats['coalesced'] == 2
+
+
+def test_jobs_without_collapse_key_are_never_merged():
+    dispatcher = NotificationDispatcher(transport=FakeTransport(), workers=1)
+    batch = [_job('t1', 'match found'), _job('t1', 'match found'), _job('t1', 'result')]
+    assert len(dispatcher._coalesce(batch)) == 3
+    assert dispatcher.stats['coalesced'] == 0
+
+
+def test_submitted_notifications_are_sent():
+    transport = FakeTransport(fail_tokens=['bad'])
+    dispatcher = NotificationDispatcher(transport=transport, workers=1)
+    assert dispatcher.submit_many(['t1', 't2', 'bad', None], 'title', 'body', {'type': 'X'}) == 3
+    dispatcher.stop()
+    assert sorted(msg.token for msg in transport.sent) == ['t1', 't2']
+    assert dispatcher.stats['sent'] == 2 and dispatcher.stats['failed'] == 1
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+from utils.matchmaking import MatchmakingEngine
+
+NOW = datetime(2026, 5, 1, 12, 0)
+KEY = ('soccer', 'Seoul')
+
+
+def _entry(entry_id, club_id, point, sport='soccer', sido='Seoul', sigungu='Gangnam', waited=0):
+    return {
+        'id': entry_id, 'club_id': club_id, 'sport': sport, 'sido': sido, 'sigungu': sigungu,
+        'point': point, 'preferred_day': None, 'preferred_time': None,
+        'created_at': NOW - timedelta(seconds=waited),
+    }
+
+
+def _assert_consistent(engine):
+    # 점수 인덱스는 대기열 항목과 정확히 같은 (point, id, club_id) 집합이어야 함
+    for key, queue in engine._queues.items():
+        index = engine._rating_index.get(key, [])
+        assert index == sorted(index)
+        assert index == sorted(engine._rating_key(e) for e in queue.values())
+        for club_id in queue:
+            assert engine._club_index[club_id] == key
+    assert set(engine._club_index) == {c for q in engine._queues.values() for c in q}
+
+
+def _engine(*entries):
+    engine = MatchmakingEngine(resync=0)
+    for entry in entries:
+        engine.enqueue(entry)
+    return engine
+
+
+def test_pop_best_picks_closest_rating():
+    engine = _engine(_entry(1, 10, 1000), _entry(2, 20, 1200), _entry(3, 30, 1060))
+    best = engine.pop_best(*KEY, _entry(9, 90, 1050), now=NOW)
+    assert best['club_id'] == 30
+    assert not engine.is_waiting(30)
+    _assert_consistent(engine)
+
+
+def test_pop_best_excludes_requester_and_out_of_window():
+    engine = _engine(_entry(1, 10, 1000), _entry(2, 20, 1900))
+    assert engine.pop_best(*KEY, _entry(9, 10, 1000), now=NOW) is None
+    assert engine.pop_best(*KEY, _entry(9, 90, 1300), now=NOW) is None
+    _assert_consistent(engine)
+
+
+def test_restore_returns_candidate_to_front():
+    engine = _engine(_entry(1, 10, 1000), _entry(2, 20, 1000))
+    taken = engine.pop_best(*KEY, _entry(9, 90, 1000), now=NOW)
+    engine.restore(taken)
+    _assert_consistent(engine)
+    assert list(engine._queues[KEY]) == [taken['club_id'], 20 if taken['club_id'] == 10 else 10]
+    assert engine.pop_best(*KEY, _entry(9, 90, 1000), now=NOW)['club_id'] == taken['club_id']
+
+
+def test_restore_keeps_newer_entry():
+    engine = _engine(_entry(1, 10, 1000))
+    taken = engine.pop_best(*KEY, _entry(9, 90, 1000), now=NOW)
+    engine.enqueue(_entry(5, 10, 1100))      # 그 사이 다시 등록
+    engine.restore(taken)
+    _assert_consistent(engine)
+    assert engine._queues[KEY][10]['id'] == 5
+
+
+def test_enqueue_replaces_existing_entry():
+    engine = _engine(_entry(1, 10, 1000))
+    engine.enqueue(_entry(2, 10, 1400))
+    _assert_consistent(engine)
+    assert engine._rating_index[KEY] == [(1400, 2, 10)]
+    assert engine.pop_best(*KEY, _entry(9, 90, 1000), now=NOW) is None
+
+
+def test_remove_club_and_pop_candidate():
+    engine = _engine(_entry(1, 10, 1000), _entry(2, 20, 1100), _entry(3, 30, 900))
+    assert engine.remove_club(20)['id'] == 2
+    assert engine.remove_club(20) is None
+    assert engine.pop_candidate(*KEY, exclude_club_id=10)['club_id'] == 30
+    _assert_consistent(engine)
+    assert engine.stats() == {'queues': 1, 'waiting': 1}
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from utils.rating_history import parse_range
+
+
+def test_date_only_end_includes_whole_day():
+    start_at, end_at = parse_range('2026-01-01', '2026-01-31')
+    assert start_at == datetime(2026, 1, 1)
+    assert end_at == datetime(2026, 2, 1)
+
+
+def test_datetime_end_is_exact():
+    _, end_at = parse_range('2026-01-01', '2026-01-31T18:00:00')
+    assert end_at == datetime(2026, 1, 31, 18)
+
+
+def test_offset_converted_to_naive_local_time():
+    start_at, end_at = parse_range('2026-01-01T09:00:00+09:00', '2026-01-02T00:00:00Z')
+    expected_start = datetime(2026, 1, 1, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    expected_end = datetime(2026, 1, 2, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    assert (start_at, end_at) == (expected_start, expected_end)
+    assert start_at.tzinfo is None and end_at.tzinfo is None
+
+
+def test_mixed_naive_and_aware_bounds_compare():
+    # 오프셋이 있는 값과 없는 값을 섞어도 비교에서 TypeError 가 나지 않음
+    start_at, end_at = parse_range('2026-01-01', '2026-01-10T00:00:00+00:00')
+    assert start_at < end_at
+
+
+def test_default_start():
+    start_at, end_at = parse_range(None, '2026-01-31', default_days=30)
+    assert end_at == datetime(2026, 2, 1)
+    assert start_at == end_at - timedelta(days=30)
+
+
+@pytest.mark.parametrize('start, end', [
+    ('2026-01-31T00:00:00', '2026-01-01T00:00:00'),
+    ('2026-01-01T00:00:00', '2026-01-01T00:00:00'),
+    ('2026-01-02', '2026-01-01'),
+])
+def test_start_must_be_before_end(start, end):
+    with pytest.raises(ValueError):
+        parse_range(start, end)
+
+
+def test_invalid_format():
+    with pytest.raises(ValueError):
+        parse_range('last week', None)
@@ -0,0 +1,56 @@
+import pytest
+
+flask = pytest.importorskip('flask')
+from utils import response_cache  # noqa: E402
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(response_cache, 'RESPONSE_CACHE_ENABLED', True)
+    response_cache._cache.clear()
+    app = flask.Flask(__name__)
+    app.secret_key = 'test'
+    calls = []
+
+    @app.route('/club/<int:club_id>')
+    @response_cache.cached_response(tags=lambda kw: [f"club:{kw['club_id']}:info", 'clubs_list'])
+    def club_info(club_id):
+        calls.append(club_id)
+        return flask.jsonify({'club_id': club_id, 'calls': len(calls)})
+
+    client = app.test_client()
+    client.calls = calls
+    return client
+
+
+def test_cached_until_tag_invalidated(client):
+    first = client.get('/club/1')
+    assert client.get('/club/1').get_json() == first.get_json()
+    assert client.calls == [1]
+
+    response_cache.invalidate_club(2, 'info')       # 다른 클럽의 무효화는 영향 없음
+    client.get('/club/1')
+    assert client.calls == [1]
+
+    response_cache.invalidate_club(1, 'info')
+    assert client.get('/club/1').get_json()['calls'] == 2
+    assert client.calls == [1, 1]
+
+
+def test_shared_tag_invalidates_every_entry(client):
+    client.get('/club/1')
+    client.get('/club/2')
+    response_cache.invalidate('clubs_list')
+    client.get('/club/1')
+    client.get('/club/2')
+    assert client.calls == [1, 2, 1, 2]
+
+
+def test_conditional_get(client):
+    etag = client.get('/club/1').headers['ETag']
+    assert client.get('/club/1', headers={'If-None-Match': etag}).status_code == 304
+
+    response_cache.invalidate_club(1, 'info')
+    response = client.get('/club/1', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
@@ -0,0 +1,216 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+import mysql.connector
+from extensions import socketio
+from utils.db import db_connection
+from utils.identity import resolve_user_db_ids
+
+# ==========================================
+# 채팅 저장 (Write-behind Chat Persistence)
+# ==========================================
+# send_message 핸들러가 DB 조회/INSERT/커밋을 기다리지 않고 바로 브로드캐스트하도록,
+# 메시지를 프로세스 내 큐에 넣고 백그라운드 스레드가 모아서 저장합니다.
+# - 저장(커밋)이 끝난 메시지만 방에 'new_message' 로 브로드캐스트: DB 가 준 id / created_at 을 함께 보내
+#   클라이언트가 마지막 id 로 /api/chat/history?after_id= 재동기화 가능 (워커 간 시계 차이와 무관한 순서)
+# - CHAT_FLUSH_SIZE 개가 모이거나 CHAT_FLUSH_INTERVAL 초가 지나면 다중 행 INSERT 1회
+# - 큐가 가득 차면 CHAT_ENQUEUE_TIMEOUT 동안 대기(백프레셔) 후, 그래도 가득이면 직접 저장
+# - 프로세스 종료 시 남은 메시지를 모두 저장
+# - 일시적 오류는 배치 전체를 재시도, 행 데이터 오류(NULL/길이 초과 등)는 배치를 나눠 문제 행만 버림
+
+CHAT_QUEUE_SIZE = int(os.environ.get('CHAT_QUEUE_SIZE', 10000))
+CHAT_FLUSH_SIZE = int(os.environ.get('CHAT_FLUSH_SIZE', 200))
+CHAT_FLUSH_INTERVAL = float(os.environ.get('CHAT_FLUSH_INTERVAL', 0.2))    # 초
+CHAT_ENQUEUE_TIMEOUT = float(os.environ.get('CHAT_ENQUEUE_TIMEOUT', 0.5))  # 초
+CHAT_FLUSH_RETRIES = int(os.environ.get('CHAT_FLUSH_RETRIES', 3))
+
+logger = logging.getLogger(__name__)
+
+# created_at 은 DB 기본값(CURRENT_TIMESTAMP, migrations/009)으로 기록
+_SQL_INSERT = "INSERT INTO ChatMessages (match_id, user_id, message) VALUES (%s, %s, %s)"
+
+# 재시도해도 같은 결과인 행 단위 오류
+_ROW_ERRORS = (mysql.connector.DataError, mysql.connector.IntegrityError)
+
+
+class ChatWriter:
+    """
+    채팅 메시지 write-behind 큐와 백그라운드 저장 스레드
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=CHAT_QUEUE_SIZE)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.pid = None
+        self._stats_lock = threading.Lock()
+        self.stats = {'enqueued': 0, 'written': 0, 'dropped': 0, 'sync_writes': 0, 'flushes': 0, 'errors': 0,
+                      'broadcast_errors': 0}
+
+    def _count(self, **deltas):
+        # 요청 스레드(submit)와 저장 스레드가 함께 갱신
+        with self._stats_lock:
+            for key, value in deltas.items():
+                self.stats[key] += value
+
+    def get_stats(self):
+        with self._stats_lock:
+            return dict(self.stats)
+
+    # ----- 생명주기 -----
+
+    def _ensure_started(self):
+        # Gunicorn fork 이후 워커마다 자체 스레드를 가지도록 pid 기준으로 시작
+        if self._thread is not None and self.pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='chat-writer', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        """
+        남은 메시지를 모두 저장하고 스레드를 종료합니다.
+        """
+        if self._thread is None or self.pid != os.getpid():
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    # ----- 생산자 -----
+
+    def submit(self, room, user_id_str, message):
+        """
+        저장할 메시지를 큐에 넣습니다. 가득 찬 경우 잠시 대기 후 직접 저장합니다.
+        브로드캐스트는 저장 후 _write 에서 수행합니다.
+        """
+        self._ensure_started()
+        item = (room, user_id_str, message)
+        try:
+            self._queue.put(item, timeout=CHAT_ENQUEUE_TIMEOUT)
+            self._count(enqueued=1)
+        except queue.Full:
+            self._count(sync_writes=1)
+            logger.warning("Chat write queue full, writing synchronously")
+            # 소켓 핸들러로 예외가 번지지 않도록 삼킴
+            try:
+                self._write([item])
+            except Exception as e:
+                self._count(errors=1, dropped=1)
+                logger.error(f"Chat sync write failed, dropped message (room {room}): {e}")
+
+    # ----- 소비자 -----
+
+    def _drain(self, batch):
+        while len(batch) < CHAT_FLUSH_SIZE:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = []
+            deadline = time.monotonic() + CHAT_FLUSH_INTERVAL
+            # 첫 메시지를 기다린 뒤, 주기가 끝나거나 배치가 찰 때까지 모음
+            while len(batch) < CHAT_FLUSH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                self._drain(batch)
+            if batch:
+                self._write_with_retry(batch)
+
+    def _write_with_retry(self, batch):
+        for attempt in range(CHAT_FLUSH_RETRIES):
+            try:
+                self._write(batch)
+                return
+            except _ROW_ERRORS as e:
+                self._count(errors=1)
+                if len(batch) == 1:
+                    room, user_id_str = batch[0][0], batch[0][1]
+                    self._count(dropped=1)
+                    logger.error(f"Dropped invalid chat message (room {room}, user {user_id_str}): {e}")
+                    return
+                # 잘못된 행 하나 때문에 배치 전체가 실패: 반으로 나눠 다시 저장
+                mid = len(batch) // 2
+                self._write_with_retry(batch[:mid])
+                self._write_with_retry(batch[mid:])
+                return
+            except Exception as e:
+                self._count(errors=1)
+                logger.error(f"Chat flush error (attempt {attempt + 1}): {e}")
+                time.sleep(min(0.5 * (2 ** attempt), 5))
+        self._count(dropped=len(batch))
+        logger.error(f"Chat flush failed, dropped {len(batch)} messages")
+
+    def _write(self, batch):
+        """
+        사용자 PK 를 한 번에 변환한 뒤 다중 행 INSERT 로 저장하고, 커밋 후 브로드캐스트합니다.
+        """
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                user_ids = resolve_user_db_ids(cursor, [item[1] for item in batch])
+                rows = []
+                senders = []
+                for room, user_id_str, message in batch:
+                    user_db_id = user_ids.get(user_id_str)
+                    if user_db_id is None:
+                        logger.warning(f"User not found for chat: {user_id_str}")
+                        continue
+                    rows.append((room, user_db_id, message))
+                    senders.append(user_id_str)
+
+                stored = []
+                if rows:
+                    # executemany 는 INSERT ... VALUES 를 한 문장의 다중 행 INSERT 로 보내므로
+                    # lastrowid 는 첫 행의 id 이고, 한 문장의 AUTO_INCREMENT 값은 연속으로 할당됨
+                    cursor.executemany(_SQL_INSERT, rows)
+                    first_id = cursor.lastrowid
+                    cursor.execute("SELECT id, created_at FROM ChatMessages WHERE id BETWEEN %s AND %s ORDER BY id",
+                                   (first_id, first_id + len(rows) - 1))
+                    stored = cursor.fetchall()
+                    conn.commit()
+                self._count(written=len(rows), flushes=1)
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+        # 저장은 끝났으므로 전송 실패로 _write_with_retry 가 다시 INSERT 하지 않도록 여기서 처리
+        for (room, _, message), sender, (message_id, created_at) in zip(rows, senders, stored):
+            try:
+                socketio.emit('new_message', {
+                    'id': message_id,
+                    'sender': sender,
+                    'message': message,
+                    'match_id': room,
+                    'time': created_at.strftime('%H:%M'),
+                    'created_at': created_at.isoformat(),
+                }, to=room)
+            except Exception as e:
+                self._count(broadcast_errors=1)
+                logger.error(f"Chat broadcast error (room {room}, id {message_id}): {e}")
+
+
+_writer = ChatWriter()
+atexit.register(_writer.stop)
+
+
+def get_chat_writer():
+    return _writer
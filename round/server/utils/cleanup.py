@@ -0,0 +1,266 @@
+import argparse
+import atexit
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from utils.db import db_connection
+from utils.matchmaking import get_matchmaking_engine
+from utils.fcm import notify_club
+from utils.response_cache import invalidate_club
+from utils import events
+
+# ==========================================
+# 대기열 만료 / 보관 스케줄러 (Cleanup Scheduler)
+# ==========================================
+# 주기적으로 아래 작업을 수행하고, 옮기거나 지운 행 수를 기록합니다.
+# 1) 대기열 만료: MATCH_WAIT_TTL 초 넘게 WAITING 인 MatchQueue 행 삭제 + 클럽 운영진 알림
+# 2) 경기 보관: 종료 후 ARCHIVE_AFTER_DAYS 일 지난 Matches 행과 그 방의 ChatMessages 를
+#    MatchesArchive / ChatMessagesArchive 로 이동 (migrations/005_cleanup_archive.sql)
+# - 모든 작업은 CLEANUP_BATCH_SIZE 행 단위 트랜잭션 (긴 잠금 방지), 한 주기에 최대 CLEANUP_MAX_BATCHES 번
+# - 워커가 여러 개여도 GET_LOCK 으로 한 워커만 실행
+# - 채팅을 먼저 옮기고 경기를 옮기므로, 중간에 실패해도 다음 주기에 이어서 처리됨
+# - 보관된 경기도 전적의 일부입니다. ELO 일괄 재계산(utils.elo_batch.load_history)은
+#   Matches 와 MatchesArchive 를 함께 읽으므로, 보관 테이블의 행을 삭제하면 재계산 결과가 달라집니다.
+
+MATCH_WAIT_TTL = int(os.environ.get('MATCH_WAIT_TTL', 24 * 3600))              # 초, 0 이면 만료 안 함
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 180))            # 0 이면 보관 안 함
+CLEANUP_INTERVAL = float(os.environ.get('CLEANUP_INTERVAL', 600))              # 초, 0 이면 스케줄러 비활성
+CLEANUP_BATCH_SIZE = int(os.environ.get('CLEANUP_BATCH_SIZE', 500))
+CLEANUP_MAX_BATCHES = int(os.environ.get('CLEANUP_MAX_BATCHES', 20))
+
+_LOCK_NAME = 'round_cleanup'
+
+logger = logging.getLogger(__name__)
+
+
+def _id_list(ids):
+    return ','.join(['%s'] * len(ids))
+
+
+# ----- 1. 대기열 만료 -----
+
+def expire_waiting(conn, now=None):
+    """
+    TTL 이 지난 대기 행을 삭제하고 해당 클럽에 알립니다. 만료된 행 수를 반환합니다.
+    """
+    if MATCH_WAIT_TTL <= 0:
+        return 0
+    cutoff = (now or datetime.now()) - timedelta(seconds=MATCH_WAIT_TTL)
+    cursor = conn.cursor(dictionary=True, buffered=True)
+    expired = []
+    try:
+        for _ in range(CLEANUP_MAX_BATCHES):
+            cursor.execute("""
+                SELECT id, club_id, sport, sido, sigungu FROM MatchQueue
+                WHERE status = 'WAITING' AND created_at < %s
+                ORDER BY created_at
+                LIMIT %s
+            """, (cutoff, CLEANUP_BATCH_SIZE))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            # 행마다 조건부 삭제: 그 사이 매칭된 행(rowcount 0)은 만료로 보지 않음
+            batch = []
+            for row in rows:
+                cursor.execute("DELETE FROM MatchQueue WHERE id = %s AND status = 'WAITING'", (row['id'],))
+                if cursor.rowcount == 1:
+                    batch.append(row)
+            conn.commit()
+            expired.extend(batch)
+            if len(rows) < CLEANUP_BATCH_SIZE:
+                break
+
+        if not expired:
+            return 0
+
+        # 이 워커의 매칭 엔진에서도 제거 (다른 워커는 재동기화 때 반영, 그 전에는 DELETE 조건으로 걸러짐)
+        engine = get_matchmaking_engine()
+        for row in expired:
+            engine.remove_club(row['club_id'])
+
+        events.publish_to_clubs(cursor, events.MATCH_EXPIRED, {
+            row['club_id']: {"club_id": row['club_id'], "sport": row['sport'], "sido": row['sido']}
+            for row in expired
+        })
+    finally:
+        cursor.close()
+
+    for row in expired:
+        try:
+            notify_club(
+                row['club_id'], events.MATCH_EXPIRED,
+                title="매칭 대기 만료",
+                body="상대를 찾지 못해 매칭 대기가 종료되었습니다. 다시 매칭을 요청해 주세요.",
+                data={"club_id": row['club_id'], "sport": row['sport']},
+            )
+        except Exception as e:
+            logger.error(f"Expire notification error (club {row['club_id']}): {e}")
+    return len(expired)
+
+
+# ----- 2. 경기/채팅 보관 -----
+
+def _move_chat(conn, cursor, room_ids):
+    """
+    방 목록의 채팅을 배치 단위로 보관 테이블로 옮깁니다. 옮긴 행 수를 반환합니다.
+    """
+    moved = 0
+    while True:
+        cursor.execute(f"""
+            SELECT id FROM ChatMessages WHERE match_id IN ({_id_list(room_ids)})
+            ORDER BY id LIMIT %s
+        """, tuple(room_ids) + (CLEANUP_BATCH_SIZE,))
+        ids = [row['id'] for row in cursor.fetchall()]
+        if not ids:
+            return moved
+        cursor.execute(f"INSERT IGNORE INTO ChatMessagesArchive SELECT * FROM ChatMessages WHERE id IN ({_id_list(ids)})", tuple(ids))
+        cursor.execute(f"DELETE FROM ChatMessages WHERE id IN ({_id_list(ids)})", tuple(ids))
+        conn.commit()
+        moved += len(ids)
+
+
+def archive_finished(conn, now=None):
+    """
+    오래된 FINISHED 경기와 그 채팅을 보관 테이블로 옮깁니다.
+    반환: {'matches': 옮긴 경기 수, 'chat_messages': 옮긴 채팅 수}
+    """
+    moved = {'matches': 0, 'chat_messages': 0}
+    if ARCHIVE_AFTER_DAYS <= 0:
+        return moved
+    cutoff = (now or datetime.now()) - timedelta(days=ARCHIVE_AFTER_DAYS)
+    cursor = conn.cursor(dictionary=True, buffered=True)
+    club_ids = set()
+    try:
+        for _ in range(CLEANUP_MAX_BATCHES):
+            cursor.execute("""
+                SELECT id, room_id, home_club_id, away_club_id FROM Matches
+                WHERE status = 'FINISHED' AND finished_at < %s
+                ORDER BY finished_at
+                LIMIT %s
+            """, (cutoff, CLEANUP_BATCH_SIZE))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            moved['chat_messages'] += _move_chat(conn, cursor, [row['room_id'] for row in rows])
+
+            ids = [row['id'] for row in rows]
+            cursor.execute(f"INSERT IGNORE INTO MatchesArchive SELECT * FROM Matches WHERE id IN ({_id_list(ids)})", tuple(ids))
+            cursor.execute(f"DELETE FROM Matches WHERE id IN ({_id_list(ids)}) AND status = 'FINISHED'", tuple(ids))
+            moved['matches'] += cursor.rowcount
+            conn.commit()
+            for row in rows:
+                club_ids.update((row['home_club_id'], row['away_club_id']))
+            if len(rows) < CLEANUP_BATCH_SIZE:
+                break
+    finally:
+        cursor.close()
+
+    # 클럽 화면의 최근 경기 목록 캐시 무효화
+    for club_id in club_ids:
+        invalidate_club(club_id, 'matches')
+    return moved
+
+
+# ----- 3. 실행 -----
+
+def run_cleanup(now=None):
+    """
+    만료/보관을 한 번 실행합니다. 다른 워커가 실행 중이면 건너뜁니다.
+    반환: {'expired_waiting', 'archived_matches', 'archived_chat_messages'} (건너뛴 경우 None)
+    """
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT GET_LOCK(%s, 0)", (_LOCK_NAME,))
+            if cursor.fetchone()[0] != 1:
+                return None
+            try:
+                expired = expire_waiting(conn, now)
+                archived = archive_finished(conn, now)
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (_LOCK_NAME,))
+                cursor.fetchall()
+        finally:
+            cursor.close()
+
+    return {
+        'expired_waiting': expired,
+        'archived_matches': archived['matches'],
+        'archived_chat_messages': archived['chat_messages'],
+    }
+
+
+class CleanupScheduler:
+    """
+    CLEANUP_INTERVAL 마다 run_cleanup() 을 실행하는 백그라운드 스레드
+    """
+
+    def __init__(self, interval=CLEANUP_INTERVAL):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.pid = None
+        self.stats = {'runs': 0, 'skipped': 0, 'errors': 0, 'expired_waiting': 0,
+                      'archived_matches': 0, 'archived_chat_messages': 0, 'last_run': None}
+
+    def start(self):
+        # Gunicorn fork 이후 워커마다 자체 스레드를 가지도록 pid 기준으로 시작
+        if self.interval <= 0:
+            return
+        if self._thread is not None and self.pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='cleanup-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        if self._thread is None or self.pid != os.getpid():
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                counts = run_cleanup()
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Cleanup error: {e}")
+                continue
+            if counts is None:
+                self.stats['skipped'] += 1
+                continue
+            self.stats['runs'] += 1
+            self.stats['last_run'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            for key, value in counts.items():
+                self.stats[key] += value
+            if any(counts.values()):
+                logger.info(f"Cleanup: {counts}")
+
+
+_scheduler = CleanupScheduler()
+atexit.register(_scheduler.stop)
+
+
+def get_cleanup_scheduler():
+    return _scheduler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="만료된 매칭 대기를 정리하고 오래된 경기/채팅을 보관 테이블로 옮깁니다.")
+    parser.parse_args()
+    # 항목별 오류(알림 실패 등)는 로그(stderr)로, 표준 출력에는 최종 집계만
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    print(run_cleanup())
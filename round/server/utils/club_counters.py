@@ -0,0 +1,50 @@
+from utils.db import get_db_connection
+
+# ==========================================
+# 동호회 멤버 수 관리 (Member Count)
+# ==========================================
+# 목록 조회 시 클럽마다 ClubMembers COUNT(*) 서브쿼리를 실행하지 않도록
+# Clubs.member_count 를 멤버 추가와 같은 트랜잭션에서 함께 갱신합니다. (클럽 생성 / 가입 승인)
+# 멤버를 삭제하는 API 는 아직 없으므로, 직접 삭제한 경우에는 reconcile_member_counts() 로 보정합니다.
+# 커밋은 호출한 쪽에서 수행합니다.
+
+
+def add_member(cursor, club_id, user_id, role='MEMBER'):
+    """
+    멤버를 추가하고 member_count 를 1 증가시킵니다.
+    """
+    cursor.execute("INSERT INTO ClubMembers (club_id, user_id, role) VALUES (%s, %s, %s)",
+                   (club_id, user_id, role))
+    cursor.execute("UPDATE Clubs SET member_count = member_count + 1 WHERE id = %s", (club_id,))
+
+
+def reconcile_member_counts():
+    """
+    ClubMembers 기준으로 member_count 가 어긋난 클럽만 한 번의 UPDATE 로 보정합니다.
+    보정된 클럽 수를 반환합니다.
+    """
+    conn = get_db_connection()
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE Clubs C
+            LEFT JOIN (
+                SELECT club_id, COUNT(*) AS cnt FROM ClubMembers GROUP BY club_id
+            ) M ON C.id = M.club_id
+            SET C.member_count = COALESCE(M.cnt, 0)
+            WHERE NOT (C.member_count <=> COALESCE(M.cnt, 0))
+        """)
+        fixed = cursor.rowcount
+        conn.commit()
+        return fixed
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if cursor: cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    print(f"member_count reconciled: {reconcile_member_counts()} clubs")
@@ -0,0 +1,32 @@
+import base64
+from datetime import datetime
+
+# ==========================================
+# 페이지 커서 (Keyset Cursor)
+# ==========================================
+# (created_at, id) 기준 키셋 페이지네이션에 쓰는 불투명 토큰입니다.
+# 형식: base64url("v1|<created_at ISO8601>|<id>") (패딩 제거)
+# 클라이언트는 토큰 내용을 해석하지 않고 그대로 다음 요청에 전달합니다.
+
+CURSOR_VERSION = 'v1'
+
+
+def encode_cursor(created_at, row_id):
+    raw = f"{CURSOR_VERSION}|{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    토큰을 (created_at, id) 로 변환합니다. 형식이 잘못되면 ValueError 를 발생시킵니다.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        version, created_at, row_id = base64.urlsafe_b64decode(padded).decode('utf-8').split('|')
+        if version != CURSOR_VERSION:
+            raise ValueError(f"unsupported cursor version: {version}")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"invalid cursor: {e}")
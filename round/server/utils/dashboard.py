@@ -0,0 +1,152 @@
+import os
+from utils.cache import TTLCache
+from utils.images import thumb_rows
+from utils.response_cache import tag_versions, invalidate
+from utils import matches as match_model
+
+# ==========================================
+# 사용자 대시보드 (Per-user Materialized View)
+# ==========================================
+# 앱 시작 시 필요한 "내 클럽 / 진행 중 매칭 / 확인 대기 결과"를 사용자별로 만들어 두고,
+# 멤버십/매칭 쓰기가 있을 때만 다시 만듭니다.
+# - 무효화 태그: 'user:{id}:dashboard' (가입/클럽 생성), 'club:{id}:dashboard' (매칭/결과/일정 변경)
+#   버전 비교 방식은 utils.response_cache 와 동일
+# - 뷰와 태그 버전은 워커 프로세스 단위입니다. 다른 워커의 쓰기는 DASHBOARD_CACHE_TTL 이내에 반영되므로
+#   응답 캐시(RESPONSE_CACHE_TTL)와 같이 짧게 유지합니다.
+# - 채팅 마지막 메시지는 자주 바뀌므로 뷰에 넣지 않고 요청마다 한 번의 쿼리로 채움
+#   (ChatMessages(match_id, id) 인덱스 사용)
+
+DASHBOARD_CACHE_SIZE = int(os.environ.get('DASHBOARD_CACHE_SIZE', 10000))
+DASHBOARD_CACHE_TTL = float(os.environ.get('DASHBOARD_CACHE_TTL', 15))    # 초
+
+_views = TTLCache(maxsize=DASHBOARD_CACHE_SIZE, ttl=DASHBOARD_CACHE_TTL)
+
+
+def _user_tag(user_db_id):
+    return f"user:{user_db_id}:dashboard"
+
+
+def _club_tag(club_id):
+    return f"club:{club_id}:dashboard"
+
+
+def invalidate_user_dashboard(*user_db_ids):
+    """
+    가입 승인, 클럽 생성 등 사용자의 멤버십이 바뀌었을 때 호출합니다.
+    """
+    invalidate(*(_user_tag(uid) for uid in user_db_ids if uid))
+
+
+def invalidate_club_dashboards(*club_ids):
+    """
+    매칭 성사/결과 제안/확정/일정 변경 등 클럽의 매칭 상태가 바뀌었을 때 호출합니다.
+    """
+    invalidate(*(_club_tag(cid) for cid in club_ids if cid))
+
+
+def fetch_my_clubs(cursor, user_db_id):
+    """
+    내가 가입한 클럽 목록 (역할 포함). cursor 는 dictionary=True 커서여야 합니다.
+    """
+    cursor.execute("""
+        SELECT C.id, C.name, C.sport, C.sido, C.sigungu, C.club_image_url, C.point, C.member_count, CM.role
+        FROM ClubMembers CM
+        JOIN Clubs C ON CM.club_id = C.id
+        WHERE CM.user_id = %s
+        ORDER BY C.name
+    """, (user_db_id,))
+    return thumb_rows(cursor.fetchall(), 'club_image_url')
+
+
+def _build_view(cursor, user_db_id):
+    """
+    cursor 는 dictionary=True, buffered=True 커서여야 합니다.
+    반환: (view, 저장 시점의 태그 버전)
+    """
+    user_versions = tag_versions([_user_tag(user_db_id)])
+
+    # 1. 내 클럽 (역할 포함)
+    clubs = fetch_my_clubs(cursor, user_db_id)
+    club_ids = [club['id'] for club in clubs]
+
+    # 매칭 조회 전에 클럽 태그 버전을 읽어야 조회 중 발생한 변경을 놓치지 않음
+    club_versions = tag_versions([_club_tag(cid) for cid in club_ids])
+
+    # 2. 진행 중 매칭 (경기당 1행 -> 내 클럽 기준으로 변환)
+    rows = match_model.fetch_club_matches(cursor, club_ids, (match_model.MATCHED, match_model.PENDING))
+
+    # 결과 제안자가 우리 클럽 멤버인지 (제안자별 소속 클럽을 한 번에 조회)
+    proposer_ids = list({row['proposer_id'] for row in rows if row['proposer_id']})
+    proposer_clubs = set()
+    if proposer_ids:
+        format_strings = ','.join(['%s'] * len(proposer_ids))
+        cursor.execute(f"""
+            SELECT user_id, club_id FROM ClubMembers WHERE user_id IN ({format_strings})
+        """, tuple(proposer_ids))
+        proposer_clubs = {(row['user_id'], row['club_id']) for row in cursor.fetchall()}
+
+    matches = []
+    pending_results = []
+    for row in rows:
+        view = match_model.side_view(row, match_model.side_of(row, club_ids))
+        schedule_date = view['schedule_date']
+        match = {
+            'match_id': view['match_id'], 'status': view['status'],
+            'club_id': view['club_id'], 'matched_club_id': view['opponent_club_id'],
+            'sport': view['sport'], 'sido': view['sido'], 'sigungu': view['sigungu'],
+            'my_score': view['my_score'], 'op_score': view['op_score'],
+            'schedule_date': schedule_date.strftime('%Y-%m-%d %H:%M') if schedule_date else None,
+            'opponent_name': view['opponent_name'], 'opponent_image': view['opponent_image'],
+            'proposed_by_us': (view['proposer_id'], view['club_id']) in proposer_clubs,
+        }
+        matches.append(match)
+        # 상대가 제안하여 우리 클럽의 승인을 기다리는 결과
+        if match['status'] == match_model.PENDING and not match['proposed_by_us']:
+            pending_results.append(match['match_id'])
+    matches = thumb_rows(matches, 'opponent_image')
+
+    view = {'clubs': clubs, 'matches': matches, 'pending_results': pending_results}
+    tags = [_user_tag(user_db_id)] + [_club_tag(cid) for cid in club_ids]
+    return view, tags, user_versions + club_versions
+
+
+def _last_messages(cursor, room_ids):
+    """
+    매칭방별 마지막 채팅 메시지를 한 번의 쿼리로 조회합니다.
+    """
+    if not room_ids:
+        return {}
+    format_strings = ','.join(['%s'] * len(room_ids))
+    cursor.execute(f"""
+        SELECT CM.match_id, CM.message, U.name as sender_name,
+               DATE_FORMAT(CM.created_at, '%%Y-%%m-%%d %%H:%%i') as time
+        FROM ChatMessages CM
+        JOIN Users U ON CM.user_id = U.id
+        WHERE CM.id IN (
+            SELECT MAX(id) FROM ChatMessages WHERE match_id IN ({format_strings}) GROUP BY match_id
+        )
+    """, tuple(room_ids))
+    return {row.pop('match_id'): row for row in cursor.fetchall()}
+
+
+def get_dashboard(cursor, user_db_id, with_messages=True):
+    """
+    사용자 대시보드를 반환합니다. 뷰가 유효하면 DB 조회 없이 재사용합니다.
+    """
+    entry = _views.get(user_db_id)
+    if entry is None or tag_versions(entry['tags']) != entry['versions']:
+        view, tags, versions = _build_view(cursor, user_db_id)
+        entry = {'view': view, 'tags': tags, 'versions': versions}
+        _views.set(user_db_id, entry)
+
+    view = entry['view']
+    matches = [dict(m) for m in view['matches']]
+    if with_messages:
+        last = _last_messages(cursor, [m['match_id'] for m in matches])
+        for m in matches:
+            m['last_message'] = last.get(m['match_id'])
+    return {'clubs': view['clubs'], 'matches': matches, 'pending_results': view['pending_results']}
+
+
+def dashboard_stats():
+    return _views.stats()
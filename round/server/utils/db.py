@@ -1,15 +1,305 @@
 import mysql.connector
+from mysql.connector.errors import PoolError
 import os
+import threading
+import time
+from contextlib import contextmanager
 
-def get_db_connection():
+# ==========================================
+# 1. 풀 설정 (Pool Configuration)
+# ==========================================
+# Gunicorn 워커(프로세스)마다 독립된 풀을 가집니다.
+# 워커당 최대 커넥션 수 = DB_POOL_SIZE + DB_POOL_MAX_OVERFLOW
+
+POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))             # 유휴 상태로 유지할 커넥션 수
+POOL_MAX_OVERFLOW = int(os.environ.get('DB_POOL_MAX_OVERFLOW', 10))  # 순간 부하 시 추가로 열 수 있는 커넥션 수
+POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))       # 대여 대기 최대 시간 (초)
+POOL_RECYCLE = float(os.environ.get('DB_POOL_RECYCLE', 3600))     # 커넥션 최대 수명 (초, MariaDB wait_timeout 보다 짧게)
+POOL_PRE_PING = float(os.environ.get('DB_POOL_PRE_PING', 30))     # 이 시간 이상 유휴였던 커넥션은 대여 전 ping 확인
+
+
+def _db_config():
     """
-    환경 변수에서 설정을 읽어와 DB 연결 객체를 반환합니다.
+    환경 변수에서 DB 접속 설정을 읽어옵니다.
     """
-    db_config = {
+    return {
         'host': os.environ.get('DB_HOST'),
         'user': os.environ.get('DB_USER'),
         'password': os.environ.get('DB_PASSWORD'),
         'database': os.environ.get('DB_NAME')
     }
-    
-    return mysql.connector.connect(**db_config)
\ No newline at end of file
+
+
+class PoolTimeoutError(PoolError):
+    """
+    POOL_TIMEOUT 안에 커넥션을 대여하지 못한 경우 발생합니다.
+    """
+
+
+# ==========================================
+# 2. 커넥션 풀 (Connection Pool)
+# ==========================================
+
+class PooledConnection:
+    """
+    풀에서 대여한 커넥션 래퍼.
+    기존 코드의 conn.close()는 실제 연결을 끊지 않고 풀에 반납합니다.
+    그 외 속성(cursor, commit, rollback 등)은 원본 커넥션에 위임합니다.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._closed = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def is_connected(self):
+        # 원본 is_connected()는 매번 ping을 보내므로, 반납 여부만 확인합니다.
+        # (실제 연결 상태는 대여 시 pre-ping 으로 확인)
+        return not self._closed
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._pool._release(self._raw, self._created_at)
+
+
+class ConnectionPool:
+    """
+    크기가 제한된 MariaDB 커넥션 풀.
+    - 유휴 커넥션은 LIFO로 재사용 (최근 사용한 커넥션 우선)
+    - POOL_RECYCLE 초과 커넥션은 폐기 후 재연결
+    - 오래 유휴였던 커넥션은 대여 전 ping으로 상태 확인
+    - 한도 초과 시 POOL_TIMEOUT 동안 반납을 대기
+    """
+
+    def __init__(self, size=POOL_SIZE, max_overflow=POOL_MAX_OVERFLOW, timeout=POOL_TIMEOUT,
+                 recycle=POOL_RECYCLE, pre_ping=POOL_PRE_PING):
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self.pid = os.getpid()
+
+        self._cond = threading.Condition()
+        self._idle = []      # [(raw, created_at, last_used), ...]
+        self._opened = 0     # 현재 열린 커넥션 수 (대여 중 + 유휴)
+        self._stats = {
+            'checkouts': 0,        # 총 대여 횟수
+            'waits': 0,            # 한도 초과로 대기한 횟수
+            'wait_time_ms': 0.0,   # 누적 대기 시간
+            'timeouts': 0,         # 대기 시간 초과 횟수
+            'overflow': 0,         # size를 넘어 추가로 연 커넥션 수 (누적)
+            'peak_opened': 0,      # 동시에 열린 커넥션 최댓값
+            'created': 0,          # 새로 연결한 횟수
+            'recycled': 0,         # 수명 초과로 재연결한 횟수
+            'ping_failures': 0,    # pre-ping 실패로 재연결한 횟수
+            'discarded': 0,        # 반납 시 오류로 폐기한 횟수
+        }
+
+    def _connect(self):
+        raw = mysql.connector.connect(**_db_config())
+        with self._cond:
+            self._stats['created'] += 1
+        return raw
+
+    @staticmethod
+    def _close_quietly(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _forget(self):
+        # 커넥션 하나가 완전히 사라졌을 때 슬롯을 비우고 대기자를 깨웁니다.
+        with self._cond:
+            self._opened -= 1
+            self._cond.notify()
+
+    def acquire(self, timeout=None):
+        """
+        풀에서 커넥션을 대여합니다. 유휴 커넥션이 없고 한도에 도달했다면 반납을 기다립니다.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+        item = None
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    item = self._idle.pop()
+                    break
+                if self._opened < self.size + self.max_overflow:
+                    self._opened += 1
+                    if self._opened > self.size:
+                        self._stats['overflow'] += 1
+                    self._stats['peak_opened'] = max(self._stats['peak_opened'], self._opened)
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    self._stats['wait_time_ms'] += (time.monotonic() - started) * 1000
+                    raise PoolTimeoutError(f"DB pool exhausted ({self._opened} connections, waited {timeout}s)")
+                if not waited:
+                    self._stats['waits'] += 1
+                    waited = True
+                self._cond.wait(remaining)
+
+            self._stats['checkouts'] += 1
+            if waited:
+                self._stats['wait_time_ms'] += (time.monotonic() - started) * 1000
+
+        # 네트워크 작업(연결/ping)은 락 밖에서 수행합니다.
+        try:
+            raw, created_at = self._validate(item)
+        except Exception:
+            self._forget()
+            raise
+        return PooledConnection(self, raw, created_at)
+
+    def _validate(self, item):
+        """
+        대여할 커넥션을 확인합니다. 새 슬롯이면 연결하고,
+        수명이 지났거나 ping에 실패한 커넥션은 같은 슬롯에서 재연결합니다.
+        """
+        if item is None:
+            return self._connect(), time.monotonic()
+
+        raw, created_at, last_used = item
+        now = time.monotonic()
+
+        if self.recycle and now - created_at > self.recycle:
+            self._close_quietly(raw)
+            with self._cond:
+                self._stats['recycled'] += 1
+            return self._connect(), time.monotonic()
+
+        if self.pre_ping is not None and now - last_used > self.pre_ping:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                self._close_quietly(raw)
+                with self._cond:
+                    self._stats['ping_failures'] += 1
+                return self._connect(), time.monotonic()
+
+        return raw, created_at
+
+    def _release(self, raw, created_at):
+        """
+        커넥션을 풀에 반납합니다. 남아있는 트랜잭션/미수신 결과는 rollback으로 정리하여
+        다음 대여자가 이전 요청의 스냅샷을 보지 않도록 합니다.
+        """
+        healthy = True
+        try:
+            raw.rollback()
+        except Exception:
+            healthy = False
+
+        with self._cond:
+            if healthy and len(self._idle) < self.size and os.getpid() == self.pid:
+                self._idle.append((raw, created_at, time.monotonic()))
+                self._cond.notify()
+                return
+            if not healthy:
+                self._stats['discarded'] += 1
+            self._opened -= 1
+            self._cond.notify()
+
+        # 오버플로 커넥션 또는 손상된 커넥션은 실제로 종료
+        self._close_quietly(raw)
+
+    def dispose(self):
+        """
+        유휴 커넥션을 모두 종료합니다. (대여 중인 커넥션은 반납 시 정리)
+        """
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+            self._cond.notify_all()
+        for raw, _, _ in idle:
+            self._close_quietly(raw)
+
+    def stats(self):
+        with self._cond:
+            data = dict(self._stats)
+            data['size'] = self.size
+            data['max_overflow'] = self.max_overflow
+            data['opened'] = self._opened
+            data['idle'] = len(self._idle)
+            data['in_use'] = self._opened - len(self._idle)
+        data['wait_time_ms'] = round(data['wait_time_ms'], 2)
+        return data
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    현재 프로세스의 커넥션 풀을 반환합니다.
+    Gunicorn이 fork한 워커에서는 부모의 소켓을 공유하지 않도록 새 풀을 만듭니다.
+    """
+    global _pool
+    pid = os.getpid()
+    if _pool is None or _pool.pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool.pid != pid:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def get_pool_stats():
+    return get_pool().stats()
+
+
+# ==========================================
+# 3. 커넥션 대여 API (Public API)
+# ==========================================
+
+def get_db_connection():
+    """
+    풀에서 DB 연결 객체를 대여합니다.
+    기존과 동일하게 사용하며, conn.close() 호출 시 풀로 반납됩니다.
+    """
+    return get_pool().acquire()
+
+
+@contextmanager
+def db_connection():
+    """
+    with db_connection() as conn: 형태로 사용하며, 블록 종료 시 자동 반납합니다.
+    """
+    conn = get_db_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def db_cursor(dictionary=False, buffered=False, commit=False):
+    """
+    커서를 바로 대여합니다. commit=True 이면 블록이 정상 종료될 때 커밋하고,
+    예외 발생 시에는 rollback 후 예외를 다시 던집니다.
+    """
+    with db_connection() as conn:
+        cursor = conn.cursor(dictionary=dictionary, buffered=buffered)
+        try:
+            yield cursor
+            if commit:
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
@@ -0,0 +1,249 @@
+import argparse
+import time
+import numpy as np
+from utils.db import get_db_connection
+
+# ==========================================
+# ELO 일괄 재계산 (Batch Rating Replay)
+# ==========================================
+# FINISHED 경기 전체를 시간순으로 다시 적용하여 Clubs.point / wins / losses / draws 를 재구성합니다.
+# K-factor 변경, 분쟁 결과 수정 후 사용합니다.
+#
+# ELO 는 순차 의존성이 있으므로, 경기를 "같은 클럽이 두 번 등장하지 않는 층(layer)"으로 나눈 뒤
+# 층 단위로 NumPy 벡터 연산을 적용합니다. 클럽별 경기 순서는 그대로 유지되므로
+# 결과는 한 경기씩 calculate_new_ratings 를 적용한 것과 동일합니다.
+#
+# 오래된 FINISHED 경기는 utils.cleanup 이 MatchesArchive 로 옮기므로, 경기 기록은
+# Matches 와 MatchesArchive 를 합쳐서 읽습니다. (한쪽만 읽으면 보관된 경기가 전적/포인트에서 빠짐)
+#
+# 사용 예) python -m utils.elo_batch --k-schedule "0:40,30:32,100:24" --dry-run
+
+DEFAULT_RATING = 1000
+DEFAULT_K_SCHEDULE = [(0, 32)]   # 라이브 confirm_match_result 와 동일 (K=32 고정)
+WRITE_CHUNK = 5000
+
+
+def parse_k_schedule(text):
+    """
+    "경기수:K,경기수:K" 형식의 K-factor 스케줄을 [(경기수, K), ...] 로 변환합니다.
+    예) "0:40,30:32" -> 30경기 미만은 K=40, 이후 K=32
+    """
+    schedule = []
+    for part in text.split(','):
+        games, k = part.split(':')
+        schedule.append((int(games), float(k)))
+    schedule.sort()
+    if not schedule or schedule[0][0] != 0:
+        raise ValueError("K-factor schedule must start at 0 games")
+    return schedule
+
+
+def _k_lookup(thresholds, ks, games_played):
+    if len(ks) == 1:
+        return ks[0]
+    return ks[np.searchsorted(thresholds, games_played, side='right') - 1]
+
+
+def _assign_layers(idx_a, idx_b, n_clubs):
+    """
+    각 경기에 층 번호를 부여합니다. 경기 i 의 층 = 두 클럽이 마지막으로 등장한 층 중 큰 값 + 1
+    """
+    last = [-1] * n_clubs
+    layers = []
+    for a, b in zip(idx_a.tolist(), idx_b.tolist()):
+        layer = max(last[a], last[b]) + 1
+        layers.append(layer)
+        last[a] = layer
+        last[b] = layer
+    return np.array(layers, dtype=np.int64)
+
+
+def replay_ratings(club_ids, matches, k_schedule=None, initial_rating=DEFAULT_RATING):
+    """
+    경기 기록을 시간순으로 재생하여 클럽별 최종 점수/전적을 계산합니다.
+
+    Args:
+        club_ids (list[int]): 대상 클럽 ID 전체 (경기가 없는 클럽은 초기값으로 재설정)
+        matches (list[tuple]): 시간순 정렬된 (club_a, club_b, score_a, score_b)
+        k_schedule (list[tuple]): parse_k_schedule 결과 (기본 K=32)
+        initial_rating (int): 시작 점수
+
+    Returns:
+        dict: club_id -> {'point', 'wins', 'losses', 'draws'}
+    """
+    k_schedule = k_schedule or DEFAULT_K_SCHEDULE
+    thresholds = np.array([g for g, _ in k_schedule])
+    ks = np.array([k for _, k in k_schedule], dtype=np.float64)
+    club_ids = list(club_ids)
+    position = {club_id: i for i, club_id in enumerate(club_ids)}
+    n_clubs = len(club_ids)
+
+    ratings = np.full(n_clubs, float(initial_rating))
+    games = np.zeros(n_clubs, dtype=np.int64)
+    wins = np.zeros(n_clubs, dtype=np.int64)
+    losses = np.zeros(n_clubs, dtype=np.int64)
+    draws = np.zeros(n_clubs, dtype=np.int64)
+
+    # 삭제된 클럽이 포함된 경기는 제외
+    valid = [m for m in matches if m[0] in position and m[1] in position]
+    if valid:
+        idx_a = np.array([position[m[0]] for m in valid], dtype=np.int64)
+        idx_b = np.array([position[m[1]] for m in valid], dtype=np.int64)
+        score_a = np.array([m[2] for m in valid], dtype=np.float64)
+        score_b = np.array([m[3] for m in valid], dtype=np.float64)
+
+        # 승패 판정 (A 기준 1 / 0.5 / 0)
+        actual_a = np.where(score_a > score_b, 1.0, np.where(score_a < score_b, 0.0, 0.5))
+
+        # 전적은 순서와 무관하므로 한 번에 집계
+        np.add.at(wins, idx_a, actual_a == 1.0)
+        np.add.at(wins, idx_b, actual_a == 0.0)
+        np.add.at(losses, idx_a, actual_a == 0.0)
+        np.add.at(losses, idx_b, actual_a == 1.0)
+        np.add.at(draws, idx_a, actual_a == 0.5)
+        np.add.at(draws, idx_b, actual_a == 0.5)
+
+        # 층 단위 벡터 연산 (같은 층 안에서는 클럽 중복이 없으므로 fancy indexing 대입이 안전)
+        layers = _assign_layers(idx_a, idx_b, n_clubs)
+        order = np.argsort(layers, kind='stable')
+        boundaries = np.flatnonzero(np.diff(layers[order])) + 1
+
+        for batch in np.split(order, boundaries):
+            a = idx_a[batch]
+            b = idx_b[batch]
+            ra = ratings[a]
+            rb = ratings[b]
+            expected_a = 1 / (1 + 10 ** ((rb - ra) / 400))
+            expected_b = 1 / (1 + 10 ** ((ra - rb) / 400))
+            k_a = _k_lookup(thresholds, ks, games[a])
+            k_b = _k_lookup(thresholds, ks, games[b])
+            # 라이브 계산과 동일하게 매 경기 정수로 반올림
+            ratings[a] = np.rint(ra + k_a * (actual_a[batch] - expected_a))
+            ratings[b] = np.rint(rb + k_b * ((1 - actual_a[batch]) - expected_b))
+            games[a] += 1
+            games[b] += 1
+
+    return {
+        club_id: {
+            'point': int(ratings[i]),
+            'wins': int(wins[i]),
+            'losses': int(losses[i]),
+            'draws': int(draws[i]),
+        }
+        for club_id, i in position.items()
+    }
+
+
+# ==========================================
+# DB 연동 (Load & Write back)
+# ==========================================
+
+def load_history(cursor):
+    """
+    클럽 목록과 FINISHED 경기(경기당 1행)를 시간순으로 읽어옵니다.
+    보관된 경기(MatchesArchive)도 포함합니다. 경기는 보관 시 같은 트랜잭션에서 옮겨지므로 두 테이블에 중복되지 않습니다.
+    """
+    cursor.execute("SELECT id FROM Clubs")
+    club_ids = [row[0] for row in cursor.fetchall()]
+
+    cursor.execute("""
+        SELECT home_club_id, away_club_id, home_score, away_score
+        FROM (
+            SELECT id, home_club_id, away_club_id, home_score, away_score, schedule_date, created_at, status
+            FROM Matches
+            UNION ALL
+            SELECT id, home_club_id, away_club_id, home_score, away_score, schedule_date, created_at, status
+            FROM MatchesArchive
+        ) M
+        WHERE status = 'FINISHED'
+          AND home_score IS NOT NULL AND away_score IS NOT NULL
+        ORDER BY COALESCE(schedule_date, created_at) ASC, id ASC
+    """)
+    matches = [tuple(row) for row in cursor.fetchall()]
+    return club_ids, matches
+
+
+def write_back(conn, results):
+    """
+    재계산 결과를 임시 테이블에 다중 행 INSERT 한 뒤 UPDATE JOIN 한 번으로 반영합니다.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            CREATE TEMPORARY TABLE IF NOT EXISTS ClubRatingReplay (
+                club_id INT PRIMARY KEY,
+                point INT NOT NULL,
+                wins INT NOT NULL,
+                losses INT NOT NULL,
+                draws INT NOT NULL
+            )
+        """)
+        cursor.execute("DELETE FROM ClubRatingReplay")
+
+        rows = [(club_id, r['point'], r['wins'], r['losses'], r['draws']) for club_id, r in results.items()]
+        sql = "INSERT INTO ClubRatingReplay (club_id, point, wins, losses, draws) VALUES (%s, %s, %s, %s, %s)"
+        for start in range(0, len(rows), WRITE_CHUNK):
+            cursor.executemany(sql, rows[start:start + WRITE_CHUNK])
+
+        cursor.execute("""
+            UPDATE Clubs C
+            JOIN ClubRatingReplay R ON C.id = R.club_id
+            SET C.point = R.point, C.wins = R.wins, C.losses = R.losses, C.draws = R.draws
+        """)
+        updated = cursor.rowcount
+        conn.commit()
+
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS ClubRatingReplay")
+        return updated
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def rebuild_ratings(k_schedule=None, initial_rating=DEFAULT_RATING, dry_run=False):
+    """
+    전체 경기 기록으로 클럽 점수를 재구성합니다. dry_run 이면 DB 에 쓰지 않습니다.
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        started = time.perf_counter()
+        club_ids, matches = load_history(cursor)
+        cursor.close()
+        loaded = time.perf_counter()
+
+        results = replay_ratings(club_ids, matches, k_schedule, initial_rating)
+        replayed = time.perf_counter()
+
+        updated = 0 if dry_run else write_back(conn, results)
+        finished = time.perf_counter()
+
+        return {
+            'clubs': len(club_ids),
+            'matches': len(matches),
+            'updated': updated,
+            'load_sec': round(loaded - started, 3),
+            'replay_sec': round(replayed - loaded, 3),
+            'write_sec': round(finished - replayed, 3),
+            'results': results,
+        }
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FINISHED 경기 기록으로 클럽 ELO 점수를 재계산합니다.")
+    parser.add_argument('--k-schedule', default="0:32", help='경기수:K 목록 (예: "0:40,30:32")')
+    parser.add_argument('--initial-rating', type=int, default=DEFAULT_RATING)
+    parser.add_argument('--dry-run', action='store_true', help='DB 에 반영하지 않고 결과만 출력')
+    args = parser.parse_args()
+
+    summary = rebuild_ratings(parse_k_schedule(args.k_schedule), args.initial_rating, args.dry_run)
+    results = summary.pop('results')
+    print(summary)
+    if args.dry_run:
+        top = sorted(results.items(), key=lambda item: item[1]['point'], reverse=True)[:20]
+        for club_id, r in top:
+            print(club_id, r)
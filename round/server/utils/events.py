@@ -0,0 +1,102 @@
+import logging
+from extensions import socketio
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+# 실시간 이벤트 (Socket.IO Event Bus)
+# ==========================================
+# 매칭/결과/가입 상태가 바뀌면 관련 사용자의 알림 room(user_{user_id})으로 이벤트를 보내
+# 클라이언트가 /api/my-matches, /api/match/detail, /api/club/requests 를 폴링하지 않도록 합니다.
+# - 이벤트 이름은 타입의 소문자 (예: MATCH_FOUND -> 'match_found'), 데이터에 'type' 포함
+# - room 이름은 클라이언트가 join 시 보내는 로그인 ID(Users.user_id) 기준
+# - 메시지 큐(SOCKETIO_MESSAGE_QUEUE)가 설정되어 있으면 다른 워커의 클라이언트에도 전달됨
+# - 전송 실패는 요청 처리에 영향을 주지 않도록 로그만 남김 (상태는 DB 가 원본)
+
+MATCH_FOUND = 'MATCH_FOUND'
+MATCH_EXPIRED = 'MATCH_EXPIRED'
+RESULT_PROPOSED = 'RESULT_PROPOSED'
+RESULT_REJECTED = 'RESULT_REJECTED'
+RESULT_CONFIRMED = 'RESULT_CONFIRMED'
+JOIN_REQUESTED = 'JOIN_REQUESTED'
+JOIN_APPROVED = 'JOIN_APPROVED'
+JOIN_REJECTED = 'JOIN_REJECTED'
+
+
+def _value(row, key, idx):
+    return row[key] if isinstance(row, dict) else row[idx]
+
+
+def emit_to_users(event_type, user_ids, payload):
+    """
+    로그인 ID 목록의 알림 room 으로 이벤트를 보냅니다. 전송한 room 수를 반환합니다.
+    """
+    data = dict(payload, type=event_type)
+    sent = 0
+    for user_id in dict.fromkeys(user_ids):
+        try:
+            socketio.emit(event_type.lower(), data, to=f"user_{user_id}")
+            sent += 1
+        except Exception as e:
+            logger.error(f"Socket emit error ({event_type} -> user_{user_id}): {e}")
+    return sent
+
+
+def publish_to_users(cursor, event_type, user_db_ids, payload):
+    """
+    Users.id 목록의 사용자에게 이벤트를 보냅니다. (로그인 ID 는 한 번의 쿼리로 조회)
+    """
+    user_db_ids = [uid for uid in user_db_ids if uid]
+    if not user_db_ids:
+        return 0
+    try:
+        format_strings = ','.join(['%s'] * len(user_db_ids))
+        cursor.execute(f"SELECT user_id FROM Users WHERE id IN ({format_strings})", tuple(user_db_ids))
+        user_ids = [_value(row, 'user_id', 0) for row in cursor.fetchall()]
+    except Exception as e:
+        logger.error(f"Event recipient lookup error ({event_type}): {e}")
+        return 0
+    return emit_to_users(event_type, user_ids, payload)
+
+
+def publish_to_clubs(cursor, event_type, payloads, admins_only=True, exclude_user_id=None):
+    """
+    클럽별 데이터로 각 클럽의 운영진(또는 전체 멤버)에게 이벤트를 보냅니다.
+
+    Args:
+        payloads (dict): club_id -> 해당 클럽 수신자에게 보낼 데이터
+        admins_only (bool): True 면 ADMIN 역할만 수신
+        exclude_user_id (int): 이벤트를 발생시킨 사용자(Users.id)는 제외
+    """
+    if not payloads:
+        return 0
+    club_ids = list(payloads)
+    format_strings = ','.join(['%s'] * len(club_ids))
+    sql = f"""
+        SELECT CM.club_id, U.user_id
+        FROM ClubMembers CM
+        JOIN Users U ON CM.user_id = U.id
+        WHERE CM.club_id IN ({format_strings})
+    """
+    params = list(club_ids)
+    if admins_only:
+        sql += " AND CM.role IN ('ADMIN', 'admin')"
+    if exclude_user_id:
+        sql += " AND U.id != %s"
+        params.append(exclude_user_id)
+
+    try:
+        cursor.execute(sql, tuple(params))
+        rows = cursor.fetchall()
+    except Exception as e:
+        logger.error(f"Event recipient lookup error ({event_type}): {e}")
+        return 0
+
+    recipients = {}
+    for row in rows:
+        recipients.setdefault(_value(row, 'club_id', 0), []).append(_value(row, 'user_id', 1))
+
+    sent = 0
+    for club_id, payload in payloads.items():
+        sent += emit_to_users(event_type, recipients.get(int(club_id), []), payload)
+    return sent
@@ -1,92 +1,366 @@
-from firebase_admin import messaging
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from firebase_admin import messaging, exceptions as firebase_exceptions
 from flask import current_app
-from utils.db import get_db_connection
+from utils.db import db_cursor
 
 # ==========================================
-# 1. FCM 기본 발송 함수 (Generic)
+# 1. FCM 발송 큐 (Notification Dispatcher)
 # ==========================================
+# 요청 처리 중 messaging.send 를 기다리지 않도록 알림을 큐에 넣고 워커 스레드가 발송합니다.
+# - 호출자가 collapse_key 를 지정한 알림만, 같은 토큰 + 같은 키끼리 배치 안에서 최신 것 하나로 합침
+#   (지정하지 않으면 합치지 않음: 같은 종류라도 방/게시글이 다른 알림은 모두 발송)
+# - send_each 로 최대 FCM_BATCH_SIZE(=Firebase 한도 500)개씩 묶어 발송
+# - 일시적 오류(UNAVAILABLE, INTERNAL, 할당량 초과)는 지수 백오프로 재시도
+# - 전송 방식(transport)은 교체 가능 (테스트에서는 FakeTransport 사용)
+
+FCM_WORKERS = int(os.environ.get('FCM_WORKERS', 2))
+FCM_QUEUE_SIZE = int(os.environ.get('FCM_QUEUE_SIZE', 10000))
+FCM_BATCH_SIZE = min(int(os.environ.get('FCM_BATCH_SIZE', 500)), 500)
+FCM_BATCH_WINDOW = float(os.environ.get('FCM_BATCH_WINDOW', 0.05))   # 배치를 모으는 최대 시간 (초)
+FCM_MAX_RETRIES = int(os.environ.get('FCM_MAX_RETRIES', 3))
+FCM_RETRY_BASE = float(os.environ.get('FCM_RETRY_BASE', 0.5))         # 첫 재시도 대기 (초)
+
+logger = logging.getLogger(__name__)
+
+_RETRYABLE_ERRORS = (
+    firebase_exceptions.UnavailableError,
+    firebase_exceptions.InternalError,
+    firebase_exceptions.DeadlineExceededError,
+    firebase_exceptions.ResourceExhaustedError,
+)
+_INVALID_TOKEN_ERRORS = (
+    messaging.UnregisteredError,
+    messaging.SenderIdMismatchError,
+)
+
+
+class SendResult:
+    """
+    메시지 1건의 발송 결과
+    """
+
+    def __init__(self, success, message_id=None, error=None):
+        self.success = success
+        self.message_id = message_id
+        self.error = error
+
+    @property
+    def retryable(self):
+        return not self.success and isinstance(self.error, _RETRYABLE_ERRORS)
+
+    @property
+    def invalid_token(self):
+        return not self.success and isinstance(self.error, _INVALID_TOKEN_ERRORS)
+
+
+class FirebaseTransport:
+    """
+    Firebase Admin SDK 로 실제 발송 (send_each: HTTP 요청 1회에 최대 500건)
+    """
+
+    def send_each(self, messages):
+        response = messaging.send_each(messages)
+        return [SendResult(r.success, r.message_id, r.exception) for r in response.responses]
+
+
+class FakeTransport:
+    """
+    테스트용 전송: 실제로 보내지 않고 기록만 합니다.
+    fail_tokens 에 있는 토큰은 error 로 실패 처리합니다.
+    """
+
+    def __init__(self, fail_tokens=None, error=None):
+        self.sent = []
+        self.batches = 0
+        self.fail_tokens = set(fail_tokens or [])
+        self.error = error
+
+    def send_each(self, messages):
+        self.batches += 1
+        results = []
+        for msg in messages:
+            if msg.token in self.fail_tokens:
+                results.append(SendResult(False, error=self.error))
+            else:
+                self.sent.append(msg)
+                results.append(SendResult(True, message_id=f"fake-{len(self.sent)}"))
+        return results
+
+
+class _Job:
+    __slots__ = ('token', 'title', 'body', 'data', 'collapse_key', 'attempt')
+
+    def __init__(self, token, title, body, data, collapse_key):
+        self.token = token
+        self.title = title
+        self.body = body
+        self.data = data
+        self.collapse_key = collapse_key
+        self.attempt = 0
+
+    def to_message(self):
+        return messaging.Message(
+            notification=messaging.Notification(title=self.title, body=self.body),
+            data=self.data, # 클라이언트에서 사용할 데이터 (Map<String, String>)
+            token=self.token,
+        )
+
+
+class NotificationDispatcher:
+    """
+    FCM 알림 발송 큐와 워커 스레드
+    """
+
+    def __init__(self, transport=None, workers=FCM_WORKERS):
+        self.transport = transport or FirebaseTransport()
+        self.workers = workers
+        self.on_invalid_tokens = None   # 무효 토큰 목록을 받는 콜백 (토큰 정리용)
+        self._queue = queue.Queue(maxsize=FCM_QUEUE_SIZE)
+        self._threads = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.pid = None
+        self.stats = {'queued': 0, 'sent': 0, 'failed': 0, 'coalesced': 0, 'retried': 0, 'batches': 0, 'dropped': 0}
+
+    # ----- 생명주기 -----
+
+    def _ensure_started(self):
+        if self._threads and self.pid == os.getpid():
+            return
+        with self._lock:
+            if self._threads and self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            self._stop.clear()
+            self._threads = [
+                threading.Thread(target=self._run, name=f'fcm-dispatcher-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+            for t in self._threads:
+                t.start()
+
+    def stop(self, timeout=5):
+        """
+        큐에 남은 알림을 발송한 뒤 워커를 종료합니다.
+        """
+        if not self._threads or self.pid != os.getpid():
+            return
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    # ----- 생산자 -----
+
+    def submit(self, token, title, body, data=None, collapse_key=None):
+        """
+        알림을 큐에 넣습니다. 큐가 가득 차면 버리고 False 를 반환합니다.
+        collapse_key 를 지정하면 같은 토큰의 같은 키 알림은 최신 것만 발송합니다. (없으면 합치지 않음)
+        """
+        if not token:
+            return False
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(_Job(token, title, body, data, collapse_key))
+            self.stats['queued'] += 1
+            return True
+        except queue.Full:
+            self.stats['dropped'] += 1
+            logger.error("FCM queue full, notification dropped")
+            return False
+
+    def submit_many(self, tokens, title, body, data=None, collapse_key=None):
+        """
+        같은 알림을 여러 토큰에 발송합니다. (워커가 최대 500건씩 묶어 send_each 로 발송)
+        큐에 등록된 건수를 반환합니다.
+        """
+        return sum(1 for token in tokens if self.submit(token, title, body, data, collapse_key))
+
+    # ----- 소비자 -----
+
+    def _collect(self):
+        batch = []
+        deadline = time.monotonic() + FCM_BATCH_WINDOW
+        try:
+            batch.append(self._queue.get(timeout=0.5))
+        except queue.Empty:
+            return batch
+        while len(batch) < FCM_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _coalesce(self, batch):
+        # collapse_key 가 같은 (토큰, 키) 알림은 마지막 것만 발송
+        latest = {}
+        for job in batch:
+            key = (job.token, job.collapse_key) if job.collapse_key else (job.token, id(job))
+            latest[key] = job
+        self.stats['coalesced'] += len(batch) - len(latest)
+        return list(latest.values())
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if batch:
+                self._send(self._coalesce(batch))
+
+    def _send(self, jobs):
+        invalid_tokens = []
+        while jobs:
+            self.stats['batches'] += 1
+            try:
+                results = self.transport.send_each([job.to_message() for job in jobs])
+            except Exception as e:
+                # 배치 전체 실패 (네트워크 등) -> 전체를 재시도 대상으로
+                logger.error(f"FCM batch error: {e}")
+                results = [SendResult(False, error=firebase_exceptions.UnavailableError(str(e)))] * len(jobs)
+
+            retry = []
+            for job, result in zip(jobs, results):
+                if result.success:
+                    self.stats['sent'] += 1
+                elif result.retryable and job.attempt < FCM_MAX_RETRIES:
+                    job.attempt += 1
+                    retry.append(job)
+                else:
+                    self.stats['failed'] += 1
+                    if result.invalid_token:
+                        invalid_tokens.append(job.token)
+                    logger.warning(f"FCM send failed ({job.token[:10]}...): {result.error}")
+
+            if retry:
+                self.stats['retried'] += len(retry)
+                time.sleep(FCM_RETRY_BASE * (2 ** (retry[0].attempt - 1)))
+            jobs = retry
+
+        if invalid_tokens and self.on_invalid_tokens:
+            try:
+                self.on_invalid_tokens(invalid_tokens)
+            except Exception as e:
+                logger.error(f"Invalid token handler error: {e}")
+
+
+def prune_invalid_tokens(tokens):
+    """
+    Firebase 가 무효(앱 삭제, 토큰 만료 등)로 응답한 토큰을 Users 에서 제거합니다.
+    """
+    tokens = list(set(tokens))
+    format_strings = ','.join(['%s'] * len(tokens))
+    with db_cursor(commit=True) as cursor:
+        cursor.execute(f"UPDATE Users SET fcm_token = NULL WHERE fcm_token IN ({format_strings})", tuple(tokens))
+        logger.info(f"Pruned {cursor.rowcount} invalid FCM tokens")
+
+
+_dispatcher = NotificationDispatcher()
+_dispatcher.on_invalid_tokens = prune_invalid_tokens
+atexit.register(_dispatcher.stop)
+
+
+def get_dispatcher():
+    return _dispatcher
+
+
+def set_transport(transport):
+    """
+    발송 방식을 교체합니다. (테스트에서 FakeTransport 주입)
+    """
+    _dispatcher.transport = transport
+
 
 def send_fcm_notification(token, title, body, data=None):
     """
-    단일 기기에 FCM 알림을 전송하는 기본 함수
+    단일 기기에 FCM 알림을 발송 큐에 넣습니다. (비동기, 큐 등록 여부 반환)
     """
     if not token: 
         return None
-    
-    try:
-        # 메시지 구성
-        message = messaging.Message(
-            notification=messaging.Notification(
-                title=title,
-                body=body,
-            ),
-            data=data, # 클라이언트에서 사용할 데이터 (Map<String, String>)
-            token=token,
-        )
-        
-        response = messaging.send(message)
-        current_app.logger.info(f"FCM sent successfully: {response}")
-        return response
+    return _dispatcher.submit(token, title, body, data)
 
-    except Exception as e:
-        current_app.logger.error(f"FCM send error: {e}")
-        return None
+
+# ==========================================
+# 2. 클럽 단위 알림 (Club Fan-out)
+# ==========================================
+
+# 알림 종류별 수신 대상: ADMIN(운영진) / ALL(전체 멤버)
+NOTIFY_AUDIENCE = {
+    'MATCH_FOUND': 'ADMIN',
+    'MATCH_EXPIRED': 'ADMIN',
+    'RESULT_PROPOSED': 'ADMIN',
+    'RESULT_CONFIRMED': 'ADMIN',
+    'SCHEDULE': 'ALL',
+    'POST': 'ALL',
+}
+
+
+def get_club_tokens(cursor, club_id, audience='ADMIN', exclude_user_id=None):
+    """
+    클럽 수신 대상의 FCM 토큰을 한 번의 쿼리로 조회합니다. (중복 제거)
+    """
+    sql = """
+        SELECT DISTINCT U.fcm_token
+        FROM ClubMembers CM
+        JOIN Users U ON CM.user_id = U.id
+        WHERE CM.club_id = %s AND U.fcm_token IS NOT NULL AND U.fcm_token != ''
+    """
+    params = [club_id]
+    if audience == 'ADMIN':
+        sql += " AND CM.role IN ('ADMIN', 'admin')"
+    if exclude_user_id:
+        sql += " AND U.id != %s"
+        params.append(exclude_user_id)
+
+    cursor.execute(sql, tuple(params))
+    tokens = [row['fcm_token'] if isinstance(row, dict) else row[0] for row in cursor.fetchall()]
+    return list(dict.fromkeys(tokens))
+
+
+def notify_club(club_id, notif_type, title, body, data=None, exclude_user_id=None):
+    """
+    클럽의 운영진 또는 전체 멤버에게 알림을 보냅니다. (알림 종류에 따라 NOTIFY_AUDIENCE 로 결정)
+    토큰 조회 1회 + 최대 500건 단위 배치 발송. 큐에 등록된 건수를 반환합니다.
+    """
+    audience = NOTIFY_AUDIENCE.get(notif_type, 'ADMIN')
+    payload = {"click_action": "FLUTTER_NOTIFICATION_CLICK", "type": notif_type}
+    payload.update({k: str(v) for k, v in (data or {}).items() if v is not None})
+
+    with db_cursor() as cursor:
+        tokens = get_club_tokens(cursor, club_id, audience, exclude_user_id)
+
+    if not tokens:
+        logger.info(f"No FCM tokens for club {club_id} ({notif_type})")
+        return 0
+    return _dispatcher.submit_many(tokens, title, body, payload)
 
 
 # ==========================================
-# 2. 비즈니스 로직별 알림 함수 (Specific)
+# 3. 비즈니스 로직별 알림 함수 (Specific)
 # ==========================================
 
 def send_match_notification(target_club_id, room_id, title_text):
     """
-    매칭 성사 시 상대방 클럽 운영진(생성자)에게 알림 발송
+    매칭 성사 시 상대방 클럽 운영진 전원에게 알림 발송
     """
-    conn = None
-    cursor = None
     try:
-        conn = get_db_connection()
-        if conn is None:
-            current_app.logger.error("DB connection failed in send_match_notification")
-            return
-
-        cursor = conn.cursor(dictionary=True)
-        
-        # 1. 대상(상대 클럽 운영진)의 토큰 조회
-        sql = """
-            SELECT U.fcm_token, C.name as club_name
-            FROM Clubs C
-            JOIN Users U ON C.creator_id = U.id
-            WHERE C.id = %s
-        """
-        cursor.execute(sql, (target_club_id,))
-        target_user = cursor.fetchone()
-        
-        if target_user and target_user['fcm_token']:
-            token = target_user['fcm_token']
-            club_name = target_user['club_name']
-            
-            # 2. 클라이언트 이동을 위한 데이터 페이로드 구성
-            data_payload = {
-                "click_action": "FLUTTER_NOTIFICATION_CLICK",
-                "type": "MATCH_FOUND",
+        # 클라이언트 이동을 위한 데이터 페이로드 구성
+        count = notify_club(
+            target_club_id, "MATCH_FOUND",
+            title=title_text,
+            body="새로운 매칭이 시작되었습니다. 터치하여 확인하세요.",
+            data={
                 "match_id": room_id,     # 채팅방 UUID
                 "opponent_name": "상대팀" # (필요시 DB에서 조회하여 변경 가능)
             }
-            
-            # 3. 발송
-            current_app.logger.info(f"Sending Match FCM to {club_name} (Token: {token[:10]}...)")
-            
-            send_fcm_notification(
-                token=token,
-                title=title_text, 
-                body="새로운 매칭이 시작되었습니다. 터치하여 확인하세요.",
-                data=data_payload
-            )
-        else:
-            current_app.logger.warning(f"Target club {target_club_id} has no admin token or user not found.")
-            
+        )
+        current_app.logger.info(f"Match FCM queued for club {target_club_id}: {count} devices")
     except Exception as e:
         current_app.logger.error(f"Error sending match notification: {e}")
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
\ No newline at end of file
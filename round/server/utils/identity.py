@@ -0,0 +1,108 @@
+import os
+from flask import session
+from utils.cache import TTLCache
+
+# ==========================================
+# 사용자 식별 캐시 (Identity Cache)
+# ==========================================
+# 세션에는 문자열 아이디(user_id)만 있어서 거의 모든 핸들러가
+# "SELECT id FROM Users WHERE user_id = %s" 를 먼저 실행했습니다.
+# 로그인 시 세션에 PK를 저장하고, 세션이 없는 경로(소켓 등)는 워커 공용 캐시를 사용합니다.
+
+_identity_cache = TTLCache(
+    maxsize=int(os.environ.get('IDENTITY_CACHE_SIZE', 10000)),
+    ttl=float(os.environ.get('IDENTITY_CACHE_TTL', 600))
+)
+
+
+def remember_identity(user_id_str, user_db_id, role=None):
+    """
+    로그인 등으로 이미 조회한 사용자 정보를 캐시에 등록합니다.
+    """
+    _identity_cache.set(user_id_str, {'id': user_db_id, 'role': role})
+
+
+def invalidate_identity(user_id_str):
+    """
+    사용자 정보가 바뀌거나 삭제되었을 때 캐시에서 제거합니다.
+    """
+    _identity_cache.delete(user_id_str)
+
+
+def resolve_user_db_id(cursor, user_id_str):
+    """
+    문자열 아이디 -> Users PK 변환. 캐시에 없을 때만 주어진 커서로 DB를 조회합니다.
+    존재하지 않는 사용자면 None을 반환합니다.
+    """
+    if not user_id_str:
+        return None
+
+    cached = _identity_cache.get(user_id_str)
+    if cached:
+        return cached['id']
+
+    cursor.execute("SELECT id, role FROM Users WHERE user_id = %s", (user_id_str,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+
+    # dictionary 커서 / 일반 커서 모두 지원
+    if isinstance(row, dict):
+        user_db_id, role = row['id'], row['role']
+    else:
+        user_db_id, role = row[0], row[1]
+
+    remember_identity(user_id_str, user_db_id, role)
+    return user_db_id
+
+
+def resolve_user_db_ids(cursor, user_id_strs):
+    """
+    여러 문자열 아이디를 한 번에 변환합니다. 캐시에 없는 아이디만 IN 조회 1회로 가져옵니다.
+    반환: {user_id_str: Users PK} (존재하지 않는 사용자는 제외)
+    """
+    result = {}
+    missing = []
+    for user_id_str in set(user_id_strs):
+        if not user_id_str:
+            continue
+        cached = _identity_cache.get(user_id_str)
+        if cached:
+            result[user_id_str] = cached['id']
+        else:
+            missing.append(user_id_str)
+
+    if missing:
+        format_strings = ','.join(['%s'] * len(missing))
+        cursor.execute(f"SELECT id, user_id, role FROM Users WHERE user_id IN ({format_strings})", tuple(missing))
+        for row in cursor.fetchall():
+            if isinstance(row, dict):
+                user_db_id, user_id_str, role = row['id'], row['user_id'], row['role']
+            else:
+                user_db_id, user_id_str, role = row
+            remember_identity(user_id_str, user_db_id, role)
+            result[user_id_str] = user_db_id
+    return result
+
+
+def get_session_user_db_id(cursor):
+    """
+    현재 로그인 사용자의 Users PK를 반환합니다. (비로그인 시 None)
+    로그인 시 세션에 저장한 값을 우선 사용하고, 이전 버전 세션이면 조회 후 세션에 보강합니다.
+    """
+    user_id_str = session.get('user_id')
+    if not user_id_str:
+        return None
+
+    user_db_id = session.get('user_db_id')
+    if user_db_id is not None:
+        return user_db_id
+
+    user_db_id = resolve_user_db_id(cursor, user_id_str)
+    if user_db_id is not None:
+        session['user_db_id'] = user_db_id
+    return user_db_id
+
+
+def identity_cache_stats():
+    return _identity_cache.stats()
@@ -0,0 +1,206 @@
+import argparse
+import io
+import logging
+import os
+from utils.cache import TTLCache
+from utils.db import db_cursor
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:   # Pillow 미설치 시 원본만 저장
+    Image = None
+
+# ==========================================
+# 이미지 크기별 변형 (Image Variants)
+# ==========================================
+# 업로드된 원본 옆에 축소/재압축한 JPEG 변형을 함께 저장합니다.
+#   posts/photo.png -> posts/photo.thumb.jpg, posts/photo.medium.jpg
+# 변형 URL 은 원본 URL 에서 계산하고, 실제로 생성된 변형은 MediaVariants 에 기록합니다.
+# (migrations/006_media_variants.sql)
+# - 생성은 업로드 워커 풀(utils.media)에서 수행 (요청 스레드에서 디코딩/리사이즈 X)
+# - 목록 API 는 thumb_rows() 로 작은 변형 URL 을 내려줌 (상세 화면은 원본 유지)
+#   변형이 기록된 이미지만 교체하고, 나머지(기존 이미지, 변형 생성 전/실패)는 원본 URL 유지
+# - 기존 이미지는 'python -m utils.images --backfill' 로 변형을 만든 뒤 IMAGE_LIST_VARIANT 를 켭니다.
+
+def _parse_variants(text):
+    variants = {}
+    for part in filter(None, text.split(',')):
+        name, size = part.split(':')
+        variants[name.strip()] = int(size)
+    return variants
+
+
+IMAGE_VARIANTS = _parse_variants(os.environ.get('IMAGE_VARIANTS', 'thumb:200,medium:800'))  # 이름:긴 변(px)
+IMAGE_QUALITY = int(os.environ.get('IMAGE_QUALITY', 82))
+IMAGE_LIST_VARIANT = os.environ.get('IMAGE_LIST_VARIANT', '')   # 예: 'thumb', 빈 값이면 목록도 원본 URL
+IMAGE_VARIANT_CACHE_TTL = float(os.environ.get('IMAGE_VARIANT_CACHE_TTL', 3600))   # 초, 변형이 있는 URL
+IMAGE_VARIANT_MISS_TTL = float(os.environ.get('IMAGE_VARIANT_MISS_TTL', 30))       # 초, 변형이 없는 URL
+
+_known = TTLCache(maxsize=int(os.environ.get('IMAGE_VARIANT_CACHE_SIZE', 20000)), ttl=IMAGE_VARIANT_CACHE_TTL)
+
+
+def variants_enabled():
+    return Image is not None and bool(IMAGE_VARIANTS)
+
+
+def variant_key(key, name):
+    """
+    원본 키(또는 URL)에 대응하는 변형 키: 확장자를 '.{name}.jpg' 로 교체
+    """
+    head, _, tail = key.rpartition('/')
+    stem = tail.rsplit('.', 1)[0] if '.' in tail else tail
+    return f"{head}/{stem}.{name}.jpg" if head else f"{stem}.{name}.jpg"
+
+
+def variant_url(url, name=None):
+    name = name or IMAGE_LIST_VARIANT
+    if not url or not name or name not in IMAGE_VARIANTS:
+        return url
+    return variant_key(url, name)
+
+
+def record_variants(url, names):
+    """
+    원본 URL 에 변형이 생성되었음을 기록합니다. (변형 업로드가 모두 끝난 뒤 호출)
+    """
+    names = sorted(names)
+    if not url or not names:
+        return
+    with db_cursor(commit=True) as cursor:
+        cursor.execute("""
+            INSERT INTO MediaVariants (url, variants) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE variants = VALUES(variants)
+        """, (url, ','.join(names)))
+    _known.set(url, frozenset(names))
+
+
+def known_variants(urls):
+    """
+    URL 별로 생성이 기록된 변형 이름 집합을 반환합니다. (캐시에 없는 URL 만 한 번의 쿼리로 조회)
+    """
+    result = {}
+    missing = []
+    for url in dict.fromkeys(urls):
+        names = _known.get(url)
+        if names is None:
+            missing.append(url)
+        else:
+            result[url] = names
+    if missing:
+        format_strings = ','.join(['%s'] * len(missing))
+        with db_cursor() as cursor:
+            cursor.execute(f"SELECT url, variants FROM MediaVariants WHERE url IN ({format_strings})", tuple(missing))
+            found = {url: frozenset(filter(None, variants.split(','))) for url, variants in cursor.fetchall()}
+        for url in missing:
+            names = found.get(url, frozenset())
+            # 아직 변형이 없는 URL 은 짧게 캐시하여 생성 직후 곧 반영되도록 함
+            _known.set(url, names, None if names else IMAGE_VARIANT_MISS_TTL)
+            result[url] = names
+    return result
+
+
+def thumb_rows(rows, *fields, variant=None):
+    """
+    목록 응답의 이미지 URL 필드를 변형 URL 로 교체합니다.
+    변형이 기록되지 않은 이미지(또는 URL 이 없는 행)는 원본 URL 그대로 둡니다.
+    """
+    name = variant or IMAGE_LIST_VARIANT
+    if not variants_enabled() or not IMAGE_LIST_VARIANT or name not in IMAGE_VARIANTS:
+        return rows
+    urls = [row[field] for row in rows for field in fields if row.get(field)]
+    if not urls:
+        return rows
+    known = known_variants(urls)
+    for row in rows:
+        for field in fields:
+            url = row.get(field)
+            if url and name in known.get(url, ()):
+                row[field] = variant_url(url, name)
+    return rows
+
+
+def make_variants(fileobj):
+    """
+    원본 이미지에서 변형들을 생성합니다. 반환: {name: JPEG BytesIO}
+    EXIF 회전을 반영하고, 원본보다 크게 확대하지 않습니다.
+    """
+    if not variants_enabled():
+        return {}
+    with Image.open(fileobj) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            # 투명 배경은 흰색으로 합성
+            img = img.convert('RGBA')
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.split()[-1])
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        outputs = {}
+        # 큰 변형부터 만들고 그 결과를 다시 줄여 디코딩/리샘플링 비용을 줄임
+        source = img
+        for name, size in sorted(IMAGE_VARIANTS.items(), key=lambda item: -item[1]):
+            resized = source.copy()
+            resized.thumbnail((size, size), Image.LANCZOS)
+            buf = io.BytesIO()
+            resized.save(buf, 'JPEG', quality=IMAGE_QUALITY, optimize=True, progressive=True)
+            buf.seek(0)
+            outputs[name] = buf
+            source = resized
+        return outputs
+
+
+# ==========================================
+# 기존 이미지 변형 생성 (Backfill)
+# ==========================================
+
+_IMAGE_COLUMNS = [
+    ('Clubs', 'club_image_url'),
+    ('Users', 'profile_image_url'),
+    ('Posts', 'image_url'),
+]
+
+
+def backfill_variants(limit=None):
+    """
+    DB 에 저장된 원본 이미지들의 변형을 생성합니다. 처리한 이미지 수를 반환합니다.
+    """
+    from utils.media import get_media_service
+
+    media = get_media_service()
+    done = 0
+    for table, column in _IMAGE_COLUMNS:
+        with db_cursor() as cursor:
+            cursor.execute(f"SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL")
+            urls = [row[0] for row in cursor.fetchall()]
+        for url in urls:
+            if limit is not None and done >= limit:
+                return done
+            key = media.backend.key_for_url(url)
+            if key is None:
+                continue
+            try:
+                buf = io.BytesIO()
+                media.backend.download(key, buf)
+                buf.seek(0)
+                media.store_variants(key, buf)
+                done += 1
+            except Exception as e:
+                logger.warning(f"Variant backfill skipped {url}: {e}")
+    return done
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="저장된 이미지의 크기별 변형을 생성합니다.")
+    parser.add_argument('--backfill', action='store_true', help='DB 의 모든 원본 이미지 처리')
+    parser.add_argument('--limit', type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    if not variants_enabled():
+        parser.error("Pillow 가 설치되어 있지 않거나 IMAGE_VARIANTS 가 비어 있습니다.")
+    if args.backfill:
+        print(f"variants created: {backfill_variants(args.limit)} images")
@@ -0,0 +1,165 @@
+import bisect
+import os
+import threading
+import time
+from utils.db import db_cursor
+
+# ==========================================
+# 지역별 랭킹 (Regional Leaderboards)
+# ==========================================
+# (종목), (종목, 시도), (종목, 시도, 시군구) 세 단위의 정렬된 랭킹을 메모리에 유지합니다.
+# 각 랭킹은 [(-point, club_id), ...] 정렬 리스트이며, 순위 조회는 이분 탐색(O(log n))입니다.
+# - 경기 결과 확정 시 update_point() 로 해당 클럽만 갱신
+# - 다른 워커/배치 재계산 반영을 위해 LEADERBOARD_RESYNC 주기마다 DB 에서 다시 읽음
+
+LEADERBOARD_RESYNC = float(os.environ.get('LEADERBOARD_RESYNC', 300))  # 초, 0 이면 최초 1회만 로드
+
+ALL = '*'   # 지역 전체를 뜻하는 키 (NULL 지역과 구분)
+
+
+def _board_keys(club):
+    """
+    클럽이 속한 랭킹 키 목록 (종목 전체 / 시도 / 시군구)
+    """
+    sport, sido, sigungu = club['sport'], club['sido'], club['sigungu']
+    return [(sport, ALL, ALL), (sport, sido, ALL), (sport, sido, sigungu)]
+
+
+def _lookup_key(sport, sido, sigungu):
+    return (sport, sido or ALL, sigungu or ALL)
+
+
+class Leaderboards:
+    """
+    지역 단위 랭킹 모음. 모든 메서드는 스레드 안전합니다.
+    """
+
+    def __init__(self, resync=LEADERBOARD_RESYNC):
+        self.resync = resync
+        self._boards = {}     # (sport, sido, sigungu) -> 정렬된 [(-point, club_id), ...]
+        self._clubs = {}      # club_id -> {'id', 'name', 'club_image_url', 'point', 'sport', 'sido', 'sigungu'}
+        self._lock = threading.RLock()
+        self._loaded_at = None
+
+    # ----- DB 동기화 -----
+
+    def ensure_loaded(self):
+        now = time.monotonic()
+        if self._loaded_at is not None and (not self.resync or now - self._loaded_at < self.resync):
+            return
+        self.load()
+
+    def load(self):
+        with db_cursor(dictionary=True) as cursor:
+            cursor.execute("SELECT id, name, club_image_url, point, sport, sido, sigungu FROM Clubs")
+            rows = cursor.fetchall()
+
+        boards = {}
+        clubs = {}
+        for row in rows:
+            row['point'] = row['point'] or 0
+            clubs[row['id']] = row
+            for key in _board_keys(row):
+                boards.setdefault(key, []).append((-row['point'], row['id']))
+        for board in boards.values():
+            board.sort()
+
+        with self._lock:
+            self._boards = boards
+            self._clubs = clubs
+            self._loaded_at = time.monotonic()
+
+    # ----- 갱신 -----
+
+    def _remove(self, club):
+        for key in _board_keys(club):
+            board = self._boards.get(key)
+            if not board:
+                continue
+            entry = (-club['point'], club['id'])
+            pos = bisect.bisect_left(board, entry)
+            if pos < len(board) and board[pos] == entry:
+                del board[pos]
+
+    def _insert(self, club):
+        for key in _board_keys(club):
+            bisect.insort(self._boards.setdefault(key, []), (-club['point'], club['id']))
+
+    def upsert_club(self, club):
+        """
+        클럽 생성/정보 변경 시 랭킹에 반영합니다. club 은 Clubs 행과 같은 키를 가진 dict 입니다.
+        """
+        if self._loaded_at is None:
+            return   # 아직 로드 전이면 최초 로드 시 함께 읽힘
+        club = dict(club)
+        club['point'] = club.get('point') or 0
+        with self._lock:
+            old = self._clubs.get(club['id'])
+            if old:
+                self._remove(old)
+            self._clubs[club['id']] = club
+            self._insert(club)
+
+    def update_point(self, club_id, point):
+        """
+        경기 결과 확정 후 클럽 점수를 갱신합니다. (해당 클럽의 3개 랭킹만 O(log n) 탐색)
+        """
+        with self._lock:
+            club = self._clubs.get(club_id)
+            if not club:
+                return
+            self._remove(club)
+            club['point'] = point
+            self._insert(club)
+
+    def update_image(self, club_id, image_url):
+        """
+        클럽 이미지 URL 을 갱신합니다. (백그라운드 업로드 완료 시)
+        """
+        with self._lock:
+            club = self._clubs.get(club_id)
+            if club:
+                club['club_image_url'] = image_url
+
+    # ----- 조회 -----
+
+    def rank_of_point(self, point, sport, sido=None, sigungu=None):
+        """
+        해당 랭킹에서 주어진 점수의 순위 (RANK() 와 동일: 더 높은 점수의 클럽 수 + 1)
+        """
+        self.ensure_loaded()
+        with self._lock:
+            board = self._boards.get(_lookup_key(sport, sido, sigungu), [])
+            return bisect.bisect_left(board, (-(point or 0),)) + 1
+
+    def page(self, sport, sido=None, sigungu=None, offset=0, limit=50):
+        """
+        랭킹 구간 조회. 반환: (전체 클럽 수, [{'id', 'name', 'club_image_url', 'point', 'ranking'}, ...])
+        """
+        self.ensure_loaded()
+        with self._lock:
+            board = self._boards.get(_lookup_key(sport, sido, sigungu), [])
+            rows = []
+            for neg_point, club_id in board[offset:offset + limit]:
+                club = self._clubs[club_id]
+                rows.append({
+                    'id': club_id,
+                    'name': club['name'],
+                    'club_image_url': club['club_image_url'],
+                    'point': -neg_point,
+                    'ranking': bisect.bisect_left(board, (neg_point,)) + 1,
+                })
+            return len(board), rows
+
+
+_leaderboards = None
+_leaderboards_lock = threading.Lock()
+
+
+def get_leaderboards():
+    global _leaderboards
+    if _leaderboards is None:
+        with _leaderboards_lock:
+            if _leaderboards is None:
+                _leaderboards = Leaderboards()
+    return _leaderboards
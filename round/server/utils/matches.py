@@ -0,0 +1,149 @@
+# ==========================================
+# 경기 모델 (Single-row Matches)
+# ==========================================
+# 매칭 1건 = Matches 1행 (home: 대기열에 먼저 있던 팀, away: 매칭을 요청해 성사시킨 팀)
+# MatchQueue 는 대기열(WAITING)만 보관합니다. (migrations/003_matches_table.sql)
+#
+# 상태 전이 (조건부 UPDATE 로 검증, 허용되지 않은 전이는 rowcount 0)
+#   MATCHED --propose--> PENDING --confirm--> FINISHED
+#                        PENDING --reject---> MATCHED
+#
+# 조회 API 는 기존처럼 "내 클럽 기준"(my_score / op_score / opponent_*) 응답을 내려주므로
+# side_view() 로 행을 요청 클럽 관점으로 변환합니다.
+
+MATCHED = 'MATCHED'
+PENDING = 'PENDING'
+FINISHED = 'FINISHED'
+
+# 도착 상태 -> 허용되는 이전 상태
+TRANSITIONS = {
+    PENDING: (MATCHED,),
+    MATCHED: (PENDING,),
+    FINISHED: (PENDING,),
+}
+
+# 상태 전이와 함께 갱신할 수 있는 컬럼 (SQL 에 직접 들어가므로 코드 상수만 허용)
+_UPDATABLE = ('home_score', 'away_score', 'proposer_id', 'finished_at')
+
+MATCH_COLUMNS = """
+    M.id, M.room_id, M.home_club_id, M.away_club_id, M.sport, M.sido, M.sigungu,
+    M.status, M.home_score, M.away_score, M.proposer_id, M.schedule_date, M.location, M.created_at,
+    H.name as home_name, H.club_image_url as home_image,
+    A.name as away_name, A.club_image_url as away_image
+"""
+MATCH_FROM = """
+    FROM Matches M
+    JOIN Clubs H ON M.home_club_id = H.id
+    JOIN Clubs A ON M.away_club_id = A.id
+"""
+
+
+def create_match(cursor, room_id, home_club_id, away_club_id, sport, sido, sigungu):
+    cursor.execute("""
+        INSERT INTO Matches (room_id, home_club_id, away_club_id, sport, sido, sigungu, status)
+        VALUES (%s, %s, %s, %s, %s, %s, 'MATCHED')
+    """, (room_id, home_club_id, away_club_id, sport, sido, sigungu))
+    return cursor.lastrowid
+
+
+def get_match(cursor, room_id, for_update=False):
+    """
+    경기 행(조인 없음)을 조회합니다. 없으면 None.
+    """
+    sql = """
+        SELECT id, room_id, home_club_id, away_club_id, status, home_score, away_score, proposer_id
+        FROM Matches WHERE room_id = %s
+    """
+    if for_update:
+        sql += " FOR UPDATE"
+    cursor.execute(sql, (room_id,))
+    return cursor.fetchone()
+
+
+def fetch_club_matches(cursor, club_ids, statuses, order_by="M.created_at DESC", limit=None):
+    """
+    클럽 목록이 home 또는 away 로 참여한 경기를 상대 클럽 정보와 함께 조회합니다.
+    (home_club_id, away_club_id 각각의 인덱스 사용)
+    """
+    club_ids = list(club_ids)
+    if not club_ids:
+        return []
+    clubs_in = ','.join(['%s'] * len(club_ids))
+    status_in = ','.join(['%s'] * len(statuses))
+    sql = f"""
+        SELECT {MATCH_COLUMNS}
+        {MATCH_FROM}
+        WHERE (M.home_club_id IN ({clubs_in}) OR M.away_club_id IN ({clubs_in}))
+          AND M.status IN ({status_in})
+        ORDER BY {order_by}
+    """
+    params = club_ids + club_ids + list(statuses)
+    if limit:
+        sql += " LIMIT %s"
+        params.append(limit)
+    cursor.execute(sql, tuple(params))
+    return cursor.fetchall()
+
+
+def side_of(row, club_ids):
+    """
+    요청 클럽들 중 이 경기에 참여한 쪽 ('home' / 'away'). 참여하지 않았으면 None.
+    """
+    club_ids = set(int(c) for c in club_ids)
+    if row['home_club_id'] in club_ids:
+        return 'home'
+    if row['away_club_id'] in club_ids:
+        return 'away'
+    return None
+
+
+def side_view(row, side):
+    """
+    경기 행을 한쪽 클럽 관점으로 변환합니다.
+    """
+    other = 'away' if side == 'home' else 'home'
+    return {
+        'match_id': row['room_id'],
+        'status': row['status'],
+        'sport': row.get('sport'),
+        'sido': row.get('sido'),
+        'sigungu': row.get('sigungu'),
+        'club_id': row[f'{side}_club_id'],
+        'opponent_club_id': row[f'{other}_club_id'],
+        'opponent_name': row.get(f'{other}_name'),
+        'opponent_image': row.get(f'{other}_image'),
+        'my_score': row[f'{side}_score'],
+        'op_score': row[f'{other}_score'],
+        'proposer_id': row['proposer_id'],
+        'schedule_date': row.get('schedule_date'),
+        'created_at': row.get('created_at'),
+    }
+
+
+def scores_for(side, score_my, score_op):
+    """
+    한쪽 관점의 점수를 (home_score, away_score) 로 변환합니다.
+    """
+    return (score_my, score_op) if side == 'home' else (score_op, score_my)
+
+
+def transition(cursor, room_id, to_status, **fields):
+    """
+    허용된 이전 상태에서만 to_status 로 바꿉니다. 전이 성공 여부를 반환합니다.
+    """
+    sets = ["status = %s"]
+    params = [to_status]
+    for column, value in fields.items():
+        if column not in _UPDATABLE:
+            raise ValueError(f"column not updatable: {column}")
+        sets.append(f"{column} = %s")
+        params.append(value)
+
+    allowed = TRANSITIONS[to_status]
+    params.append(room_id)
+    params.extend(allowed)
+    cursor.execute(f"""
+        UPDATE Matches SET {', '.join(sets)}
+        WHERE room_id = %s AND status IN ({','.join(['%s'] * len(allowed))})
+    """, tuple(params))
+    return cursor.rowcount == 1
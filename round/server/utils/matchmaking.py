@@ -0,0 +1,369 @@
+import bisect
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+# ==========================================
+# 매칭 엔진 (Matchmaking Engine)
+# ==========================================
+# (종목, 시도)별 대기열을 메모리에 유지하여 매칭 요청마다
+# MatchQueue 를 ORDER BY created_at 으로 스캔하지 않도록 합니다.
+# - 영속성: 대기열의 원본은 여전히 MatchQueue(status='WAITING') 이며, 첫 사용 시와
+#   MATCH_QUEUE_RESYNC 주기마다 DB에서 다시 읽어 다른 워커가 등록한 대기팀도 반영합니다.
+# - 원자성: 같은 (종목, 시도) 요청은 키 단위 락 + DB 네임드 락(GET_LOCK, 워커 간)으로 직렬화하고,
+#   DB 에서는 status='WAITING' 조건부 DELETE 로 한 번 더 확인합니다.
+# - 메모리 대기열에서 후보를 못 찾으면 DB 대기 행을 직접 확인하므로(fetch_waiting),
+#   다른 워커가 방금 등록한 대기팀도 재동기화를 기다리지 않고 매칭됩니다.
+
+MATCH_QUEUE_RESYNC = float(os.environ.get('MATCH_QUEUE_RESYNC', 60))  # 초, 0 이면 최초 1회만 로드
+
+# 점수 기반 매칭 (MATCH_MODE='scored') 설정
+# 'fifo' 로 두면 기존처럼 먼저 등록한 팀과 바로 매칭합니다.
+MATCH_MODE = os.environ.get('MATCH_MODE', 'scored')
+MATCH_ELO_WINDOW = int(os.environ.get('MATCH_ELO_WINDOW', 100))           # 기본 허용 점수 차
+MATCH_ELO_WIDEN_PER_MIN = int(os.environ.get('MATCH_ELO_WIDEN_PER_MIN', 20))  # 대기 1분당 확장 폭
+MATCH_ELO_MAX_WINDOW = int(os.environ.get('MATCH_ELO_MAX_WINDOW', 500))   # 최대 허용 점수 차
+MATCH_SCAN_LIMIT = int(os.environ.get('MATCH_SCAN_LIMIT', 50))            # 한 번에 살펴볼 최대 후보 수
+MATCH_SIGUNGU_PENALTY = int(os.environ.get('MATCH_SIGUNGU_PENALTY', 50))  # 시군구가 다를 때 감점
+MATCH_PREF_PENALTY = int(os.environ.get('MATCH_PREF_PENALTY', 30))        # 희망 요일/시간대 불일치 시 감점
+MATCH_DB_LOCK_TIMEOUT = int(os.environ.get('MATCH_DB_LOCK_TIMEOUT', 5))    # 초, 워커 간 대기열 락 대기 시간
+
+DEFAULT_POINT = 1000
+
+_ENTRY_FIELDS = "id, club_id, sport, sido, sigungu, point, preferred_day, preferred_time, created_at"
+
+
+def _entry_point(entry):
+    return entry.get('point') if entry.get('point') is not None else DEFAULT_POINT
+
+
+def _pref_compatible(a, b):
+    return a in (None, 'ANY') or b in (None, 'ANY') or a == b
+
+
+def rating_window(wait_seconds):
+    """
+    대기 시간에 따라 넓어지는 허용 점수 차를 반환합니다.
+    """
+    widened = MATCH_ELO_WINDOW + MATCH_ELO_WIDEN_PER_MIN * (max(wait_seconds, 0) / 60)
+    return min(widened, MATCH_ELO_MAX_WINDOW)
+
+
+def match_score(requester, candidate):
+    """
+    후보와의 적합도 점수 (낮을수록 좋음).
+    점수 차 + 시군구 불일치 감점 + 희망 요일/시간대 불일치 감점
+    """
+    score = abs(_entry_point(requester) - _entry_point(candidate))
+    if requester.get('sigungu') != candidate.get('sigungu'):
+        score += MATCH_SIGUNGU_PENALTY
+    if not _pref_compatible(requester.get('preferred_day'), candidate.get('preferred_day')):
+        score += MATCH_PREF_PENALTY
+    if not _pref_compatible(requester.get('preferred_time'), candidate.get('preferred_time')):
+        score += MATCH_PREF_PENALTY
+    return score
+
+
+def candidate_rank(requester, candidate, now):
+    """
+    후보의 우선순위 (작을수록 좋음). 대기 시간 기준 허용 점수 차를 벗어나면 None.
+    """
+    gap = abs(_entry_point(requester) - _entry_point(candidate))
+    waited = (now - candidate['created_at']).total_seconds() if candidate.get('created_at') else 0
+    if gap > rating_window(waited):
+        return None
+    return (match_score(requester, candidate), candidate.get('created_at') or now, candidate['id'])
+
+
+class QueueBusyError(Exception):
+    """
+    MATCH_DB_LOCK_TIMEOUT 안에 워커 간 대기열 락을 얻지 못한 경우 발생합니다.
+    """
+
+
+@contextmanager
+def db_queue_lock(cursor, sport, sido, timeout=MATCH_DB_LOCK_TIMEOUT):
+    """
+    (종목, 시도) 대기열에 대한 DB 네임드 락. 여러 워커의 매칭/대기 등록을 직렬화합니다.
+    (이름 길이 제한 64자 때문에 키는 해시로 변환)
+    """
+    name = "round_match:" + hashlib.sha1(f"{sport}|{sido}".encode('utf-8')).hexdigest()
+    cursor.execute("SELECT GET_LOCK(%s, %s) AS acquired", (name, timeout))
+    row = cursor.fetchone()
+    if (row['acquired'] if isinstance(row, dict) else row[0]) != 1:
+        raise QueueBusyError(f"match queue busy: {sport}/{sido}")
+    try:
+        yield
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (name,))
+        cursor.fetchall()
+
+
+def fetch_waiting(cursor, requester, mode=MATCH_MODE, limit=MATCH_SCAN_LIMIT, now=None):
+    """
+    DB 의 대기 행에서 요청 팀의 후보를 우선순위 순으로 반환합니다. (메모리 대기열에 없을 때 사용)
+    db_queue_lock 을 얻은 뒤 새 트랜잭션에서 호출해야 다른 워커가 방금 커밋한 행이 보입니다.
+    - scored: 점수가 가까운 최대 limit 개 중 허용 범위 안의 후보를 candidate_rank 순으로
+    - fifo: 먼저 등록한 순서
+    """
+    sql = f"""
+        SELECT {_ENTRY_FIELDS} FROM MatchQueue
+        WHERE status = 'WAITING' AND sport = %s AND sido = %s AND club_id != %s
+    """
+    params = [requester['sport'], requester['sido'], requester['club_id']]
+    if mode == 'scored':
+        sql += " ORDER BY ABS(COALESCE(point, %s) - %s), created_at, id LIMIT %s"
+        params.extend([DEFAULT_POINT, _entry_point(requester), limit])
+    else:
+        sql += " ORDER BY created_at, id LIMIT %s"
+        params.append(limit)
+    cursor.execute(sql, tuple(params))
+    rows = cursor.fetchall()
+    if mode != 'scored':
+        return rows
+
+    now = now or datetime.now()
+    ranked = []
+    for row in rows:
+        rank = candidate_rank(requester, row, now)
+        if rank is not None:
+            ranked.append((rank, row))
+    ranked.sort(key=lambda item: item[0])
+    return [row for _, row in ranked]
+
+
+class MatchmakingEngine:
+    """
+    (종목, 시도) 키별 대기열.
+    - OrderedDict(club_id -> entry): 등록/취소/선두 추출이 O(1) 인 FIFO 대기열
+    - 점수 정렬 인덱스 [(point, id, club_id), ...]: 점수 근접 후보를 이분 탐색으로 조회
+    """
+
+    def __init__(self, resync=MATCH_QUEUE_RESYNC):
+        self.resync = resync
+        self._queues = {}          # (sport, sido) -> OrderedDict(club_id -> entry)
+        self._club_index = {}      # club_id -> (sport, sido)
+        self._rating_index = {}    # (sport, sido) -> 정렬된 [(point, id, club_id), ...]
+        self._key_locks = {}       # (sport, sido) -> Lock
+        self._lock = threading.Lock()
+        self._loaded_at = None
+
+    # ----- 키 단위 락 -----
+
+    @contextmanager
+    def lock(self, sport, sido):
+        """
+        같은 (종목, 시도) 대기열에 대한 매칭 처리를 직렬화합니다.
+        """
+        key = (sport, sido)
+        with self._lock:
+            key_lock = self._key_locks.get(key)
+            if key_lock is None:
+                key_lock = self._key_locks[key] = threading.Lock()
+        with key_lock:
+            yield
+
+    # ----- DB 동기화 -----
+
+    def ensure_loaded(self, cursor):
+        """
+        최초 사용 시 또는 재동기화 주기가 지났을 때 MatchQueue 의 대기 행을 읽어옵니다.
+        cursor 는 dictionary=True 커서여야 합니다.
+        """
+        now = time.monotonic()
+        if self._loaded_at is not None and (not self.resync or now - self._loaded_at < self.resync):
+            return
+        self.load(cursor)
+
+    def load(self, cursor):
+        cursor.execute(f"""
+            SELECT {_ENTRY_FIELDS} FROM MatchQueue
+            WHERE status = 'WAITING'
+            ORDER BY created_at ASC, id ASC
+        """)
+        rows = cursor.fetchall()
+
+        queues = {}
+        club_index = {}
+        rating_index = {}
+        for row in rows:
+            # 중복 확인과 INSERT 가 원자적이지 않아 한 클럽의 WAITING 행이 여럿일 수 있음
+            # -> 클럽당 가장 먼저 등록한 행만 사용 (큐와 점수 인덱스가 항상 같은 행을 가리키도록)
+            if row['club_id'] in club_index:
+                continue
+            key = (row['sport'], row['sido'])
+            queues.setdefault(key, OrderedDict())[row['club_id']] = row
+            club_index[row['club_id']] = key
+            rating_index.setdefault(key, []).append(self._rating_key(row))
+        for index in rating_index.values():
+            index.sort()
+
+        with self._lock:
+            self._queues = queues
+            self._club_index = club_index
+            self._rating_index = rating_index
+            self._loaded_at = time.monotonic()
+
+    # ----- 점수 인덱스 (락을 잡은 상태에서 호출) -----
+
+    @staticmethod
+    def _rating_key(entry):
+        return (_entry_point(entry), entry['id'], entry['club_id'])
+
+    def _index_add(self, key, entry):
+        bisect.insort(self._rating_index.setdefault(key, []), self._rating_key(entry))
+
+    def _index_remove(self, key, entry):
+        index = self._rating_index.get(key)
+        if not index:
+            return
+        rating_key = self._rating_key(entry)
+        pos = bisect.bisect_left(index, rating_key)
+        if pos < len(index) and index[pos] == rating_key:
+            del index[pos]
+
+    def _take(self, key, club_id):
+        entry = self._queues[key].pop(club_id)
+        self._club_index.pop(club_id, None)
+        self._index_remove(key, entry)
+        return entry
+
+    # ----- 대기열 조작 -----
+
+    def enqueue(self, entry):
+        """
+        대기열 맨 뒤에 등록합니다. (DB 커밋 이후 호출)
+        """
+        key = (entry['sport'], entry['sido'])
+        with self._lock:
+            if entry['club_id'] in self._club_index:
+                # 이미 대기 중인 클럽이면 기존 항목(과 그 인덱스)을 교체
+                self._take(self._club_index[entry['club_id']], entry['club_id'])
+            self._queues.setdefault(key, OrderedDict())[entry['club_id']] = entry
+            self._club_index[entry['club_id']] = key
+            self._index_add(key, entry)
+
+    def restore(self, entry):
+        """
+        꺼냈지만 DB 반영에 실패한 후보를 원래 순서(맨 앞)로 되돌립니다.
+        """
+        key = (entry['sport'], entry['sido'])
+        with self._lock:
+            if entry['club_id'] in self._club_index:
+                return   # 그 사이 다시 등록된 클럽은 현재 항목 유지
+            queue = self._queues.setdefault(key, OrderedDict())
+            queue[entry['club_id']] = entry
+            queue.move_to_end(entry['club_id'], last=False)
+            self._club_index[entry['club_id']] = key
+            self._index_add(key, entry)
+
+    def pop_candidate(self, sport, sido, exclude_club_id=None):
+        """
+        가장 먼저 등록한 상대(내 클럽 제외)를 대기열에서 꺼냅니다. 없으면 None.
+        한 클럽은 대기열에 최대 1개만 존재하므로 건너뛰는 항목도 최대 1개입니다.
+        """
+        key = (sport, sido)
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                return None
+            for club_id in queue:
+                if str(club_id) != str(exclude_club_id):
+                    return self._take(key, club_id)
+            return None
+
+    def pop_best(self, sport, sido, requester, now=None):
+        """
+        점수 기반 매칭: 요청 팀과 가장 적합한 상대를 대기열에서 꺼냅니다. 없으면 None.
+        - 요청 팀 점수 기준으로 가까운 후보부터 양방향으로 최대 MATCH_SCAN_LIMIT 개만 확인
+        - 후보별 허용 점수 차는 그 후보의 대기 시간에 따라 넓어짐 (rating_window)
+        - 허용 범위 안의 후보 중 match_score 가 가장 낮은 팀 (동점이면 먼저 등록한 팀)
+        """
+        key = (sport, sido)
+        now = now or datetime.now()
+        my_point = _entry_point(requester)
+        exclude = str(requester.get('club_id'))
+
+        with self._lock:
+            index = self._rating_index.get(key)
+            if not index:
+                return None
+
+            # 이분 탐색으로 시작 위치를 찾은 뒤 점수 차가 작은 쪽부터 확장
+            right = bisect.bisect_left(index, (my_point,))
+            left = right - 1
+            best = None
+            scanned = 0
+
+            while scanned < MATCH_SCAN_LIMIT and (left >= 0 or right < len(index)):
+                left_gap = my_point - index[left][0] if left >= 0 else None
+                right_gap = index[right][0] - my_point if right < len(index) else None
+                if right_gap is None or (left_gap is not None and left_gap <= right_gap):
+                    gap, item = left_gap, index[left]
+                    left -= 1
+                else:
+                    gap, item = right_gap, index[right]
+                    right += 1
+
+                # 가까운 쪽부터 보므로, 최대 허용 범위를 벗어나면 나머지 후보도 모두 불가
+                if gap > MATCH_ELO_MAX_WINDOW:
+                    break
+                scanned += 1
+
+                club_id = item[2]
+                if str(club_id) == exclude:
+                    continue
+                candidate = self._queues[key].get(club_id)
+                if candidate is None or candidate['id'] != item[1]:
+                    # 대기열 항목과 맞지 않는 인덱스 항목 (재동기화 전까지 무시)
+                    continue
+                rank = candidate_rank(requester, candidate, now)
+                if rank is None:
+                    continue
+                if best is None or rank < best[0]:
+                    best = (rank, club_id)
+
+            if best is None:
+                return None
+            return self._take(key, best[1])
+
+    def remove_club(self, club_id):
+        """
+        클럽의 대기 항목을 제거하고 반환합니다. (취소/만료 시)
+        """
+        with self._lock:
+            key = self._club_index.get(club_id)
+            if key is None:
+                return None
+            return self._take(key, club_id)
+
+    def is_waiting(self, club_id):
+        with self._lock:
+            return club_id in self._club_index
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queues': len(self._queues),
+                'waiting': len(self._club_index),
+            }
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_matchmaking_engine():
+    """
+    프로세스 단위 매칭 엔진 싱글턴을 반환합니다.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = MatchmakingEngine()
+    return _engine
@@ -0,0 +1,378 @@
+import atexit
+import hashlib
+import logging
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+from werkzeug.utils import secure_filename
+from utils.db import db_cursor
+from utils.images import variants_enabled, variant_key, make_variants, record_variants, IMAGE_VARIANTS
+from utils.response_cache import invalidate, invalidate_club
+from utils.dashboard import invalidate_club_dashboards
+from utils.leaderboard import get_leaderboards
+
+# ==========================================
+# 이미지 업로드 (Media Upload Service)
+# ==========================================
+# 클럽/프로필/게시글 이미지를 저장소에 올리는 공용 서비스입니다.
+# - storage.Client 를 워커 프로세스당 1개만 만들어 재사용 (요청마다 인증/커넥션 생성 X)
+# - 파일 전체를 read() 하지 않고 MEDIA_CHUNK_SIZE 단위로 스트리밍 업로드 (resumable upload)
+# - MEDIA_UPLOAD_MODE='background' 면 요청 스트림을 임시 파일로 옮긴 뒤 바로 응답하고,
+#   업로드가 끝나면 해당 행의 이미지 URL 컬럼을 갱신
+# - MEDIA_BACKEND='local' 이면 GCS 대신 로컬 디렉터리에 저장 (개발/테스트용)
+# - Pillow 가 있으면 원본 업로드 후 워커 풀에서 크기별 변형(utils.images)을 생성하여 함께 저장
+# - 저장 키는 내용의 SHA-256 (스트리밍 중 계산). 같은 이미지는 한 번만 올리고, 키가 바뀌지 않으므로
+#   Cache-Control: immutable 로 CDN/클라이언트가 1년간 캐시
+
+MEDIA_BACKEND = os.environ.get('MEDIA_BACKEND', 'gcs')              # 'gcs' | 'local'
+MEDIA_UPLOAD_MODE = os.environ.get('MEDIA_UPLOAD_MODE', 'sync')     # 'sync' | 'background'
+MEDIA_UPLOAD_WORKERS = int(os.environ.get('MEDIA_UPLOAD_WORKERS', 4))
+MEDIA_UPLOAD_RETRIES = int(os.environ.get('MEDIA_UPLOAD_RETRIES', 3))
+# GCS resumable upload 의 chunk 크기는 256KB 의 배수여야 함
+MEDIA_CHUNK_SIZE = int(os.environ.get('MEDIA_CHUNK_SIZE', 1024 * 1024))
+MEDIA_LOCAL_DIR = os.environ.get('MEDIA_LOCAL_DIR', os.path.join(os.getcwd(), 'media'))
+MEDIA_LOCAL_URL = os.environ.get('MEDIA_LOCAL_URL', '/media')
+MEDIA_CACHE_CONTROL = os.environ.get('MEDIA_CACHE_CONTROL', 'public, max-age=31536000, immutable')
+MEDIA_CACHE_MAX_AGE = 31536000   # 로컬 백엔드 응답용 (초)
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================
+# 1. 저장소 백엔드 (Storage Backends)
+# ==========================================
+
+class GCSBackend:
+    """
+    Google Cloud Storage 버킷. 클라이언트는 프로세스(pid)별로 한 번만 생성합니다.
+    """
+
+    def __init__(self, bucket_name=None, chunk_size=MEDIA_CHUNK_SIZE):
+        self.bucket_name = bucket_name or os.environ.get('GCS_BUCKET')
+        self.chunk_size = chunk_size
+        self._bucket = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_bucket(self):
+        # Gunicorn fork 이후 부모의 HTTP 세션을 공유하지 않도록 pid 기준으로 생성
+        if self._bucket is None or self._pid != os.getpid():
+            with self._lock:
+                if self._bucket is None or self._pid != os.getpid():
+                    from google.cloud import storage
+                    self._bucket = storage.Client().bucket(self.bucket_name)
+                    self._pid = os.getpid()
+        return self._bucket
+
+    def upload(self, key, fileobj, content_type=None):
+        blob = self._get_bucket().blob(key, chunk_size=self.chunk_size)
+        blob.cache_control = MEDIA_CACHE_CONTROL
+        # 동시에 같은 이미지를 올리는 경우 먼저 생성된 객체를 유지 (내용이 같으므로 실패해도 무방)
+        try:
+            blob.upload_from_file(fileobj, content_type=content_type, if_generation_match=0)
+        except Exception as e:
+            if getattr(e, 'code', None) != 412:
+                raise
+        return blob.public_url
+
+    def exists(self, key):
+        return self._get_bucket().blob(key).exists()
+
+    def url(self, key):
+        return self._get_bucket().blob(key).public_url
+
+    def download(self, key, fileobj):
+        self._get_bucket().blob(key, chunk_size=self.chunk_size).download_to_file(fileobj)
+
+    def key_for_url(self, url):
+        prefix = f"https://storage.googleapis.com/{self.bucket_name}/"
+        return unquote(url[len(prefix):]) if url.startswith(prefix) else None
+
+
+class LocalBackend:
+    """
+    로컬 디렉터리 저장소. URL 은 MEDIA_LOCAL_URL 기준 경로입니다.
+    """
+
+    def __init__(self, root=MEDIA_LOCAL_DIR, base_url=MEDIA_LOCAL_URL, chunk_size=MEDIA_CHUNK_SIZE):
+        self.root = root
+        self.base_url = base_url.rstrip('/')
+        self.chunk_size = chunk_size
+
+    def path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+
+    def upload(self, key, fileobj, content_type=None):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 임시 파일에 쓴 뒤 교체하여 읽는 쪽이 쓰다 만 파일을 보지 않도록 함
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as out:
+            shutil.copyfileobj(fileobj, out, self.chunk_size)
+        os.replace(tmp_path, path)
+        return self.url(key)
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def url(self, key):
+        return f"{self.base_url}/{key}"
+
+    def download(self, key, fileobj):
+        with open(self.path(key), 'rb') as f:
+            shutil.copyfileobj(f, fileobj, self.chunk_size)
+
+    def key_for_url(self, url):
+        prefix = f"{self.base_url}/"
+        return url[len(prefix):] if url.startswith(prefix) else None
+
+
+def _create_backend():
+    if MEDIA_BACKEND == 'local':
+        return LocalBackend()
+    return GCSBackend()
+
+
+# ==========================================
+# 2. 업로드 서비스 (Upload Service)
+# ==========================================
+
+class StagedUpload:
+    """
+    요청 스트림을 옮겨 둔 임시 파일. 복사하면서 계산한 내용 해시로 저장 키가 정해집니다.
+    """
+
+    def __init__(self, key, path, content_type, size):
+        self.key = key
+        self.path = path
+        self.content_type = content_type
+        self.size = size
+        self.submitted = False
+
+    def discard(self):
+        """
+        업로드를 예약하지 않은 경우(DB 오류 등) 임시 파일을 삭제합니다.
+        """
+        if not self.submitted and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _extension(file):
+    ext = os.path.splitext(secure_filename(file.filename or ''))[1].lower()
+    if not ext and file.content_type:
+        ext = mimetypes.guess_extension(file.content_type.split(';')[0].strip()) or ''
+    return ext if len(ext) <= 10 else ''
+
+
+class MediaService:
+
+    def __init__(self, backend=None, background=None):
+        self.backend = backend or _create_backend()
+        self.background = MEDIA_UPLOAD_MODE == 'background' if background is None else background
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.stats = {'uploaded': 0, 'deduplicated': 0, 'bytes': 0, 'bytes_saved': 0,
+                      'background': 0, 'variants': 0, 'errors': 0}
+
+    def stage(self, file, prefix=''):
+        """
+        요청이 끝나기 전에 업로드 스트림을 임시 파일로 옮기면서 SHA-256 을 계산합니다.
+        (chunk 단위 복사, 메모리에 전체를 올리지 않음) 키: {prefix}{해시}{확장자}
+        """
+        digest = hashlib.sha256()
+        size = 0
+        fd, path = tempfile.mkstemp(prefix='round-upload-')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                while True:
+                    chunk = file.stream.read(MEDIA_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+        except Exception:
+            os.remove(path)
+            raise
+        key = f"{prefix}{digest.hexdigest()}{_extension(file)}"
+        return StagedUpload(key, path, file.content_type, size)
+
+    def _missing_variants(self, key):
+        """
+        원본 옆에 없는 변형 이름 목록 (이전 변형 생성이 실패했거나 워커 재시작으로 유실된 경우)
+        """
+        if not variants_enabled():
+            return []
+        return [name for name in IMAGE_VARIANTS if not self.backend.exists(variant_key(key, name))]
+
+    def _store(self, staged):
+        """
+        같은 내용의 객체가 이미 있으면 업로드를 건너뛰고, 없으면 원본을 저장합니다.
+        반환: (URL, 변형을 (다시) 생성해야 하는지 여부)
+        - 중복이어도 변형이 빠져 있으면 True -> 같은 파일을 다시 올리면 변형이 복구됨
+        """
+        if self.backend.exists(staged.key):
+            self.stats['deduplicated'] += 1
+            self.stats['bytes_saved'] += staged.size
+            missing = self._missing_variants(staged.key)
+            if missing:
+                logger.info(f"Regenerating missing variants {missing} for {staged.key}")
+            return self.backend.url(staged.key), bool(missing)
+        with open(staged.path, 'rb') as f:
+            url = self.backend.upload(staged.key, f, staged.content_type)
+        self.stats['uploaded'] += 1
+        self.stats['bytes'] += staged.size
+        return url, True
+
+    def upload(self, file, prefix=''):
+        """
+        업로드 파일(FileStorage)을 저장하고 공개 URL 을 반환합니다.
+        변형 생성은 워커 풀에 맡깁니다.
+        """
+        staged = self.stage(file, prefix)
+        try:
+            url, needs_variants = self._store(staged)
+            if needs_variants and variants_enabled():
+                staged.submitted = True
+                self._get_executor().submit(self._variants_staged, staged)
+            return url
+        finally:
+            staged.discard()
+
+    def store_variants(self, key, fileobj):
+        """
+        원본에서 크기별 변형을 생성하여 원본 옆에 저장하고, 모두 저장된 뒤 MediaVariants 에 기록합니다.
+        """
+        names = []
+        for name, buf in make_variants(fileobj).items():
+            self.backend.upload(variant_key(key, name), buf, 'image/jpeg')
+            self.stats['variants'] += 1
+            names.append(name)
+        record_variants(self.backend.url(key), names)
+
+    def _variants_staged(self, staged):
+        try:
+            with open(staged.path, 'rb') as f:
+                self.store_variants(staged.key, f)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Image variant error {staged.key}: {e}")
+        finally:
+            if os.path.exists(staged.path):
+                os.remove(staged.path)
+
+    # ----- 백그라운드 업로드 -----
+
+    def _get_executor(self):
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=MEDIA_UPLOAD_WORKERS,
+                                                        thread_name_prefix='media-upload')
+                    self._pid = os.getpid()
+        return self._executor
+
+    def upload_async(self, staged, on_done=None):
+        """
+        임시 파일 업로드를 워커 스레드에 예약합니다. 완료 시 on_done(url) 을 호출합니다.
+        """
+        staged.submitted = True
+        self.stats['background'] += 1
+        return self._get_executor().submit(self._upload_staged, staged, on_done)
+
+    def _upload_staged(self, staged, on_done):
+        try:
+            for attempt in range(MEDIA_UPLOAD_RETRIES):
+                try:
+                    url, needs_variants = self._store(staged)
+                    break
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    logger.error(f"Media upload error {staged.key} (attempt {attempt + 1}): {e}")
+                    time.sleep(min(0.5 * (2 ** attempt), 5))
+            else:
+                logger.error(f"Media upload failed: {staged.key}")
+                return None
+
+            # 변형이 준비된 뒤에 행을 갱신하여 목록에 빈 썸네일이 보이지 않도록 함
+            if needs_variants and variants_enabled():
+                try:
+                    with open(staged.path, 'rb') as f:
+                        self.store_variants(staged.key, f)
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    logger.error(f"Image variant error {staged.key}: {e}")
+
+            if on_done:
+                on_done(url)
+            return url
+        except Exception as e:
+            logger.error(f"Media upload callback error {staged.key}: {e}")
+        finally:
+            if os.path.exists(staged.path):
+                os.remove(staged.path)
+
+    def shutdown(self):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=True)
+
+
+def update_image_url(table, column, row_id):
+    """
+    백그라운드 업로드 완료 후 해당 행의 이미지 URL 을 갱신하는 콜백을 만듭니다.
+    table/column 은 코드 상수만 사용합니다. (사용자 입력 X)
+    """
+    def _update(url):
+        with db_cursor(commit=True) as cursor:
+            cursor.execute(f"UPDATE {table} SET {column} = %s WHERE id = %s", (url, row_id))
+            owner = _image_owner(cursor, table, row_id)
+        # 커밋 후에 무효화해야 다른 요청이 옛 값을 다시 캐시하지 않음
+        _invalidate_image(table, row_id, url, owner)
+    return _update
+
+
+def _image_owner(cursor, table, row_id):
+    """
+    무효화 대상을 정하는 데 필요한 값(클럽: 종목, 게시글: 클럽 ID)을 조회합니다. 행이 없으면 None
+    """
+    if table == 'Clubs':
+        cursor.execute("SELECT sport FROM Clubs WHERE id = %s", (row_id,))
+    elif table == 'Posts':
+        cursor.execute("SELECT club_id FROM Posts WHERE id = %s", (row_id,))
+    else:
+        return None
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _invalidate_image(table, row_id, url, owner):
+    """
+    이미지가 바뀐 행을 담고 있는 응답 캐시/대시보드/랭킹 사본을 갱신합니다.
+    """
+    if table == 'Clubs':
+        invalidate_club(row_id, 'info')
+        invalidate('clubs_list', *([f"ranking:{owner}"] if owner else []))
+        invalidate_club_dashboards(row_id)
+        get_leaderboards().update_image(row_id, url)
+    elif table == 'Posts' and owner:
+        invalidate_club(owner, 'posts')
+
+
+_media = None
+_media_lock = threading.Lock()
+
+
+def get_media_service():
+    global _media
+    if _media is None:
+        with _media_lock:
+            if _media is None:
+                _media = MediaService()
+                atexit.register(_media.shutdown)
+    return _media
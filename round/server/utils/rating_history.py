@@ -0,0 +1,131 @@
+import math
+import os
+from datetime import datetime, timedelta
+from utils.cursor import encode_cursor
+
+# ==========================================
+# 클럽 레이팅 이력 (Rating History)
+# ==========================================
+# ClubRatingHistory 는 결과 확정(utils.results.commit_result) 때만 추가되는 이력입니다.
+# - 기간 조회: (club_id, created_at) 인덱스 범위 스캔 + (created_at, id) 키셋 페이지네이션
+# - 추이 그래프: 기간을 최대 points 개 구간으로 나눠 구간별 마지막 포인트/최저/최고만 반환
+#   (구간 집계는 DB 에서 GROUP BY 로 처리하므로 응답 크기가 경기 수와 무관)
+# 주의: utils.elo_batch 로 전체 재계산하면 Clubs.point 는 바뀌지만 이력은 그대로 남습니다.
+
+RATING_HISTORY_PAGE_SIZE = int(os.environ.get('RATING_HISTORY_PAGE_SIZE', 20))
+RATING_HISTORY_PAGE_SIZE_MAX = int(os.environ.get('RATING_HISTORY_PAGE_SIZE_MAX', 100))
+RATING_SERIES_DAYS = int(os.environ.get('RATING_SERIES_DAYS', 90))        # 기간 미지정 시 최근 N일
+RATING_SERIES_POINTS = int(os.environ.get('RATING_SERIES_POINTS', 60))
+RATING_SERIES_POINTS_MAX = int(os.environ.get('RATING_SERIES_POINTS_MAX', 365))
+RATING_SERIES_MIN_BUCKET = int(os.environ.get('RATING_SERIES_MIN_BUCKET', 3600))  # 초
+
+
+def _parse_time(value, end=False):
+    """
+    'YYYY-MM-DD' 또는 ISO8601 시각. 날짜만 주어진 종료 시각은 그 날 전체를 포함합니다.
+    오프셋이 있는 시각(예: +09:00)은 서버 로컬 시각으로 바꾼 뒤 tzinfo 를 제거합니다. (DB 값과 같은 naive)
+    형식이 잘못되면 ValueError 를 발생시킵니다.
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+def parse_range(start=None, end=None, default_days=RATING_SERIES_DAYS):
+    """
+    조회 기간 [start, end) 를 datetime 으로 변환합니다. start 가 없으면 end 기준 최근 default_days 일.
+    """
+    end_at = _parse_time(end, end=True) if end else datetime.now()
+    start_at = _parse_time(start) if start else end_at - timedelta(days=default_days)
+    if start_at >= end_at:
+        raise ValueError("from must be earlier than to")
+    return start_at, end_at
+
+
+def fetch_history(cursor, club_id, start_at=None, end_at=None, after=None, limit=RATING_HISTORY_PAGE_SIZE):
+    """
+    기간 내 이력을 최신순으로 조회합니다. after: decode_cursor() 결과 (이전 페이지 마지막 행)
+    반환: (rows, next_cursor)
+    """
+    sql = """
+        SELECT R.id, R.match_id, R.opponent_club_id, R.point_before, R.point_after,
+               R.point_after - R.point_before as point_delta, R.result, R.created_at,
+               C.name as opponent_name
+        FROM ClubRatingHistory R
+        JOIN Clubs C ON R.opponent_club_id = C.id
+        WHERE R.club_id = %s
+    """
+    params = [club_id]
+    if start_at:
+        sql += " AND R.created_at >= %s"
+        params.append(start_at)
+    if end_at:
+        sql += " AND R.created_at < %s"
+        params.append(end_at)
+    if after:
+        sql += " AND (R.created_at < %s OR (R.created_at = %s AND R.id < %s))"
+        params.extend([after[0], after[0], after[1]])
+    sql += " ORDER BY R.created_at DESC, R.id DESC LIMIT %s"
+    params.append(limit + 1)  # 다음 페이지 존재 여부 확인용 1개 추가
+
+    cursor.execute(sql, tuple(params))
+    rows = cursor.fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id']) if has_more else None
+
+    for row in rows:
+        row['time'] = row.pop('created_at').strftime('%Y-%m-%d %H:%M')
+    return rows, next_cursor
+
+
+def fetch_series(cursor, club_id, start_at, end_at, points=RATING_SERIES_POINTS):
+    """
+    기간을 points 개 이하의 구간으로 나눈 포인트 추이를 반환합니다.
+    구간별: 구간 시작 시각, 마지막 포인트(point), 최저(low), 최고(high), 경기 수(matches)
+    start_point 는 기간 내 첫 경기 직전 포인트입니다. (경기가 없으면 None)
+    """
+    points = min(max(points, 1), RATING_SERIES_POINTS_MAX)
+    span = (end_at - start_at).total_seconds()
+    bucket = max(int(math.ceil(span / points)), RATING_SERIES_MIN_BUCKET)
+
+    cursor.execute("""
+        SELECT FROM_UNIXTIME(FLOOR(UNIX_TIMESTAMP(created_at) / %s) * %s) as bucket_start,
+               MIN(LEAST(point_before, point_after)) as low,
+               MAX(GREATEST(point_before, point_after)) as high,
+               COUNT(*) as matches, MIN(id) as first_id, MAX(id) as last_id
+        FROM ClubRatingHistory
+        WHERE club_id = %s AND created_at >= %s AND created_at < %s
+        GROUP BY bucket_start
+        ORDER BY bucket_start
+    """, (bucket, bucket, club_id, start_at, end_at))
+    buckets = cursor.fetchall()
+    if not buckets:
+        return {'bucket_seconds': bucket, 'start_point': None, 'points': []}
+
+    # 구간 경계 행의 포인트를 한 번에 조회
+    ids = [buckets[0]['first_id']] + [b['last_id'] for b in buckets]
+    format_strings = ','.join(['%s'] * len(ids))
+    cursor.execute(f"""
+        SELECT id, point_before, point_after FROM ClubRatingHistory WHERE id IN ({format_strings})
+    """, tuple(ids))
+    by_id = {row['id']: row for row in cursor.fetchall()}
+
+    series = []
+    for b in buckets:
+        series.append({
+            'time': b['bucket_start'].strftime('%Y-%m-%d %H:%M'),
+            'point': by_id[b['last_id']]['point_after'],
+            'low': b['low'],
+            'high': b['high'],
+            'matches': b['matches'],
+        })
+    return {
+        'bucket_seconds': bucket,
+        'start_point': by_id[buckets[0]['first_id']]['point_before'],
+        'points': series,
+    }
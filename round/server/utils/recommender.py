@@ -0,0 +1,194 @@
+import bisect
+import itertools
+import os
+import random
+import threading
+import time
+from utils.db import db_cursor
+
+# ==========================================
+# 추천 동호회 샘플링 (Recommendation Sampler)
+# ==========================================
+# ORDER BY RAND() 는 조건에 맞는 클럽 전체를 읽고 정렬하므로 클럽 수에 비례해 느려집니다.
+# (종목, 시도, 시군구) 조합별 후보 ID 풀을 메모리에 두고 k 개만 뽑은 뒤,
+# 뽑힌 ID 만 PK 로 조회합니다.
+# - 풀 키: 종목/지역 각각 '전체(ALL)' 를 포함하여 클럽 하나가 최대 6개 풀에 속함
+# - 가중치 모드: None(균등), 'rating'(점수가 높을수록), 'activity'(멤버가 많을수록)
+
+RECOMMEND_RESYNC = float(os.environ.get('RECOMMEND_RESYNC', 600))  # 초, 0 이면 최초 1회만 로드
+
+ALL = '*'
+WEIGHT_MODES = ('rating', 'activity')
+
+
+def _pool_keys(club):
+    sports = (club['sport'], ALL)
+    regions = ((ALL, ALL), (club['sido'], ALL), (club['sido'], club['sigungu']))
+    return [(sport, sido, sigungu) for sport in sports for sido, sigungu in regions]
+
+
+def _lookup_key(sport, sido, sigungu):
+    # 기존 쿼리와 동일하게 시군구 조건은 시도가 있을 때만 적용
+    if not sido:
+        return (sport or ALL, ALL, ALL)
+    return (sport or ALL, sido, sigungu or ALL)
+
+
+def _weight(club, mode):
+    if mode == 'rating':
+        # ELO 척도: 400점 높을 때 10배 (과도한 쏠림 방지를 위해 상한)
+        return min(10 ** (((club.get('point') or 1000) - 1000) / 400), 100.0)
+    if mode == 'activity':
+        return (club.get('member_count') or 0) + 1
+    return 1.0
+
+
+class _Pool:
+    """
+    O(1) 추가/삭제가 가능한 ID 목록 (삭제 시 마지막 원소와 자리 교체)
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.pos = {}
+        self.version = 0
+
+    def add(self, club_id):
+        if club_id in self.pos:
+            return
+        self.pos[club_id] = len(self.ids)
+        self.ids.append(club_id)
+        self.version += 1
+
+    def remove(self, club_id):
+        idx = self.pos.pop(club_id, None)
+        if idx is None:
+            return
+        last = self.ids.pop()
+        if last != club_id:
+            self.ids[idx] = last
+            self.pos[last] = idx
+        self.version += 1
+
+
+class ClubRecommender:
+    """
+    조건별 후보 풀에서 추천 클럽을 뽑습니다. 모든 메서드는 스레드 안전합니다.
+    """
+
+    def __init__(self, resync=RECOMMEND_RESYNC):
+        self.resync = resync
+        self._pools = {}        # (sport, sido, sigungu) -> _Pool
+        self._clubs = {}        # club_id -> {'sport', 'sido', 'sigungu', 'point', 'member_count'}
+        self._cum_weights = {}  # (pool_key, mode) -> (version, 누적 가중치 리스트)
+        self._lock = threading.Lock()
+        self._loaded_at = None
+
+    # ----- DB 동기화 -----
+
+    def ensure_loaded(self):
+        now = time.monotonic()
+        if self._loaded_at is not None and (not self.resync or now - self._loaded_at < self.resync):
+            return
+        self.load()
+
+    def load(self):
+        with db_cursor(dictionary=True) as cursor:
+            cursor.execute("SELECT id, sport, sido, sigungu, point, member_count FROM Clubs")
+            rows = cursor.fetchall()
+
+        pools = {}
+        clubs = {}
+        for row in rows:
+            clubs[row['id']] = row
+            for key in _pool_keys(row):
+                pools.setdefault(key, _Pool()).add(row['id'])
+
+        with self._lock:
+            self._pools = pools
+            self._clubs = clubs
+            self._cum_weights = {}
+            self._loaded_at = time.monotonic()
+
+    # ----- 증분 갱신 -----
+
+    def add_club(self, club):
+        """
+        클럽 생성 시 후보 풀에 추가합니다.
+        """
+        if self._loaded_at is None:
+            return   # 최초 로드 시 함께 읽힘
+        with self._lock:
+            old = self._clubs.get(club['id'])
+            if old:
+                for key in _pool_keys(old):
+                    self._pools[key].remove(old['id'])
+            self._clubs[club['id']] = dict(club)
+            for key in _pool_keys(club):
+                self._pools.setdefault(key, _Pool()).add(club['id'])
+
+    def remove_club(self, club_id):
+        with self._lock:
+            club = self._clubs.pop(club_id, None)
+            if not club:
+                return
+            for key in _pool_keys(club):
+                self._pools[key].remove(club_id)
+
+    # ----- 샘플링 -----
+
+    def _cumulative(self, key, pool, mode):
+        cached = self._cum_weights.get((key, mode))
+        if cached and cached[0] == pool.version:
+            return cached[1]
+        cum = list(itertools.accumulate(_weight(self._clubs[cid], mode) for cid in pool.ids))
+        self._cum_weights[(key, mode)] = (pool.version, cum)
+        return cum
+
+    def sample(self, sport=None, sido=None, sigungu=None, k=10, weight=None):
+        """
+        조건에 맞는 클럽 ID 를 최대 k 개 중복 없이 무작위로 뽑습니다.
+        - 균등: random.sample (O(k))
+        - 가중치: 누적 가중치(풀 변경 시에만 재계산)에서 이분 탐색 추출 (O(k log n))
+        """
+        self.ensure_loaded()
+        key = _lookup_key(sport, sido, sigungu)
+
+        with self._lock:
+            pool = self._pools.get(key)
+            if not pool or not pool.ids:
+                return []
+            if len(pool.ids) <= k:
+                picked = list(pool.ids)
+                random.shuffle(picked)
+                return picked
+            if weight not in WEIGHT_MODES:
+                return random.sample(pool.ids, k)
+
+            cum = self._cumulative(key, pool, weight)
+            total = cum[-1]
+            picked = []
+            seen = set()
+            # 중복이 나오면 다시 뽑되, 가중치 쏠림이 심한 경우를 대비해 시도 횟수 제한
+            for _ in range(k * 10):
+                idx = bisect.bisect_right(cum, random.random() * total)
+                club_id = pool.ids[min(idx, len(pool.ids) - 1)]
+                if club_id not in seen:
+                    seen.add(club_id)
+                    picked.append(club_id)
+                    if len(picked) == k:
+                        break
+            return picked
+
+
+_recommender = None
+_recommender_lock = threading.Lock()
+
+
+def get_recommender():
+    global _recommender
+    if _recommender is None:
+        with _recommender_lock:
+            if _recommender is None:
+                _recommender = ClubRecommender()
+    return _recommender
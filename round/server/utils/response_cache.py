@@ -0,0 +1,106 @@
+import hashlib
+import os
+import threading
+import time
+from functools import wraps
+from flask import current_app, request, session
+from utils.cache import TTLCache
+
+# ==========================================
+# 응답 캐시 (Response Cache + Conditional GET)
+# ==========================================
+# 화면 진입마다 호출되는 조회 API 의 JSON 응답을 (경로 + 쿼리 파라미터) 단위로 캐시합니다.
+# - 무효화: 응답마다 태그(예: 'club:3:posts')를 달고, 쓰기 API 가 invalidate() 로 태그 버전을 올림
+#   (캐시 항목을 찾아 지우지 않고, 저장 당시 버전과 다르면 미스로 처리 -> O(태그 수))
+# - 조건부 GET: ETag(본문 해시) / Last-Modified 를 내려주고, If-None-Match / If-Modified-Since 가
+#   맞으면 쿼리도 본문도 없이 304 응답
+# - 캐시와 태그 버전은 워커 프로세스 단위입니다. 다른 워커의 쓰기는 RESPONSE_CACHE_TTL 이내에 반영되므로
+#   워커가 여러 개면 TTL 을 짧게 유지합니다.
+
+RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', '1') == '1'
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 15))        # 초
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 5000))
+
+_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+_versions = {}     # tag -> 버전
+_versions_lock = threading.Lock()
+
+
+def tag_versions(tags):
+    """
+    태그별 현재 버전. 다른 캐시(예: 사용자 대시보드)도 같은 무효화 태그를 공유할 때 사용합니다.
+    """
+    with _versions_lock:
+        return tuple(_versions.get(tag, 0) for tag in tags)
+
+
+def invalidate(*tags):
+    """
+    태그가 달린 캐시 응답을 모두 무효화합니다. (쓰기 커밋 후 호출)
+    """
+    with _versions_lock:
+        for tag in tags:
+            _versions[tag] = _versions.get(tag, 0) + 1
+
+
+def invalidate_club(club_id, *sections):
+    """
+    클럽 화면 섹션별 캐시 무효화. sections: 'info', 'schedules', 'posts', 'matches', 'rating'
+    """
+    invalidate(*(f"club:{club_id}:{section}" for section in sections))
+
+
+def cached_response(tags, ttl=None, per_user=False):
+    """
+    GET 뷰의 200 응답을 캐시하는 데코레이터.
+
+    Args:
+        tags (callable): 뷰 인자(kwargs)를 받아 태그 목록을 반환
+        ttl (float): 항목별 TTL (기본 RESPONSE_CACHE_TTL)
+        per_user (bool): 로그인 사용자별로 응답이 다르면 True (세션 user_id 를 키에 포함)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not RESPONSE_CACHE_ENABLED:
+                return view(*args, **kwargs)
+
+            tag_list = tags(kwargs)
+            key = (
+                request.path,
+                tuple(sorted(request.args.items(multi=True))),
+                session.get('user_id') if per_user else None,
+            )
+            # 뷰 실행 전에 버전을 읽어야 실행 중 발생한 무효화를 놓치지 않음
+            versions = tag_versions(tag_list)
+            entry = _cache.get(key)
+
+            if entry is None or entry['versions'] != versions:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                entry = {
+                    'versions': versions,
+                    'body': body,
+                    'mimetype': response.mimetype,
+                    'etag': hashlib.sha1(body).hexdigest(),
+                    'last_modified': time.time(),
+                }
+                _cache.set(key, entry, ttl)
+
+            response = current_app.response_class(entry['body'], mimetype=entry['mimetype'])
+            response.set_etag(entry['etag'])
+            response.last_modified = entry['last_modified']
+            # 클라이언트는 매번 재검증 (변경이 없으면 304)
+            response.headers['Cache-Control'] = 'private, no-cache' if per_user else 'no-cache'
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+
+def response_cache_stats():
+    stats = _cache.stats()
+    with _versions_lock:
+        stats['tags'] = len(_versions)
+    return stats
@@ -0,0 +1,137 @@
+import os
+import time
+from datetime import datetime
+import mysql.connector
+from utils.elo import calculate_new_ratings
+from utils import matches as match_model
+
+# ==========================================
+# 경기 결과 확정 (Result Commit)
+# ==========================================
+# 결과 확정 = 경기 상태 변경 + 양 클럽 포인트/전적 갱신 + 레이팅 이력 기록을 한 트랜잭션으로 처리합니다.
+# - 잠금 순서: Matches 행 -> Clubs 행(id 오름차순). 모든 확정 요청이 같은 순서로 잠그므로
+#   같은 클럽이 걸린 다른 경기의 확정과 동시에 실행돼도 교착 없이 직렬화됩니다. (전역 잠금 없음)
+# - 멱등성: ClubRatingHistory (match_id, club_id) UNIQUE 가 멱등 키입니다.
+#   이미 이력이 있는 경기는 포인트를 다시 반영하지 않고 롤백합니다. (migrations/004_club_rating_history.sql)
+# - 교착/잠금 대기 초과 시 트랜잭션 전체를 RESULT_COMMIT_RETRIES 회까지 다시 시도합니다.
+
+RESULT_COMMIT_RETRIES = int(os.environ.get('RESULT_COMMIT_RETRIES', 3))
+RESULT_COMMIT_BACKOFF = float(os.environ.get('RESULT_COMMIT_BACKOFF', 0.05))   # 초, 재시도마다 2배
+
+_RETRYABLE_ERRNOS = (1205, 1213)   # Lock wait timeout, Deadlock
+_DUPLICATE_ERRNO = 1062
+
+# commit_result() 결과 상태
+APPLIED = 'APPLIED'                  # 이번 호출에서 반영됨
+ALREADY_APPLIED = 'ALREADY_APPLIED'  # 이미 확정된 경기 (중복 요청)
+NOT_PENDING = 'NOT_PENDING'          # 제안된 결과가 없음
+NOT_FOUND = 'NOT_FOUND'
+
+
+def _result_code(actual):
+    if actual == 1.0:
+        return 'W'
+    if actual == 0.0:
+        return 'L'
+    return 'D'
+
+
+def _apply(cursor, room_id):
+    """
+    잠금을 잡고 결과를 반영합니다. 커밋/롤백은 호출한 쪽에서 수행합니다.
+    """
+    # 1. 경기 행 잠금 (같은 경기의 동시 확정은 여기서 직렬화)
+    match = match_model.get_match(cursor, room_id, for_update=True)
+    if not match:
+        return NOT_FOUND, None
+    if match['status'] == match_model.FINISHED:
+        return ALREADY_APPLIED, None
+    if match['status'] != match_model.PENDING:
+        return NOT_PENDING, None
+
+    # 2. 클럽 행 잠금 (id 오름차순으로 하나씩)
+    clubs = {}
+    for club_id in sorted((match['home_club_id'], match['away_club_id'])):
+        cursor.execute("SELECT id, point, sport FROM Clubs WHERE id = %s FOR UPDATE", (club_id,))
+        clubs[club_id] = cursor.fetchone()
+
+    # 3. 승패 판정 및 ELO 계산 (Club 1 = home 기준)
+    club_1, club_2 = match['home_club_id'], match['away_club_id']
+    score_1, score_2 = match['home_score'], match['away_score']
+    rating_1, rating_2 = clubs[club_1]['point'], clubs[club_2]['point']
+
+    actual_1 = 0.5
+    if score_1 > score_2: actual_1 = 1.0
+    elif score_1 < score_2: actual_1 = 0.0
+    actual_2 = 1.0 - actual_1
+
+    new_1, new_2 = calculate_new_ratings(rating_1, rating_2, actual_1)
+    sport = clubs[club_1]['sport']
+
+    sides = [
+        {'club_id': club_1, 'opponent_club_id': club_2, 'score_my': score_1, 'score_op': score_2,
+         'point_before': rating_1, 'point_after': new_1, 'result': _result_code(actual_1)},
+        {'club_id': club_2, 'opponent_club_id': club_1, 'score_my': score_2, 'score_op': score_1,
+         'point_before': rating_2, 'point_after': new_2, 'result': _result_code(actual_2)},
+    ]
+
+    # 4. 이력 기록 (멱등 키, 중복이면 1062 로 중단)
+    cursor.execute("""
+        INSERT INTO ClubRatingHistory
+            (club_id, match_id, opponent_club_id, sport, point_before, point_after, result)
+        VALUES (%s, %s, %s, %s, %s, %s, %s), (%s, %s, %s, %s, %s, %s, %s)
+    """, tuple(
+        value for side in sides for value in (
+            side['club_id'], match['id'], side['opponent_club_id'], sport,
+            side['point_before'], side['point_after'], side['result'],
+        )
+    ))
+
+    # 5. 포인트 및 승무패 갱신
+    sql_update = """
+        UPDATE Clubs SET point=%s,
+            wins=wins+%s, losses=losses+%s, draws=draws+%s
+        WHERE id=%s
+    """
+    for side in sides:
+        cursor.execute(sql_update, (
+            side['point_after'],
+            1 if side['result'] == 'W' else 0, 1 if side['result'] == 'L' else 0, 1 if side['result'] == 'D' else 0,
+            side['club_id'],
+        ))
+
+    # 6. PENDING -> FINISHED (행을 잠갔으므로 항상 성공)
+    match_model.transition(cursor, room_id, match_model.FINISHED, finished_at=datetime.now())
+
+    return APPLIED, {'match_id': match['id'], 'room_id': room_id, 'sport': sport, 'sides': sides}
+
+
+def commit_result(conn, room_id):
+    """
+    제안된 경기 결과를 확정합니다. 같은 경기에 여러 번 호출해도 포인트는 한 번만 반영됩니다.
+
+    Returns:
+        tuple: (상태, 결과) - 상태가 APPLIED 일 때만 결과 dict
+               {'match_id', 'room_id', 'sport', 'sides': [home 기준, away 기준]}
+    """
+    attempt = 0
+    while True:
+        cursor = conn.cursor(dictionary=True, buffered=True)
+        try:
+            status, result = _apply(cursor, room_id)
+            if status == APPLIED:
+                conn.commit()
+            else:
+                conn.rollback()
+            return status, result
+        except mysql.connector.Error as e:
+            conn.rollback()
+            if e.errno == _DUPLICATE_ERRNO:
+                return ALREADY_APPLIED, None
+            if e.errno in _RETRYABLE_ERRNOS and attempt < RESULT_COMMIT_RETRIES:
+                time.sleep(RESULT_COMMIT_BACKOFF * (2 ** attempt))
+                attempt += 1
+                continue
+            raise
+        finally:
+            cursor.close()
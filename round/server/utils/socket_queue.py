@@ -0,0 +1,47 @@
+import os
+from flask_socketio import SocketIO
+
+# ==========================================
+# Socket.IO 메시지 큐 (Multi-node Pub/Sub)
+# ==========================================
+# 메시지 큐 없이 생성된 SocketIO 는 room(user_{id}, 채팅방 UUID) 정보를 프로세스 안에만 가지므로
+# Gunicorn 워커가 2개 이상이면 다른 워커에 접속한 클라이언트에게 emit 이 전달되지 않습니다.
+# SOCKETIO_MESSAGE_QUEUE 를 지정하면 모든 emit 이 pub/sub 을 거쳐 전체 워커로 전달됩니다.
+#
+# URL 스킴으로 백엔드를 선택합니다. (python-socketio 클라이언트 매니저)
+# - redis://host:6379/0        : Redis pub/sub (운영 권장)
+# - amqp://user:pw@host//      : RabbitMQ 등 kombu 지원 브로커
+# - kafka://host:9092          : Kafka
+# - zmq+tcp://host:5555+5556   : ZeroMQ 로컬 소켓 브로커
+# - memory://                  : kombu 인메모리 전송 (단일 프로세스 테스트용, pub/sub 경로는 동일)
+# - 미설정                      : 기존과 같이 프로세스 내부 매니저 (워커 1개일 때만 사용)
+#
+# 주의: 폴링(long-polling) 전송을 쓰는 클라이언트를 위해 nginx 에서 sticky session(ip_hash)이 필요합니다.
+
+SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+SOCKETIO_CHANNEL = os.environ.get('SOCKETIO_CHANNEL', 'round-socketio')
+
+
+def socketio_queue_options():
+    """
+    socketio.init_app() 에 전달할 메시지 큐 옵션
+    """
+    if not SOCKETIO_MESSAGE_QUEUE:
+        return {}
+    return {'message_queue': SOCKETIO_MESSAGE_QUEUE, 'channel': SOCKETIO_CHANNEL}
+
+
+_external = None
+
+
+def get_external_emitter():
+    """
+    Flask 앱/소켓 서버 밖(배치 스크립트, 백그라운드 작업)에서 emit 하기 위한 쓰기 전용 인스턴스.
+    메시지 큐가 설정되지 않았다면 다른 프로세스의 클라이언트에 닿을 수 없으므로 None 을 반환합니다.
+    """
+    global _external
+    if not SOCKETIO_MESSAGE_QUEUE:
+        return None
+    if _external is None:
+        _external = SocketIO(message_queue=SOCKETIO_MESSAGE_QUEUE, channel=SOCKETIO_CHANNEL)
+    return _external